@@ -0,0 +1,66 @@
+"""
+Compares the fairness and throughput of dequeue strategies under mixed load:
+a flood of jobs on a high priority queue and a steady trickle on a low
+priority one.
+
+Usage:
+    REDIS_URL=redis://localhost:6379/15 python benchmarks/dequeue_strategies.py
+
+The Redis database is flushed before every run.
+"""
+
+import argparse
+import os
+import time
+
+import django
+from django.conf import settings
+
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/15')
+
+settings.configure(
+    INSTALLED_APPS=['django_rq'],
+    RQ={'COMMIT_MODE': 'auto'},
+    RQ_QUEUES={
+        'high': {'URL': REDIS_URL, 'WEIGHT': 3},
+        'low': {'URL': REDIS_URL, 'WEIGHT': 1},
+    },
+)
+django.setup()
+
+from rq.registry import FinishedJobRegistry  # noqa: E402
+
+from django_rq.queues import DjangoRQ, get_queues  # noqa: E402
+from django_rq.workers import DjangoSimpleWorker, get_worker  # noqa: E402
+
+
+def run(strategy: str, jobs: int, high_jobs: int, low_jobs: int) -> None:
+    queues = get_queues('high', 'low')
+    queues[0].connection.flushdb()
+    for queue, count in zip(queues, (high_jobs, low_jobs)):
+        queue.enqueue_many([DjangoRQ.prepare_data('os.getpid', result_ttl=600) for _ in range(count)])
+
+    worker = get_worker('high', 'low', worker_class=DjangoSimpleWorker)
+    start = time.perf_counter()
+    worker.work(burst=True, max_jobs=jobs, dequeue_strategy=strategy, logging_level='WARNING')  # type: ignore[arg-type]
+    elapsed = time.perf_counter() - start
+
+    performed = {queue.name: FinishedJobRegistry(queue=queue).count for queue in queues}
+    shares = ', '.join(f'{name} {count / jobs:6.1%}' for name, count in performed.items())
+    print(f'{strategy:<12} {jobs / elapsed:8.1f} jobs/s   {shares}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=400, help='Number of jobs performed per strategy')
+    parser.add_argument('--high-jobs', type=int, default=2000, help='Number of jobs queued on "high"')
+    parser.add_argument('--low-jobs', type=int, default=200, help='Number of jobs queued on "low"')
+    args = parser.parse_args()
+
+    print(f'{args.jobs} jobs, high:low weights 3:1, {args.high_jobs} vs {args.low_jobs} jobs queued')
+    for strategy in ('default', 'round_robin', 'weighted'):
+        run(strategy, args.jobs, args.high_jobs, args.low_jobs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Measures the throughput, latency and Redis commands of django-rq's hot paths:
+get_queue(), enqueue_call() in every commit mode, thread_queue.commit(),
+get_statistics(), RQCollector.collect() and the dashboard views.
+
+Fixtures are rebuilt on every run: --queues queues holding --jobs jobs each
+and --workers registered workers.
+
+Usage:
+    REDIS_URL=redis://localhost:6379/15 python benchmarks/hot_paths.py
+    python benchmarks/hot_paths.py --fakeredis
+
+The Redis database is flushed before and after every run.
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import Any, Callable
+
+import django
+from django.conf import settings
+
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/15')
+
+# URLconf of the dashboard views, set once Django is configured
+urlpatterns: list = []
+
+
+class CommandCounter:
+    """Counts the Redis commands sent, and the round trips made to send them"""
+
+    def __init__(self) -> None:
+        self.commands = 0
+        self.round_trips = 0
+
+    def install(self) -> None:
+        from redis.connection import AbstractConnection
+
+        send_command = AbstractConnection.send_command
+        pack_commands = AbstractConnection.pack_commands
+        send_packed_command = AbstractConnection.send_packed_command
+        counter = self
+
+        def counting_send_command(connection, *args, **kwargs):
+            counter.commands += 1
+            return send_command(connection, *args, **kwargs)
+
+        # Pipelines pack all their commands at once
+        def counting_pack_commands(connection, commands):
+            commands = list(commands)
+            counter.commands += len(commands)
+            return pack_commands(connection, commands)
+
+        def counting_send_packed_command(connection, *args, **kwargs):
+            counter.round_trips += 1
+            return send_packed_command(connection, *args, **kwargs)
+
+        AbstractConnection.send_command = counting_send_command  # type: ignore[method-assign]
+        AbstractConnection.pack_commands = counting_pack_commands  # type: ignore[method-assign]
+        AbstractConnection.send_packed_command = counting_send_packed_command  # type: ignore[method-assign]
+
+    def reset(self) -> None:
+        self.commands = self.round_trips = 0
+
+
+counter = CommandCounter()
+
+
+def measure(name: str, func: Callable[[], Any], number: int, operations: int = 1) -> None:
+    """Calls ``func`` ``number`` times, each call performing ``operations`` operations"""
+    func()  # Warm up
+    counter.reset()
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    elapsed = time.perf_counter() - start
+    total = number * operations
+    print(
+        f'{name:<36} {total / elapsed:10.1f} ops/s {elapsed / total * 1000:9.3f} ms/op '
+        f'{counter.commands / total:8.1f} cmds/op {counter.round_trips / total:7.1f} round trips/op'
+    )
+
+
+def configure(connection: dict[str, Any], queues: int) -> None:
+    settings.configure(
+        DEBUG=False,
+        SECRET_KEY='benchmarks',
+        ALLOWED_HOSTS=['testserver'],
+        INSTALLED_APPS=[
+            'django.contrib.contenttypes',
+            'django.contrib.admin',
+            'django.contrib.auth',
+            'django.contrib.messages',
+            'django.contrib.sessions',
+            'django_rq',
+        ],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        MIDDLEWARE=[
+            'django.contrib.sessions.middleware.SessionMiddleware',
+            'django.contrib.auth.middleware.AuthenticationMiddleware',
+            'django.contrib.messages.middleware.MessageMiddleware',
+        ],
+        TEMPLATES=[
+            {
+                'BACKEND': 'django.template.backends.django.DjangoTemplates',
+                'APP_DIRS': True,
+                'OPTIONS': {
+                    'context_processors': [
+                        'django.template.context_processors.request',
+                        'django.contrib.auth.context_processors.auth',
+                        'django.contrib.messages.context_processors.messages',
+                    ],
+                },
+            }
+        ],
+        ROOT_URLCONF=__name__,
+        RQ={'COMMIT_MODE': 'auto'},
+        RQ_QUEUES={f'queue{index}': connection for index in range(queues)},
+    )
+    django.setup()
+
+    from django.contrib import admin
+    from django.urls import path
+
+    urlpatterns.append(path('admin/', admin.site.urls))
+
+
+def populate(queues: int, jobs: int, workers: int) -> list:
+    """Enqueues ``jobs`` jobs on every queue and registers ``workers`` workers"""
+    from django_rq.queues import DjangoRQ, get_queue
+    from django_rq.workers import get_worker
+
+    for index in range(queues):
+        queue = get_queue(f'queue{index}')
+        queue.enqueue_many([DjangoRQ.prepare_data('os.getpid') for _ in range(jobs)])
+
+    registered = []
+    for index in range(workers):
+        worker = get_worker(f'queue{index % queues}', name=f'benchmark-{index}')
+        worker.register_birth()
+        registered.append(worker)
+    return registered
+
+
+def run_benchmarks(args: argparse.Namespace) -> None:
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db import transaction
+    from django.test import Client
+    from django.urls import reverse
+
+    from django_rq import thread_queue
+    from django_rq.contrib.prometheus import RQCollector
+    from django_rq.queues import get_queue
+    from django_rq.utils import get_statistics
+
+    number = args.number
+    name = f'queue{args.queues - 1}'
+
+    measure('get_queue', lambda: get_queue(name), number * 10)
+    measure(f'get_statistics ({args.queues} queues)', get_statistics, number)
+    if RQCollector is not None:
+        collector = RQCollector()
+        measure(f'RQCollector.collect ({args.queues} queues)', lambda: list(collector.collect()), number)
+
+    call_command('migrate', verbosity=0)
+    client = Client()
+    client.force_login(User.objects.create_superuser('benchmark', password='benchmark'))
+    for view, kwargs in [('home', {}), ('jobs', {'queue_index': args.queues - 1})]:
+        url = reverse(f'admin:django_rq_{view}', kwargs=kwargs)
+        measure(f'view {view}', lambda: client.get(url), number)
+
+    # Jobs are enqueued in batches of a hundred, as many as a request would enqueue at most
+    batch = 100
+
+    def enqueue_auto():
+        queue = get_queue(name, commit_mode='auto')
+        for _ in range(batch):
+            queue.enqueue_call('os.getpid')
+
+    def enqueue_on_db_commit():
+        queue = get_queue(name, commit_mode='on_db_commit')
+        with transaction.atomic():
+            for _ in range(batch):
+                queue.enqueue_call('os.getpid')
+
+    def enqueue_request_finished():
+        queue = get_queue(name, commit_mode='request_finished')
+        for _ in range(batch):
+            queue.enqueue_call('os.getpid')
+        thread_queue.commit()
+
+    for mode, enqueue in [
+        ('auto', enqueue_auto),
+        ('on_db_commit', enqueue_on_db_commit),
+        ('request_finished', enqueue_request_finished),
+    ]:
+        measure(f'enqueue_call ({mode})', enqueue, max(number // 10, 1), batch)
+
+    queue = get_queue(name, commit_mode='request_finished')
+
+    def commit():
+        # Only the commit is measured
+        nonlocal elapsed
+        for _ in range(batch):
+            queue.enqueue_call('os.getpid')
+        start = time.perf_counter()
+        thread_queue.commit()
+        elapsed += time.perf_counter() - start
+
+    elapsed = 0.0
+    iterations = max(number // 10, 1)
+    counter.reset()
+    for _ in range(iterations):
+        commit()
+    total = iterations * batch
+    # Jobs added to the thread queue don't send any command until they're committed
+    print(
+        f'{"thread_queue.commit":<36} {total / elapsed:10.1f} ops/s {elapsed / total * 1000:9.3f} ms/op '
+        f'{counter.commands / total:8.1f} cmds/op {counter.round_trips / total:7.1f} round trips/op'
+    )
+
+
+def start_fakeredis() -> dict[str, Any]:
+    """Serves a fakeredis server on a free port, returns its connection config"""
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer(('127.0.0.1', 0))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return {'HOST': host, 'PORT': port, 'DB': 0}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queues', type=int, default=10, help='Number of queues')
+    parser.add_argument('--jobs', type=int, default=1000, help='Number of jobs queued on every queue')
+    parser.add_argument('--workers', type=int, default=10, help='Number of registered workers')
+    parser.add_argument('--number', type=int, default=100, help='Number of calls measured per benchmark')
+    parser.add_argument('--fakeredis', action='store_true', help='Run against an in-process fakeredis server')
+    args = parser.parse_args()
+
+    connection_config = start_fakeredis() if args.fakeredis else {'URL': REDIS_URL}
+    configure(connection_config, args.queues)
+
+    from django_rq.queues import get_connection
+
+    connection = get_connection('queue0')
+    connection.flushdb()
+    counter.install()
+    print(f'{args.queues} queues x {args.jobs} jobs x {args.workers} workers on {connection_config}')
+    try:
+        populate(args.queues, args.jobs, args.workers)
+        run_benchmarks(args)
+    finally:
+        connection.flushdb()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+import logging
+from datetime import timedelta
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+from redis.commands.core import Script
+from rq import get_current_job
+from rq.job import Job
+from rq.utils import import_attribute
+
+from .queues import DjangoRQ
+
+if TYPE_CHECKING:
+    from rq import Queue
+    from rq.decorators import job as JobDecorator
+
+logger = logging.getLogger(__name__)
+
+BATCH_KEY_PREFIX = 'rq:batch:'
+
+# Appends the item ARGV[2] to the batch KEYS[1]. Once it holds ARGV[1] items,
+# they're popped. Returns the length of the batch after appending and the
+# popped items, if any.
+APPEND_SCRIPT = """
+local size = tonumber(ARGV[1])
+local length = redis.call('RPUSH', KEYS[1], ARGV[2])
+if length < size then
+    return {length, {}}
+end
+local items = redis.call('LRANGE', KEYS[1], 0, size - 1)
+redis.call('LTRIM', KEYS[1], size, -1)
+return {length, items}
+"""
+
+# Pops up to ARGV[1] items from the batch KEYS[1]
+POP_SCRIPT = """
+local items = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+redis.call('LTRIM', KEYS[1], #items, -1)
+return items
+"""
+
+_scripts: dict[str, Script] = {}
+
+
+class Batch:
+    """
+    Collects the arguments of calls to ``func`` in a Redis list and enqueues a
+    single job calling ``func`` with a list of argument tuples once there are
+    ``batch_size`` of them, or ``batch_window`` seconds after the first one.
+    Jobs are enqueued with the options of the ``@job`` decorator.
+
+    Partial batches are enqueued by a job scheduled with ``enqueue_in``, so a
+    worker must run with ``--with-scheduler``. Otherwise a warning is logged
+    and batches wait until they are full.
+    """
+
+    def __init__(self, func: Callable, decorator: 'JobDecorator', batch_size: int, batch_window: timedelta):
+        self.func = func
+        self.decorator = decorator
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.func_name = f'{func.__module__}.{func.__qualname__}'
+
+    @property
+    def queue(self) -> 'Queue':
+        queue = self.decorator.queue
+        if isinstance(queue, str):
+            queue = self.decorator.queue_class(name=queue, connection=self.decorator.connection)
+        return queue
+
+    @property
+    def key(self) -> str:
+        return f'{BATCH_KEY_PREFIX}{self.queue.name}:{self.func_name}'
+
+    def _run_script(self, script: str, args: list[Any]) -> Any:
+        queue = self.queue
+        if script not in _scripts:
+            _scripts[script] = queue.connection.register_script(script)
+        return _scripts[script](keys=[self.key], args=args, client=queue.connection)
+
+    def add(self, *args: Any, **kwargs: Any) -> Optional[Job]:
+        """
+        Adds a call to the batch. Like enqueued jobs, the call is only added
+        once the current database transaction commits or the request
+        finishes, depending on the queue's commit mode. Returns the job if
+        the batch was enqueued.
+
+        Calls are stored as tuples of positional arguments, keyword arguments
+        aren't supported.
+        """
+        if kwargs:
+            raise TypeError(
+                f'{self.func_name}() is batched and only takes positional arguments, got {", ".join(kwargs)}'
+            )
+        queue = self.queue
+        # Only DjangoRQ queues have a commit mode
+        if isinstance(queue, DjangoRQ):
+            return queue._commit(self._add, (args,), {})
+        return self._add(args)
+
+    def _add(self, args: tuple) -> Optional[Job]:
+        queue = self.queue
+        length, items = self._run_script(APPEND_SCRIPT, [self.batch_size, queue.serializer.dumps(args)])
+        if items:
+            return self.enqueue(items)
+        if length == 1:
+            # The first call of a new batch, make sure it doesn't wait for more than batch_window
+            queue.enqueue_in(self.batch_window, flush_batch, self.func_name, result_ttl=0)
+            if queue.scheduler_pid is None:
+                logger.warning(
+                    'No scheduler is running for queue %s, the batch of %s is only enqueued once it holds %d calls. '
+                    'Run a worker with --with-scheduler to enqueue partial batches after %gs.',
+                    queue.name,
+                    self.func_name,
+                    self.batch_size,
+                    self.batch_window.total_seconds(),
+                )
+        return None
+
+    def flush(self) -> list[Job]:
+        """Enqueues the calls added to the batch so far"""
+        jobs = []
+        while items := self._run_script(POP_SCRIPT, [self.batch_size]):
+            jobs.append(self.enqueue(items))
+        return jobs
+
+    def enqueue(self, items: list[bytes]) -> Job:
+        queue = self.queue
+        decorator = self.decorator
+        # The items were popped already, enqueue them regardless of the commit mode
+        enqueue_call = getattr(queue, 'original_enqueue_call', queue.enqueue_call)
+        return enqueue_call(
+            self.func,
+            args=([queue.serializer.loads(item) for item in items],),
+            timeout=decorator.timeout,
+            result_ttl=decorator.result_ttl,
+            ttl=decorator.ttl,
+            failure_ttl=decorator.failure_ttl,
+            meta=decorator.meta,
+            description=decorator.description,
+            retry=decorator.retry,
+            on_success=decorator.on_success,
+            on_failure=decorator.on_failure,
+            on_stopped=decorator.on_stopped,
+        )
+
+
+def flush_batch(func_name: str) -> None:
+    """Job scheduled ``batch_window`` after the first call of a batch"""
+    func: Any = import_attribute(func_name)
+    func.batch.flush()
+
+
+def batched(
+    decorator: 'JobDecorator', batch_size: int, batch_window: Union[int, float, timedelta]
+) -> Callable[[Callable], Callable]:
+    """
+    Decorates a function taking a list of argument tuples so that its
+    ``delay()`` adds a single call to a batch, see ``Batch``.
+
+    The function may return a list with a result for each call. Calls whose
+    result is an exception instance are counted as failed: they're listed in
+    the job's ``meta['failed_items']`` with their index and error, and their
+    result is replaced with ``None``.
+    """
+    if not isinstance(batch_window, timedelta):
+        batch_window = timedelta(seconds=batch_window)
+
+    def wrapper(f):
+        @wraps(f)
+        def run_batch(items):
+            results = f(items)
+            if not isinstance(results, list):
+                return results
+
+            failed_items = [
+                {'index': index, 'error': repr(result)}
+                for index, result in enumerate(results)
+                if isinstance(result, Exception)
+            ]
+            job = get_current_job()
+            if job is not None:
+                job.meta['batch_size'] = len(items)
+                job.meta['failed_items'] = failed_items
+                job.save_meta()
+            return [None if isinstance(result, Exception) else result for result in results]
+
+        func = decorator(run_batch)
+        func.batch = Batch(func, decorator, batch_size, batch_window)
+        func.delay = func.enqueue = func.batch.add
+        return func
+
+    return wrapper
@@ -0,0 +1,156 @@
+from collections.abc import Sequence
+from typing import Any, Callable, NamedTuple, Optional, Union
+
+from redis import Redis
+from redis.commands.core import Script
+from rq.job import Job
+from rq.queue import Queue
+
+from .jobs import format_job_key
+
+CONCURRENCY_KEY_PREFIX = 'rq:concurrency:'
+
+# Keys that have jobs waiting for a slot, with the maximum concurrency of each
+WAITING_KEYS = 'rq:concurrency-waiting'
+
+# Milliseconds a slot is reserved for a waiting job once it's enqueued again
+RESERVATION_LEASE = (Queue.DEFAULT_TIMEOUT + 60) * 1000
+
+# Slots are held in a sorted set of job IDs scored by when their lease
+# expires (in milliseconds, from the Redis server's clock), so that slots of
+# jobs whose worker died are eventually reclaimed. Jobs waiting for a slot are
+# kept in a list, in the order they were dequeued.
+#
+# ACQUIRE_SCRIPT takes a slot for the job ARGV[1] if fewer than ARGV[2] are
+# held, with a lease of ARGV[3] milliseconds. Otherwise, if ARGV[4] is "1",
+# the job is added to the waiting list. Returns 1 if a slot was taken.
+ACQUIRE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local lease = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) or redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], now + lease, ARGV[1])
+    if redis.call('PTTL', KEYS[1]) < lease then
+        redis.call('PEXPIRE', KEYS[1], lease)
+    end
+    return 1
+end
+if ARGV[4] == '1' then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+    redis.call('HSET', KEYS[3], ARGV[5], ARGV[2])
+end
+return 0
+"""
+
+# RELEASE_SCRIPT frees the slot of the job ARGV[1], if any, and pops as many
+# waiting jobs as there are free slots out of ARGV[2]. Slots are reserved for
+# these jobs for ARGV[4] milliseconds, until they're dequeued again and take
+# them. Returns their IDs.
+RELEASE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local lease = tonumber(ARGV[4])
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+local free = tonumber(ARGV[2]) - redis.call('ZCARD', KEYS[1])
+local job_ids = {}
+while free > 0 do
+    local job_id = redis.call('LPOP', KEYS[2])
+    if not job_id then
+        break
+    end
+    redis.call('ZADD', KEYS[1], now + lease, job_id)
+    if redis.call('PTTL', KEYS[1]) < lease then
+        redis.call('PEXPIRE', KEYS[1], lease)
+    end
+    table.insert(job_ids, job_id)
+    free = free - 1
+end
+if redis.call('LLEN', KEYS[2]) == 0 then
+    redis.call('HDEL', KEYS[3], ARGV[3])
+end
+return job_ids
+"""
+
+_scripts: dict[str, Script] = {}
+
+
+def _run_script(connection: Redis, script: str, keys: Sequence[str], args: Sequence[Any]) -> Any:
+    if script not in _scripts:
+        _scripts[script] = connection.register_script(script)
+    return _scripts[script](keys=keys, args=args, client=connection)
+
+
+class ConcurrencyLimit(NamedTuple):
+    """
+    At most ``max_concurrency`` jobs sharing the same key run at once. ``key``
+    is either a string, formatted with the job's arguments by name, or a
+    callable that is called with the job's arguments and returns the key.
+    """
+
+    key: Union[str, Callable[..., Any]]
+    max_concurrency: int
+
+    def get_key(self, func: Callable, args: Sequence[Any], kwargs: dict[str, Any]) -> str:
+        return format_job_key(self.key, func, args, kwargs)
+
+
+def get_concurrency_limit(job: Job) -> Optional[ConcurrencyLimit]:
+    """
+    Returns the concurrency limit of the job's function, set with the
+    ``concurrency_key`` and ``max_concurrency`` arguments of ``@job``.
+    """
+    return getattr(job.func, 'concurrency_limit', None)
+
+
+def get_lease(job: Job) -> int:
+    """
+    Returns how long a slot is held, in milliseconds, before it's considered
+    abandoned: a minute longer than the job may run.
+    """
+    timeout = Queue.DEFAULT_TIMEOUT if job.timeout is None else job.timeout
+    if timeout < 0:
+        # The job can run forever
+        timeout = 24 * 60 * 60
+    return (int(timeout) + 60) * 1000
+
+
+def get_slots_key(key: str) -> str:
+    return f'{CONCURRENCY_KEY_PREFIX}{key}'
+
+
+def get_waiting_key(key: str) -> str:
+    return f'{CONCURRENCY_KEY_PREFIX}{key}:waiting'
+
+
+def acquire_slot(connection: Redis, key: str, max_concurrency: int, job: Job, wait: bool = False) -> bool:
+    """
+    Takes one of the ``max_concurrency`` slots of ``key`` for ``job``. If
+    they're all taken and ``wait`` is true, the job is added to the list of
+    jobs waiting for a slot to be released.
+    """
+    keys = [get_slots_key(key), get_waiting_key(key), WAITING_KEYS]
+    args = [job.id, max_concurrency, get_lease(job), int(wait), key]
+    return bool(_run_script(connection, ACQUIRE_SCRIPT, keys, args))
+
+
+def release_slot(connection: Redis, key: str, max_concurrency: int, job_id: str = '') -> list[str]:
+    """
+    Releases the slot of ``job_id`` and returns the IDs of the jobs waiting
+    for a slot that should be enqueued again, one for every free slot. The
+    slots are reserved for them, if one of them can't be enqueued its slot
+    must be released too.
+    """
+    keys = [get_slots_key(key), get_waiting_key(key), WAITING_KEYS]
+    args = [job_id, max_concurrency, key, RESERVATION_LEASE]
+    job_ids = _run_script(connection, RELEASE_SCRIPT, keys, args)
+    return [job_id.decode() if isinstance(job_id, bytes) else job_id for job_id in job_ids]
+
+
+def get_waiting_keys(connection: Redis) -> dict[str, int]:
+    """Returns the keys that have jobs waiting for a slot, with their maximum concurrency"""
+    return {
+        key.decode() if isinstance(key, bytes) else key: int(value)
+        for key, value in connection.hgetall(WAITING_KEYS).items()
+    }
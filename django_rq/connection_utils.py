@@ -4,11 +4,21 @@ import redis
 from redis import Redis
 from redis.sentinel import Sentinel
 
+from .instrumentation import instrument_connection, is_instrumentation_enabled
+
 
 def get_redis_connection(config: dict[str, Any], use_strict_redis: bool = False) -> Redis:
     """
-    Returns a redis connection from a connection config
+    Returns a redis connection from a connection config, instrumented if
+    ``REDIS_INSTRUMENTATION`` is enabled
     """
+    connection = _create_redis_connection(config, use_strict_redis)
+    if is_instrumentation_enabled():
+        instrument_connection(connection)
+    return connection
+
+
+def _create_redis_connection(config: dict[str, Any], use_strict_redis: bool) -> Redis:
     redis_cls = redis.StrictRedis if use_strict_redis else redis.Redis
 
     if 'URL' in config:
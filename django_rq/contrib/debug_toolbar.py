@@ -0,0 +1,29 @@
+from ..instrumentation import track_redis
+
+try:
+    from debug_toolbar.panels import Panel
+
+    class RedisPanel(Panel):
+        """
+        Django Debug Toolbar panel showing the Redis usage of a request. Only
+        connections instrumented with ``REDIS_INSTRUMENTATION`` are tracked.
+        """
+
+        title = 'Redis'
+        template = 'django_rq/debug_toolbar/redis.html'
+
+        @property
+        def nav_subtitle(self):
+            stats = self.get_stats()
+            if not stats:
+                return ''
+            return f"{stats['commands']} commands in {stats['time_ms']:.1f} ms"
+
+        def process_request(self, request):
+            with track_redis() as stats:
+                response = super().process_request(request)
+            self.record_stats({**stats.as_dict(), 'time_ms': stats.time * 1000})
+            return response
+
+except ImportError:
+    RedisPanel = None  # type: ignore[assignment, misc]
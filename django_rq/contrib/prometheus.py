@@ -1,11 +1,23 @@
+import os
+from typing import TYPE_CHECKING, Optional
+
 from rq.job import JobStatus
 
 from ..connection_utils import filter_connection_params, get_connection, get_unique_connection_configs
+from ..fanout import fan_out
 from ..queues import get_queue
 from ..workers import get_worker_class
 
+if TYPE_CHECKING:
+    from rq.queue import Queue
+
+# Worker side metrics are only recorded once a metrics server has been started
+# in this process (or in the parent process, for forked workers).
+_worker_metrics_enabled = False
+
 try:
-    from prometheus_client import Summary
+    import prometheus_client
+    from prometheus_client import Counter, Histogram, Summary
     from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
 
     class RQCollector:
@@ -32,29 +44,47 @@ try:
 
                 worker_class = get_worker_class()
                 unique_configs = get_unique_connection_configs()
-                connections = {}
+                queue_names: dict[int, list[str]] = {}
                 for queue_name, config in QUEUES.items():
                     index = unique_configs.index(filter_connection_params(config))
-                    if index not in connections:
-                        connections[index] = connection = get_connection(queue_name)
-
-                        for worker in worker_class.all(connection):
-                            name = worker.name
-                            label_queues = ','.join(worker.queue_names())
-                            rq_workers.add_metric([name, worker.get_state(), label_queues], 1)
-                            rq_job_successful_total.add_metric([name, label_queues], worker.successful_job_count)
-                            rq_job_failed_total.add_metric([name, label_queues], worker.failed_job_count)
-                            rq_working_seconds_total.add_metric([name, label_queues], worker.total_working_time)
-                    else:
-                        connection = connections[index]
-
-                    queue = get_queue(queue_name, connection=connection)
-                    rq_jobs.add_metric([queue_name, JobStatus.QUEUED], queue.count)
-                    rq_jobs.add_metric([queue_name, JobStatus.STARTED], queue.started_job_registry.count)
-                    rq_jobs.add_metric([queue_name, JobStatus.FINISHED], queue.finished_job_registry.count)
-                    rq_jobs.add_metric([queue_name, JobStatus.FAILED], queue.failed_job_registry.count)
-                    rq_jobs.add_metric([queue_name, JobStatus.DEFERRED], queue.deferred_job_registry.count)
-                    rq_jobs.add_metric([queue_name, JobStatus.SCHEDULED], queue.scheduled_job_registry.count)
+                    queue_names.setdefault(index, []).append(queue_name)
+
+                def collect_connection(names: list[str]) -> tuple[list, list]:
+                    connection = get_connection(names[0])
+                    workers = [
+                        (
+                            worker.name,
+                            worker.get_state(),
+                            ','.join(worker.queue_names()),
+                            worker.successful_job_count,
+                            worker.failed_job_count,
+                            worker.total_working_time,
+                        )
+                        for worker in worker_class.all(connection)
+                    ]
+                    jobs = []
+                    for queue_name in names:
+                        queue = get_queue(queue_name, connection=connection)
+                        jobs.append((queue_name, JobStatus.QUEUED, queue.count))
+                        jobs.append((queue_name, JobStatus.STARTED, queue.started_job_registry.count))
+                        jobs.append((queue_name, JobStatus.FINISHED, queue.finished_job_registry.count))
+                        jobs.append((queue_name, JobStatus.FAILED, queue.failed_job_registry.count))
+                        jobs.append((queue_name, JobStatus.DEFERRED, queue.deferred_job_registry.count))
+                        jobs.append((queue_name, JobStatus.SCHEDULED, queue.scheduled_job_registry.count))
+                    return workers, jobs
+
+                # Redis servers are queried concurrently, those that fail are left out
+                for result in fan_out(collect_connection, list(queue_names.values())):
+                    if isinstance(result, Exception):
+                        continue
+                    workers, jobs = result
+                    for name, state, label_queues, successful, failed, working_time in workers:
+                        rq_workers.add_metric([name, state, label_queues], 1)
+                        rq_job_successful_total.add_metric([name, label_queues], successful)
+                        rq_job_failed_total.add_metric([name, label_queues], failed)
+                        rq_working_seconds_total.add_metric([name, label_queues], working_time)
+                    for queue_name, status, count in jobs:
+                        rq_jobs.add_metric([queue_name, status], count)
 
                 yield rq_workers
                 yield rq_job_successful_total
@@ -62,5 +92,78 @@ try:
                 yield rq_working_seconds_total
                 yield rq_jobs
 
+    class WorkerMetrics:
+        """
+        Process local metrics recorded by workers and worker pools. Values are
+        kept in memory (or in ``PROMETHEUS_MULTIPROC_DIR`` when prometheus_client's
+        multiprocess mode is enabled), so exposing them never touches Redis.
+        """
+
+        jobs = Counter('rq_worker_jobs', 'Jobs executed by worker processes', ['queue', 'status'])
+        job_duration = Histogram('rq_worker_job_duration_seconds', 'Time spent executing jobs', ['queue'])
+        horse_forks = Counter('rq_worker_horse_forks', 'Work horses forked by worker processes')
+        memory_recycles = Counter(
+            'rq_worker_memory_recycles', 'Workers shut down because they exceeded their memory limit'
+        )
+        pool_workers_started = Counter('rq_worker_pool_workers_started', 'Worker processes started by worker pools')
+        pool_workers_respawned = Counter(
+            'rq_worker_pool_workers_respawned', 'Worker processes respawned by worker pools'
+        )
+        pool_workers_died = Counter('rq_worker_pool_workers_died', 'Worker processes that exited in worker pools')
+
+        @classmethod
+        def observe_job(cls, queue: 'Queue', status: str, duration: float) -> None:
+            cls.jobs.labels(queue.name, status).inc()
+            cls.job_duration.labels(queue.name).observe(duration)
+
 except ImportError:
+    prometheus_client = None  # type: ignore[assignment]
     RQCollector = None  # type: ignore[assignment, misc]
+    WorkerMetrics = None  # type: ignore[assignment, misc]
+
+
+def is_multiprocess_mode() -> bool:
+    """Returns True if prometheus_client's multiprocess mode is enabled."""
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def get_worker_metrics() -> Optional[type['WorkerMetrics']]:
+    """
+    Returns ``WorkerMetrics`` if a worker metrics server has been started,
+    otherwise None so that callers can skip recording altogether.
+    """
+    if _worker_metrics_enabled:
+        return WorkerMetrics
+    return None
+
+
+def start_worker_metrics_server(port: int, addr: str = '0.0.0.0') -> None:
+    """
+    Exposes worker metrics over HTTP and enables recording them.
+
+    In multiprocess mode, metrics written by every process sharing
+    ``PROMETHEUS_MULTIPROC_DIR`` (e.g. forked pool workers) are aggregated.
+    """
+    global _worker_metrics_enabled
+
+    if prometheus_client is None:
+        raise ImportError('prometheus_client has not been installed; install using extra "django-rq[prometheus]"')
+
+    if is_multiprocess_mode():
+        from prometheus_client import multiprocess
+
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+
+    prometheus_client.start_http_server(port, addr=addr, registry=registry)
+    _worker_metrics_enabled = True
+
+
+def mark_worker_process_dead(pid: int) -> None:
+    """Cleans up multiprocess metric files of a dead worker process."""
+    if prometheus_client is not None and is_multiprocess_mode():
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
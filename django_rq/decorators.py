@@ -2,6 +2,8 @@ from typing import TYPE_CHECKING, Any, Callable, Optional, Protocol, TypeVar, Un
 
 from rq.decorators import job as _rq_job
 
+from .batches import batched
+from .concurrency import ConcurrencyLimit
 from .queues import get_queue, get_result_ttl
 
 if TYPE_CHECKING:
@@ -45,6 +47,23 @@ def job(
     default queue.
 
     If ``result_ttl`` is not passed, It set the default ttl to the queue `DEFAULT_RESULT_TTL`.
+
+    With ``max_concurrency``, at most that many jobs of the function sharing
+    the same ``concurrency_key`` run at once across all workers, other jobs are
+    deferred until a slot is released. ``concurrency_key`` defaults to the
+    function's name. It can be a string formatted with the job's arguments by
+    name, such as ``"report:{customer_id}"``, or a callable that takes the
+    job's arguments and returns the key.
+
+    With ``unique_key``, a key built the same way, the job isn't enqueued if a
+    job with the same key is already waiting to run, that job is returned
+    instead. With ``unique_for``, duplicates are suppressed for that many
+    seconds, even after the job ran.
+
+    With ``batch_size``, the function takes a list of argument tuples and
+    ``delay()`` adds a single call to a batch. A job is enqueued for every
+    ``batch_size`` calls, or ``batch_window`` seconds (1 by default) after the
+    first call of a batch, see ``django_rq.batches.batched``.
     """
     if callable(func_or_queue):
         func = func_or_queue
@@ -66,9 +85,56 @@ def job(
         if connection is None:
             connection = queue.connection
 
+    concurrency_key = kwargs.pop('concurrency_key', None)
+    max_concurrency = kwargs.pop('max_concurrency', None)
+    if concurrency_key is not None and max_concurrency is None:
+        raise TypeError('concurrency_key requires max_concurrency')
+    if max_concurrency is not None and (not isinstance(max_concurrency, int) or max_concurrency < 1):
+        raise ValueError('max_concurrency must be a positive integer')
+    unique_key = kwargs.pop('unique_key', None)
+    unique_for = kwargs.pop('unique_for', None)
+    if unique_for is not None and unique_key is None:
+        raise TypeError('unique_for requires unique_key')
+    batch_size = kwargs.pop('batch_size', None)
+    batch_window = kwargs.pop('batch_window', 1)
+    if batch_size is not None and (not isinstance(batch_size, int) or batch_size < 1):
+        raise ValueError('batch_size must be a positive integer')
+    if batch_size is not None and unique_key is not None:
+        raise TypeError('unique_key is not supported with batch_size')
+
     kwargs['result_ttl'] = kwargs.get('result_ttl', get_result_ttl(queue_name))
     kwargs['connection'] = connection
-    decorator = _rq_job(queue, *args, **kwargs)
+    rq_decorator = _rq_job(queue, *args, **kwargs)
+    decorator: Callable[..., Any] = rq_decorator
+    if batch_size is not None:
+        decorator = batched(rq_decorator, batch_size, batch_window)
+    if max_concurrency is not None:
+        decorator = _limit_concurrency(decorator, concurrency_key, max_concurrency)
+    if unique_key is not None:
+        decorator = _make_unique(decorator, unique_key, unique_for)
     if func:
         return decorator(func)
     return decorator
+
+
+def _limit_concurrency(decorator: Callable, concurrency_key: Any, max_concurrency: int) -> Callable:
+    """Sets the ``concurrency_limit`` that workers enforce on the decorated function"""
+
+    def wrapper(f):
+        f = decorator(f)
+        f.concurrency_limit = ConcurrencyLimit(concurrency_key or f'{f.__module__}.{f.__qualname__}', max_concurrency)
+        return f
+
+    return wrapper
+
+
+def _make_unique(decorator: Callable, unique_key: Any, unique_for: Optional[int]) -> Callable:
+    """Sets the ``unique_key`` and ``unique_for`` that ``DjangoRQ`` uses to suppress duplicates"""
+
+    def wrapper(f):
+        f = decorator(f)
+        f.unique_key = unique_key
+        f.unique_for = unique_for
+        return f
+
+    return wrapper
@@ -0,0 +1,88 @@
+"""
+Queries several Redis servers concurrently, each on its own thread, so
+collecting statistics from queues spread over several servers takes as long
+as the slowest server instead of all of them added up. Servers that don't
+answer within ``STATS_TIMEOUT`` seconds are left out, configured in
+settings.py:
+RQ = {
+    'STATS_TIMEOUT': 5,
+}
+"""
+
+import contextvars
+import threading
+from collections.abc import Sequence
+from concurrent.futures import Future, wait
+from typing import Callable, Optional, TypeVar, Union
+
+from django.conf import settings
+
+DEFAULT_STATS_TIMEOUT = 5
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def get_stats_timeout() -> Optional[float]:
+    """Returns the seconds to wait for each Redis server, ``None`` to wait as long as it takes"""
+    return getattr(settings, 'RQ', {}).get('STATS_TIMEOUT', DEFAULT_STATS_TIMEOUT)
+
+
+def _run(future: Future, context: contextvars.Context, func: Callable[[T], R], item: T) -> None:
+    try:
+        future.set_result(context.run(func, item))
+    except BaseException as e:
+        future.set_exception(e)
+
+
+def describe_error(exception: BaseException) -> str:
+    """Returns a one line description of ``exception``, short enough to be shown next to a queue"""
+    message = str(exception).splitlines()[0] if str(exception) else ''
+    description = f'{exception.__class__.__name__}: {message}' if message else exception.__class__.__name__
+    return description[:200]
+
+
+def fan_out(func: Callable[[T], R], items: Sequence[T], timeout: Optional[float] = None) -> list[Union[R, Exception]]:
+    """
+    Calls ``func`` with each of ``items``, typically a group of queues sharing
+    a Redis connection, concurrently. Returns the results in the order of
+    ``items``, or the exception raised by ``func`` for an item. Calls that
+    haven't returned within ``timeout`` seconds, ``STATS_TIMEOUT`` by default,
+    get a ``TimeoutError``; they keep running in the background until their
+    Redis connection times out.
+
+    Calls don't share a pool of threads: a server that never answers only
+    holds the threads of its own calls, which are daemon threads so they
+    don't keep the process from exiting. A single item is called in the
+    calling thread, without a timeout.
+    """
+    if len(items) <= 1:
+        results: list[Union[R, Exception]] = []
+        for item in items:
+            try:
+                results.append(func(item))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    if timeout is None:
+        timeout = get_stats_timeout()
+    futures: list[Future] = []
+    for item in items:
+        future: Future = Future()
+        # Each call runs in a copy of the caller's context, for Redis usage to
+        # be recorded by the caller's trackers
+        args = (future, contextvars.copy_context(), func, item)
+        threading.Thread(target=_run, args=args, name='django_rq_stats', daemon=True).start()
+        futures.append(future)
+    wait(futures, timeout=timeout)
+
+    results = []
+    for future in futures:
+        if not future.done():
+            results.append(TimeoutError(f'No answer within {timeout} seconds'))
+        elif future.exception() is not None:
+            results.append(future.exception())  # type: ignore[arg-type]
+        else:
+            results.append(future.result())
+    return results
@@ -0,0 +1,140 @@
+"""
+Throughput, failure rate and duration of jobs per function, aggregated by
+workers into one Redis hash per minute. Buckets are kept for
+``FUNCTION_STATS_TTL`` seconds, configured in settings.py:
+RQ = {
+    'FUNCTION_STATS_TTL': 86400,
+}
+"""
+
+import time
+from collections import defaultdict
+from typing import Any, Optional
+
+from django.conf import settings
+from redis import Redis
+from redis.client import Pipeline
+from rq.job import Job
+
+from .connection_utils import get_redis_connection, get_unique_connection_configs
+from .fanout import fan_out
+
+FUNCTION_STATS_KEY_PREFIX = 'rq:function-stats:'
+
+DEFAULT_FUNCTION_STATS_TTL = 24 * 60 * 60
+
+# Minutes of statistics shown by default
+DEFAULT_WINDOW = 60
+
+# Upper bounds of the duration histogram, in seconds, used to estimate percentiles
+DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, float('inf'))
+
+
+def get_function_stats_ttl() -> int:
+    return getattr(settings, 'RQ', {}).get('FUNCTION_STATS_TTL', DEFAULT_FUNCTION_STATS_TTL)
+
+
+def get_function_stats_key(minute: int) -> str:
+    return f'{FUNCTION_STATS_KEY_PREFIX}{minute}'
+
+
+def get_duration_bucket(duration: float) -> str:
+    return next(f'le_{bucket:g}' for bucket in DURATION_BUCKETS if duration <= bucket)
+
+
+def record_job(pipeline: Pipeline, job: Job, finished: bool) -> None:
+    """
+    Adds the execution of ``job`` to the statistics of the current minute,
+    as part of ``pipeline``. Jobs that didn't finish, including jobs retried
+    or stopped, count as failed.
+    """
+    try:
+        func_name = job.func_name
+    except Exception:
+        # The job's data can't be loaded, e.g. its function no longer exists
+        return
+    if func_name is None:
+        return
+
+    key = get_function_stats_key(int(time.time() // 60))
+    status = 'finished' if finished else 'failed'
+    pipeline.hincrby(key, f'{func_name}:{status}', 1)
+    if job.started_at is not None and job.ended_at is not None:
+        duration = (job.ended_at - job.started_at).total_seconds()
+        pipeline.hincrbyfloat(key, f'{func_name}:duration', duration)
+        pipeline.hincrby(key, f'{func_name}:{get_duration_bucket(duration)}', 1)
+    pipeline.expire(key, get_function_stats_ttl())
+
+
+def get_buckets(connection: Redis, minutes: int = DEFAULT_WINDOW) -> list[dict[bytes, bytes]]:
+    """Returns the buckets of the last ``minutes`` minutes, including the current one, in a single round trip"""
+    now = int(time.time() // 60)
+    with connection.pipeline(transaction=False) as pipeline:
+        for minute in range(now - minutes + 1, now + 1):
+            pipeline.hgetall(get_function_stats_key(minute))
+        return pipeline.execute()
+
+
+def percentile(histogram: dict[float, int], count: int, percent: float) -> Optional[float]:
+    """
+    Returns the upper bound of the histogram bucket holding the ``percent``
+    percentile, or ``None`` if it's in the last, unbounded bucket
+    """
+    rank = percent / 100 * count
+    cumulative = 0
+    for bucket in DURATION_BUCKETS:
+        cumulative += histogram.get(bucket, 0)
+        if cumulative >= rank:
+            return None if bucket == float('inf') else bucket
+    return None
+
+
+def summarize(buckets: list[dict[bytes, bytes]], minutes: int = DEFAULT_WINDOW) -> list[dict[str, Any]]:
+    """Returns the statistics of each function in ``buckets``, busiest functions first"""
+    totals: dict[str, dict[str, Any]] = defaultdict(
+        lambda: {'finished': 0, 'failed': 0, 'duration': 0.0, 'histogram': defaultdict(int)}
+    )
+    for bucket in buckets:
+        for field, value in bucket.items():
+            func_name, _, stat = field.decode().rpartition(':')
+            if stat.startswith('le_'):
+                totals[func_name]['histogram'][float(stat[3:])] += int(value)
+            elif stat == 'duration':
+                totals[func_name]['duration'] += float(value)
+            else:
+                totals[func_name][stat] += int(value)
+
+    functions = []
+    for func_name, total in totals.items():
+        count = total['finished'] + total['failed']
+        timed = sum(total['histogram'].values())
+        functions.append(
+            {
+                'func': func_name,
+                'jobs': count,
+                'finished': total['finished'],
+                'failed': total['failed'],
+                'jobs_per_minute': count / minutes,
+                'failure_rate': total['failed'] / count if count else 0,
+                'mean_duration': total['duration'] / timed if timed else None,
+                'p95_duration': percentile(total['histogram'], timed, 95) if timed else None,
+            }
+        )
+    functions.sort(key=lambda function: function['jobs'], reverse=True)
+    return functions
+
+
+def get_function_statistics(minutes: int = DEFAULT_WINDOW) -> list[dict[str, Any]]:
+    """Returns the statistics of each function over the last ``minutes`` minutes, across all Redis connections"""
+
+    def get_connection_buckets(config: dict[str, Any]) -> list[dict[bytes, bytes]]:
+        return get_buckets(get_redis_connection(config), minutes)
+
+    buckets = []
+    # Redis servers are queried concurrently
+    for result in fan_out(get_connection_buckets, get_unique_connection_configs()):
+        # Skip configs that fail to create a connection
+        # (e.g., USE_REDIS_CACHE without django-redis installed)
+        if not isinstance(result, Exception):
+            buckets.extend(result)
+    return summarize(buckets, minutes)
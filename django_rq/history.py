@@ -0,0 +1,158 @@
+"""
+Downsampled history of the number of jobs in each queue, kept in Redis as
+ring buffers: one sample per minute for a day and one per hour for 30 days.
+Each sample is the highest depth seen in its minute or hour.
+
+Depths are sampled by workers, every time they run maintenance tasks, and
+by ``record_all_queue_depths()``, which can be scheduled with ``rqcron`` for
+a sample every minute:
+cron.register(record_all_queue_depths, queue_name='default', interval=60)
+"""
+
+import time
+from typing import NamedTuple, Optional
+
+from redis.commands.core import Script
+from rq.queue import Queue
+
+from .connection_utils import filter_connection_params
+
+HISTORY_KEY_PREFIX = 'rq:history:'
+
+
+class Resolution(NamedTuple):
+    name: str
+    # Seconds covered by a sample
+    interval: int
+    # Number of samples kept
+    length: int
+
+
+MINUTELY = Resolution('minute', 60, 24 * 60)
+HOURLY = Resolution('hour', 60 * 60, 30 * 24)
+RESOLUTIONS = (MINUTELY, HOURLY)
+
+# Slots hold "<bucket>:<depth>", where bucket is the sample's timestamp
+# divided by the resolution's interval. Slots left over from a previous
+# round of the ring are overwritten, samples in the same bucket keep the max.
+RECORD_SAMPLE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[2])
+if current then
+    local bucket, depth = string.match(current, '^(%d+):(%d+)$')
+    if bucket == ARGV[1] and tonumber(depth) >= tonumber(ARGV[3]) then
+        return 0
+    end
+end
+redis.call('HSET', KEYS[1], ARGV[2], ARGV[1] .. ':' .. ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+_scripts: dict[str, Script] = {}
+
+
+def get_history_key(queue_name: str, resolution: Resolution) -> str:
+    return f'{HISTORY_KEY_PREFIX}{queue_name}:{resolution.name}'
+
+
+def record_queue_depths(queues: list[Queue], timestamp: Optional[float] = None) -> None:
+    """
+    Samples the number of jobs in ``queues``, which must share their Redis
+    connection, in two round trips
+    """
+    if not queues:
+        return
+    connection = queues[0].connection
+    if timestamp is None:
+        timestamp = time.time()
+
+    with connection.pipeline(transaction=False) as pipeline:
+        for queue in queues:
+            pipeline.llen(queue.key)
+        depths = pipeline.execute()
+
+    if RECORD_SAMPLE_SCRIPT not in _scripts:
+        _scripts[RECORD_SAMPLE_SCRIPT] = connection.register_script(RECORD_SAMPLE_SCRIPT)
+    script = _scripts[RECORD_SAMPLE_SCRIPT]
+    with connection.pipeline(transaction=False) as pipeline:
+        for queue, depth in zip(queues, depths):
+            for resolution in RESOLUTIONS:
+                bucket = int(timestamp // resolution.interval)
+                script(
+                    keys=[get_history_key(queue.name, resolution)],
+                    args=[bucket, bucket % resolution.length, depth, resolution.interval * resolution.length],
+                    client=pipeline,
+                )
+        pipeline.execute()
+
+
+def get_queue_groups(queue_names: Optional[list[str]] = None) -> list[list[Queue]]:
+    """
+    Returns the queues named ``queue_names``, all queues by default, grouped
+    by Redis connection. Queues whose connection can't be created are left out.
+    """
+    from .queues import get_queue
+    from .settings import QUEUES
+
+    if queue_names is None:
+        queue_names = sorted(QUEUES)
+    groups: list[tuple[dict, list[Queue]]] = []
+    for queue_name in queue_names:
+        connection_params = filter_connection_params(QUEUES[queue_name])
+        for params, queues in groups:
+            if params == connection_params:
+                queues.append(get_queue(queue_name, connection=queues[0].connection))
+                break
+        else:
+            try:
+                queue = get_queue(queue_name)
+            except Exception:
+                # e.g., USE_REDIS_CACHE without django-redis installed
+                continue
+            groups.append((connection_params, [queue]))
+    return [queues for _, queues in groups]
+
+
+def record_all_queue_depths() -> None:
+    """Samples the number of jobs in all queues, meant to be run every minute"""
+    for queues in get_queue_groups():
+        record_queue_depths(queues)
+
+
+def parse_history(
+    samples: dict[bytes, bytes], resolution: Resolution, timestamp: Optional[float] = None
+) -> list[Optional[int]]:
+    """
+    Returns the depths recorded in the ring buffer ``samples``, oldest first,
+    ``None`` where no sample was taken
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    current = int(timestamp // resolution.interval)
+    depths = {}
+    for sample in samples.values():
+        bucket, depth = sample.split(b':')
+        depths[int(bucket)] = int(depth)
+    return [depths.get(bucket) for bucket in range(current - resolution.length + 1, current + 1)]
+
+
+def get_queue_depth_history(
+    queues: list[Queue], resolutions: tuple[Resolution, ...] = RESOLUTIONS
+) -> dict[str, dict[str, list[Optional[int]]]]:
+    """
+    Returns the depth history of ``queues``, which must share their Redis
+    connection, by queue name and resolution name, in a single round trip
+    """
+    if not queues:
+        return {}
+    with queues[0].connection.pipeline(transaction=False) as pipeline:
+        for queue in queues:
+            for resolution in resolutions:
+                pipeline.hgetall(get_history_key(queue.name, resolution))
+        results = iter(pipeline.execute())
+
+    timestamp = time.time()
+    return {
+        queue.name: {resolution.name: parse_history(next(results), resolution, timestamp) for resolution in resolutions}
+        for queue in queues
+    }
@@ -0,0 +1,211 @@
+"""
+Opt-in counting of the Redis commands, round trips, bytes and time spent by
+django-rq, enabled in settings.py:
+RQ = {
+    'REDIS_INSTRUMENTATION': True,
+}
+"""
+
+import logging
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable
+
+from django.conf import settings
+from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+# Stats of the trackers active in the current thread or task, innermost last
+_trackers: ContextVar[tuple['RedisStats', ...]] = ContextVar('django_rq_redis_trackers', default=())
+
+
+def is_instrumentation_enabled() -> bool:
+    return getattr(settings, 'RQ', {}).get('REDIS_INSTRUMENTATION', False)
+
+
+class RedisStats:
+    """Redis usage recorded by ``track_redis()``"""
+
+    def __init__(self) -> None:
+        self.commands = 0
+        self.round_trips = 0
+        # Connecting sends a few commands of its own, such as HELLO and SELECT
+        self.connections = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.time = 0.0
+        self.command_counts: Counter[str] = Counter()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'commands': self.commands,
+            'round_trips': self.round_trips,
+            'connections': self.connections,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'time': self.time,
+            'command_counts': dict(self.command_counts.most_common()),
+        }
+
+    def __str__(self) -> str:
+        return (
+            f'{self.commands} Redis commands in {self.round_trips} round trips, {self.connections} new connections, '
+            f'{self.bytes_sent} bytes sent, {self.bytes_received} bytes received, {self.time * 1000:.1f} ms'
+        )
+
+
+@contextmanager
+def track_redis() -> Iterator[RedisStats]:
+    """
+    Records the usage of instrumented Redis connections within the block.
+    Trackers can be nested, outer trackers include the usage of inner ones.
+    """
+    stats = RedisStats()
+    token = _trackers.set(_trackers.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _trackers.reset(token)
+
+
+class _CountingSocket:
+    """Proxies a socket, counting the bytes sent and received"""
+
+    def __init__(self, sock) -> None:
+        self._sock = sock
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._sock, name)
+
+    def sendall(self, data, *args) -> None:
+        for stats in _trackers.get():
+            stats.bytes_sent += len(data)
+        self._sock.sendall(data, *args)
+
+    def recv(self, *args) -> bytes:
+        data = self._sock.recv(*args)
+        for stats in _trackers.get():
+            stats.bytes_received += len(data)
+        return data
+
+    def recv_into(self, *args) -> int:
+        size = self._sock.recv_into(*args)
+        for stats in _trackers.get():
+            stats.bytes_received += size
+        return size
+
+
+class InstrumentedConnectionMixin:
+    """Mixed into the connection class of instrumented connection pools"""
+
+    def _connect(self):
+        for stats in _trackers.get():
+            stats.connections += 1
+        return _CountingSocket(super()._connect())  # type: ignore[misc]
+
+    def send_command(self, *args, **kwargs) -> None:
+        for stats in _trackers.get():
+            stats.commands += 1
+            stats.command_counts[str(args[0]).upper()] += 1
+        super().send_command(*args, **kwargs)  # type: ignore[misc]
+
+    def pack_commands(self, commands) -> list:
+        # Pipelines send all their commands at once
+        commands = list(commands)
+        for stats in _trackers.get():
+            stats.commands += len(commands)
+            stats.command_counts.update(str(command[0]).upper() for command in commands)
+        return super().pack_commands(commands)  # type: ignore[misc]
+
+    def send_packed_command(self, *args, **kwargs) -> None:
+        trackers = _trackers.get()
+        start = time.perf_counter()
+        try:
+            super().send_packed_command(*args, **kwargs)  # type: ignore[misc]
+        finally:
+            elapsed = time.perf_counter() - start
+            for stats in trackers:
+                stats.round_trips += 1
+                stats.time += elapsed
+
+    def read_response(self, *args, **kwargs) -> Any:
+        trackers = _trackers.get()
+        start = time.perf_counter()
+        try:
+            return super().read_response(*args, **kwargs)  # type: ignore[misc]
+        finally:
+            elapsed = time.perf_counter() - start
+            for stats in trackers:
+                stats.time += elapsed
+
+
+_connection_classes: dict[type, type] = {}
+
+
+def instrument_connection(connection: Redis) -> Redis:
+    """
+    Makes the connections of ``connection``'s pool record their usage in
+    ``track_redis()`` blocks. Connections already open in the pool aren't
+    instrumented.
+    """
+    pool = connection.connection_pool
+    connection_class = pool.connection_class
+    if issubclass(connection_class, InstrumentedConnectionMixin):
+        return connection
+    if connection_class not in _connection_classes:
+        _connection_classes[connection_class] = type(
+            f'Instrumented{connection_class.__name__}', (InstrumentedConnectionMixin, connection_class), {}
+        )
+    pool.connection_class = _connection_classes[connection_class]
+    return connection
+
+
+@contextmanager
+def log_redis_usage(label: str) -> Iterator[None]:
+    """
+    Logs the Redis usage of a block, or of a function when used as a
+    decorator, if instrumentation is enabled
+    """
+    if not is_instrumentation_enabled():
+        yield
+        return
+    with track_redis() as stats:
+        try:
+            yield
+        finally:
+            logger.info('%s: %s', label, stats)
+
+
+RESPONSE_HEADERS = {
+    'commands': 'X-Redis-Commands',
+    'round_trips': 'X-Redis-Round-Trips',
+    'connections': 'X-Redis-Connections',
+    'bytes_sent': 'X-Redis-Bytes-Sent',
+    'bytes_received': 'X-Redis-Bytes-Received',
+}
+
+
+def instrument_view(view: Callable) -> Callable:
+    """
+    Adds the Redis usage of a view to its response headers and logs it, if
+    instrumentation is enabled
+    """
+
+    @wraps(view)
+    def instrumented_view(request, *args, **kwargs):
+        if not is_instrumentation_enabled():
+            return view(request, *args, **kwargs)
+        with track_redis() as stats:
+            response = view(request, *args, **kwargs)
+        for key, header in RESPONSE_HEADERS.items():
+            response[header] = str(getattr(stats, key))
+        response['X-Redis-Time'] = f'{stats.time * 1000:.3f}'
+        logger.info('%s %s: %s', request.method, request.path, stats)
+        return response
+
+    return instrumented_view
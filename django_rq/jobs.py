@@ -1,4 +1,6 @@
-from typing import Optional, Union, cast
+from collections.abc import Sequence
+from inspect import signature
+from typing import Any, Callable, Optional, Union, cast
 
 from django.conf import settings
 from rq.job import Job
@@ -23,3 +25,21 @@ def get_job_class(job_class: Optional[Union[str, type[Job]]] = None) -> type[Job
     if isinstance(job_class, str):
         job_class = cast(type[Job], import_attribute(job_class))
     return job_class
+
+
+def format_job_key(
+    key: Union[str, Callable[..., Any]], func: Callable, args: Sequence[Any], kwargs: dict[str, Any]
+) -> str:
+    """
+    Returns the key of a job calling ``func`` with ``args`` and ``kwargs``.
+    ``key`` is either a string formatted with the job's arguments by name,
+    such as ``"report:{customer_id}"``, or a callable that is called with the
+    job's arguments and returns the key.
+    """
+    if callable(key):
+        return str(key(*args, **kwargs))
+    if '{' not in key:
+        return key
+    arguments = signature(func).bind(*args, **kwargs)
+    arguments.apply_defaults()
+    return key.format(**arguments.arguments)
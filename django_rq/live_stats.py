@@ -0,0 +1,253 @@
+"""
+Live statistics of queues, polled by ``rqstats --top``. Each poll takes a
+single round trip per Redis connection, however many workers there are.
+
+Enqueue and dequeue rates are derived from the difference between two polls:
+workers count the jobs they perform in ``rq:processed:<queue>``, and jobs
+enqueued are the jobs performed plus the growth of the queue and of its
+started jobs.
+"""
+
+import hashlib
+import time
+from datetime import timezone
+from typing import Any, Optional
+
+from redis import Redis
+from redis.client import Pipeline
+from redis.exceptions import NoScriptError
+from rq.job import Job
+from rq.queue import Queue
+from rq.registry import (
+    DeferredJobRegistry,
+    FailedJobRegistry,
+    FinishedJobRegistry,
+    ScheduledJobRegistry,
+    StartedJobRegistry,
+)
+from rq.utils import utcparse
+from rq.worker_registration import WORKERS_BY_QUEUE_KEY
+
+from .fanout import fan_out
+from .history import get_queue_groups
+
+PROCESSED_KEY_PREFIX = 'rq:processed:'
+
+REGISTRIES = {
+    'started': StartedJobRegistry,
+    'deferred': DeferredJobRegistry,
+    'scheduled': ScheduledJobRegistry,
+    'finished': FinishedJobRegistry,
+    'failed': FailedJobRegistry,
+}
+
+# Returns the enqueue time of the job at the head of the queue, followed by
+# the state and number of the queue's workers. Workers whose key expired,
+# but which are still registered, are left out.
+QUEUE_SCRIPT = """
+local result = {false}
+local job_id = redis.call('LINDEX', KEYS[1], 0)
+if job_id then
+    result[1] = redis.call('HGET', ARGV[1] .. job_id, 'enqueued_at')
+end
+local states = {}
+for _, worker_key in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    local state = redis.call('HGET', worker_key, 'state')
+    if state then
+        states[state] = (states[state] or 0) + 1
+    end
+end
+for state, count in pairs(states) do
+    table.insert(result, state)
+    table.insert(result, count)
+end
+return result
+"""
+
+QUEUE_SCRIPT_SHA = hashlib.sha1(QUEUE_SCRIPT.encode()).hexdigest()
+
+
+def get_processed_key(queue_name: str) -> str:
+    return f'{PROCESSED_KEY_PREFIX}{queue_name}'
+
+
+def count_processed(pipeline: Pipeline, job: Job) -> None:
+    """Counts ``job`` as performed by a worker of its queue, as part of ``pipeline``"""
+    pipeline.incr(get_processed_key(job.origin))
+
+
+def _poll(connection: Redis, queues: list[Queue]) -> list[Any]:
+    with connection.pipeline(transaction=False) as pipeline:
+        for queue in queues:
+            pipeline.llen(queue.key)
+            for registry_class in REGISTRIES.values():
+                pipeline.zcard(registry_class(queue.name, connection=connection).key)
+            pipeline.get(get_processed_key(queue.name))
+            pipeline.evalsha(
+                QUEUE_SCRIPT_SHA, 2, queue.key, WORKERS_BY_QUEUE_KEY % queue.name, Job.redis_job_namespace_prefix
+            )
+        return pipeline.execute()
+
+
+def poll_queues(queues: list[Queue], timestamp: Optional[float] = None) -> list[dict[str, Any]]:
+    """
+    Returns the statistics of ``queues``, which must share their Redis
+    connection, in a single round trip
+    """
+    if not queues:
+        return []
+    connection = queues[0].connection
+    if timestamp is None:
+        timestamp = time.time()
+
+    try:
+        results = iter(_poll(connection, queues))
+    except NoScriptError:
+        # Unlike redis-py's scripts, which check the script exists before
+        # every pipeline, the script is only loaded when Redis lacks it
+        connection.script_load(QUEUE_SCRIPT)
+        results = iter(_poll(connection, queues))
+
+    statistics = []
+    for queue in queues:
+        queue_data: dict[str, Any] = {'name': queue.name, 'timestamp': timestamp, 'queued': next(results)}
+        for name in REGISTRIES:
+            queue_data[name] = next(results)
+        queue_data['processed'] = int(next(results) or 0)
+
+        enqueued_at, *states = next(results)
+        if enqueued_at:
+            oldest = utcparse(enqueued_at.decode()).replace(tzinfo=timezone.utc)
+            queue_data['oldest_job_age'] = max(0.0, timestamp - oldest.timestamp())
+        else:
+            queue_data['oldest_job_age'] = None
+        queue_data['worker_states'] = {state.decode(): int(count) for state, count in zip(states[::2], states[1::2])}
+        queue_data['workers'] = sum(queue_data['worker_states'].values())
+        statistics.append(queue_data)
+    return statistics
+
+
+def poll_all_queues(
+    queue_names: Optional[list[str]] = None, groups: Optional[list[list[Queue]]] = None
+) -> list[dict[str, Any]]:
+    """
+    Returns the statistics of the queues named ``queue_names``, all queues by
+    default. Queues on Redis servers that fail or don't answer in time are
+    left out.
+
+    Repeated polls should pass the ``groups`` of queues returned by
+    ``get_queue_groups()``, so that their Redis connections are reused.
+    """
+    if groups is None:
+        groups = get_queue_groups(queue_names)
+    statistics = []
+    # Redis servers are polled concurrently
+    for result in fan_out(poll_queues, groups):
+        if not isinstance(result, Exception):
+            statistics.extend(result)
+    return statistics
+
+
+def add_rates(statistics: list[dict[str, Any]], previous: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Adds the ``enqueue_rate`` and ``dequeue_rate`` of each queue, in jobs per
+    second since its ``previous`` statistics. Rates are ``None`` for queues
+    without previous statistics.
+    """
+    previous_by_name = {queue_data['name']: queue_data for queue_data in previous}
+    for queue_data in statistics:
+        queue_data['enqueue_rate'] = queue_data['dequeue_rate'] = None
+        before = previous_by_name.get(queue_data['name'])
+        if before is None:
+            continue
+        elapsed = queue_data['timestamp'] - before['timestamp']
+        if elapsed <= 0:
+            continue
+        # Counters are reset when their key is deleted
+        dequeued = max(0, queue_data['processed'] - before['processed'])
+        enqueued = dequeued + queue_data['queued'] - before['queued'] + queue_data['started'] - before['started']
+        queue_data['dequeue_rate'] = dequeued / elapsed
+        # Jobs deleted from the queue would otherwise make the rate negative
+        queue_data['enqueue_rate'] = max(0, enqueued) / elapsed
+    return statistics
+
+
+def format_age(seconds: Optional[float]) -> str:
+    """Formats ``seconds`` compactly, e.g. "42s", "3m20s" or "5h02m" """
+    if seconds is None:
+        return '-'
+    seconds = int(seconds)
+    if seconds < 60:
+        return f'{seconds}s'
+    if seconds < 60 * 60:
+        return f'{seconds // 60}m{seconds % 60:02d}s'
+    if seconds < 24 * 60 * 60:
+        return f'{seconds // 3600}h{seconds % 3600 // 60:02d}m'
+    return f'{seconds // 86400}d{seconds % 86400 // 3600:02d}h'
+
+
+# Keys the statistics can be sorted by, in the order they are cycled through
+SORT_KEYS = ('name', 'queued', 'enqueue_rate', 'dequeue_rate', 'oldest_job_age', 'started', 'failed', 'workers')
+
+COLUMNS = (
+    # Heading, width, key
+    ('Queue', -20, 'name'),
+    ('Queued', 9, 'queued'),
+    ('Enq/s', 8, 'enqueue_rate'),
+    ('Deq/s', 8, 'dequeue_rate'),
+    ('Oldest', 8, 'oldest_job_age'),
+    ('Started', 8, 'started'),
+    ('Deferred', 9, 'deferred'),
+    ('Scheduled', 10, 'scheduled'),
+    ('Failed', 8, 'failed'),
+    ('Workers', 8, 'workers'),
+    ('Busy', 6, 'busy'),
+    ('Idle', 6, 'idle'),
+    ('Suspended', 10, 'suspended'),
+)
+
+
+def sort_statistics(
+    statistics: list[dict[str, Any]], sort_key: str = 'name', reverse: bool = False, name_filter: str = ''
+) -> list[dict[str, Any]]:
+    """
+    Returns the statistics of queues whose name contains ``name_filter``,
+    sorted by ``sort_key``. Missing values, e.g. rates of the first poll, are
+    sorted last.
+    """
+    statistics = [queue_data for queue_data in statistics if name_filter.lower() in queue_data['name'].lower()]
+    present = [queue_data for queue_data in statistics if queue_data[sort_key] is not None]
+    missing = [queue_data for queue_data in statistics if queue_data[sort_key] is None]
+    present.sort(key=lambda queue_data: queue_data[sort_key], reverse=reverse)
+    return present + missing
+
+
+def format_value(key: str, value: Any) -> str:
+    if value is None:
+        return '-'
+    if key == 'oldest_job_age':
+        return format_age(value)
+    if isinstance(value, float):
+        return f'{value:.1f}'
+    return str(value)
+
+
+def format_row(queue_data: dict[str, Any]) -> str:
+    values = {
+        **queue_data,
+        **{state: queue_data['worker_states'].get(state, 0) for state in ('busy', 'idle', 'suspended')},
+    }
+    cells = []
+    for _, width, key in COLUMNS:
+        text = format_value(key, values.get(key))
+        cells.append(text[: abs(width)].ljust(-width) if width < 0 else text.rjust(width))
+    return ' '.join(cells)
+
+
+def format_header(sort_key: str, reverse: bool) -> str:
+    cells = []
+    for heading, width, key in COLUMNS:
+        if key == sort_key:
+            heading = ('v' if reverse else '^') + heading
+        cells.append(heading.ljust(-width) if width < 0 else heading.rjust(width))
+    return ' '.join(cells)
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 
 from ... import get_queue
+from ...instrumentation import log_redis_usage
 
 
 class Command(BaseCommand):
@@ -16,6 +17,7 @@ class Command(BaseCommand):
         parser.add_argument('--timeout', '-t', type=int, dest='timeout', help='A timeout in seconds')
         parser.add_argument('args', nargs='*')
 
+    @log_redis_usage('rqenqueue')
     def handle(self, *args, **options):
         """
         Queues the function given with the first argument with the
@@ -1,12 +1,14 @@
 from django.core.management.base import BaseCommand
 from rq.suspension import resume
 
+from ...instrumentation import log_redis_usage
 from ...queues import get_connection
 
 
 class Command(BaseCommand):
     help = "Resume all queues."
 
+    @log_redis_usage('rqresume')
     def handle(self, *args, **options):
         connection = get_connection()
         resume(connection)
@@ -0,0 +1,66 @@
+import json
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from ...instrumentation import log_redis_usage
+from ...queues import get_queue
+from ...settings import get_queues_list
+from ...slowlog import clear_slowlog, get_slow_jobs, get_slowest_functions
+
+
+class Command(BaseCommand):
+    """
+    Print the slowest functions of the slow job log
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument('queues', nargs='*', help='Queues to report on [all queues]')
+        parser.add_argument('--top', '-n', type=int, default=10, help='Number of functions to print [10]')
+        parser.add_argument('--recent', '-r', type=int, default=0, help='Also print the N most recent slow jobs')
+        parser.add_argument('--json', '-j', action='store_true', help='Output the report as JSON')
+        parser.add_argument('--clear', action='store_true', help='Clear the slow job log of the queues')
+
+    @log_redis_usage('rqslowlog')
+    def handle(self, *args, **options):
+        queue_names = options['queues'] or [queue['name'] for queue in get_queues_list()]
+        report: dict[str, dict[str, Any]] = {}
+        for queue_name in queue_names:
+            queue = get_queue(queue_name)
+            if options['clear']:
+                clear_slowlog(queue.connection, queue_name)
+                continue
+            slow_jobs = get_slow_jobs(queue.connection, queue_name)
+            report[queue_name] = {
+                'slow_jobs': len(slow_jobs),
+                'functions': get_slowest_functions(slow_jobs, options['top']),
+                'recent': slow_jobs[: options['recent']],
+            }
+
+        if options['clear']:
+            self.stdout.write(f'Cleared the slow job log of {", ".join(queue_names)}')
+            return
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, default=str))
+            return
+
+        for queue_name, queue_report in report.items():
+            self.stdout.write(f'{queue_name}: {queue_report["slow_jobs"]} slow jobs')
+            if not queue_report['functions']:
+                self.stdout.write('')
+                continue
+            self.stdout.write(f'{"Function":<50} {"Count":>6} {"p50":>9} {"p95":>9} {"p99":>9} {"Max":>9}')
+            for function in queue_report['functions']:
+                self.stdout.write(
+                    f'{function["func"]:<50} {function["count"]:>6} {function["p50"]:>9.3f} '
+                    f'{function["p95"]:>9.3f} {function["p99"]:>9.3f} {function["max"]:>9.3f}'
+                )
+            for slow_job in queue_report['recent']:
+                self.stdout.write(
+                    f'  {slow_job["logged_at"]:%Y-%m-%d %H:%M:%S} {slow_job["job_id"]} {slow_job["func"]} '
+                    f'{slow_job["duration"]:.3f}s on {slow_job["worker"]}'
+                )
+            self.stdout.write('')
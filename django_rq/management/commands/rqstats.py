@@ -1,10 +1,16 @@
+import sys
 import time
 
 import click
 from django.core.management.base import BaseCommand, CommandError
 
+from ...history import get_queue_groups
+from ...instrumentation import log_redis_usage
+from ...live_stats import SORT_KEYS, add_rates, format_header, format_row, poll_all_queues, sort_statistics
 from ...utils import get_statistics
 
+TOP_HELP = 'q: quit  s: sort  r: reverse  /: filter  esc: clear filter'
+
 
 class Command(BaseCommand):
     """
@@ -40,6 +46,14 @@ class Command(BaseCommand):
             help='Poll statistics every N seconds',
         )
 
+        parser.add_argument(
+            '-t',
+            '--top',
+            action='store_true',
+            dest='top',
+            help='Show live statistics and rates in a full screen dashboard, refreshed every --interval seconds [1]',
+        )
+
     def _print_separator(self):
         try:
             click.echo(self._separator)
@@ -70,12 +84,12 @@ class Command(BaseCommand):
                 """| %-15s|%10s |%10s |%10s |%10s |%10s |%10s |"""
                 % (
                     queue["name"],
-                    queue["jobs"],
-                    queue["started_jobs"],
-                    queue["deferred_jobs"],
-                    queue["finished_jobs"],
-                    queue["failed_jobs"],
-                    queue["workers"],
+                    queue.get("jobs", "-"),
+                    queue.get("started_jobs", "-"),
+                    queue.get("deferred_jobs", "-"),
+                    queue.get("finished_jobs", "-"),
+                    queue.get("failed_jobs", "-"),
+                    queue.get("workers", "-"),
                 )
             )
 
@@ -85,6 +99,7 @@ class Command(BaseCommand):
             click.echo()
             click.echo("Press 'Ctrl+c' to quit")
 
+    @log_redis_usage('rqstats')
     def handle(self, *args, **options):
         if options.get("json"):
             import json
@@ -105,6 +120,14 @@ class Command(BaseCommand):
 
         self.interval = options.get("interval")
 
+        if options.get("top"):
+            if not sys.stdout.isatty():
+                raise CommandError("--top requires a terminal.")
+            import curses
+
+            curses.wrapper(self._run_top, self.interval or 1)
+            return
+
         # Arbitrary
         self.table_width = 90
 
@@ -113,10 +136,77 @@ class Command(BaseCommand):
             self._print_stats_dashboard(get_statistics())
             return
 
-        # Abuse clicks to 'live' render CLI dashboard TODO: Use curses instead
+        # Abuse clicks to 'live' render CLI dashboard, see --top for a curses dashboard
         try:
             while True:
                 self._print_stats_dashboard(get_statistics())
                 time.sleep(self.interval)
         except KeyboardInterrupt:
             pass
+
+    def _run_top(self, screen, interval):
+        import curses
+
+        curses.curs_set(0)
+        sort_key, reverse, name_filter = 'name', False, ''
+        statistics: list = []
+        next_poll = 0.0
+        # Polls reuse the queues' connections
+        groups = get_queue_groups()
+        try:
+            while True:
+                if time.monotonic() >= next_poll:
+                    statistics = add_rates(poll_all_queues(groups=groups), statistics)
+                    next_poll = time.monotonic() + interval
+
+                self._draw_top(
+                    screen, sort_statistics(statistics, sort_key, reverse, name_filter), sort_key, reverse, name_filter
+                )
+                screen.timeout(max(0, int((next_poll - time.monotonic()) * 1000)))
+                key = screen.getch()
+                if key in (ord('q'), ord('Q')):
+                    return
+                elif key == ord('s'):
+                    sort_key = SORT_KEYS[(SORT_KEYS.index(sort_key) + 1) % len(SORT_KEYS)]
+                    # Numbers are sorted highest first
+                    reverse = sort_key != 'name'
+                elif key == ord('r'):
+                    reverse = not reverse
+                elif key == ord('/'):
+                    name_filter = self._prompt(screen, 'Filter queues: ')
+                elif key == 27:
+                    name_filter = ''
+        except KeyboardInterrupt:
+            pass
+
+    def _draw_top(self, screen, statistics, sort_key, reverse, name_filter):
+        import curses
+
+        height, width = screen.getmaxyx()
+        screen.erase()
+        title = f'Django RQ - {len(statistics)} queues - {time.strftime("%H:%M:%S")}'
+        if name_filter:
+            title += f' - filter: {name_filter}'
+        lines = [(title, curses.A_BOLD), ('', 0), (format_header(sort_key, reverse), curses.A_REVERSE)]
+        lines.extend((format_row(queue_data), 0) for queue_data in statistics)
+        # Keep the last line for the help
+        for y, (line, attributes) in enumerate(lines[: height - 1]):
+            screen.addnstr(y, 0, line, width - 1, attributes)
+        screen.addnstr(height - 1, 0, TOP_HELP, width - 1, curses.A_DIM)
+        screen.refresh()
+
+    def _prompt(self, screen, prompt):
+        import curses
+
+        height, width = screen.getmaxyx()
+        screen.move(height - 1, 0)
+        screen.clrtoeol()
+        screen.addnstr(height - 1, 0, prompt, width - 1)
+        screen.timeout(-1)
+        curses.echo()
+        curses.curs_set(1)
+        try:
+            return screen.getstr(height - 1, len(prompt), 50).decode().strip()
+        finally:
+            curses.noecho()
+            curses.curs_set(0)
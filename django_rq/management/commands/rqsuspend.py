@@ -4,6 +4,7 @@ import sys
 from django.core.management.base import BaseCommand
 from rq.suspension import suspend
 
+from ...instrumentation import log_redis_usage
 from ...queues import get_connection
 
 log = logging.getLogger(__name__)
@@ -20,6 +21,7 @@ class Command(BaseCommand):
             help="The duration in seconds to suspend the workers. If blank, workers will be suspended indefinitely",
         )
 
+    @log_redis_usage('rqsuspend')
     def handle(self, *args, **options):
         connection = get_connection()
         duration = options.get("duration")
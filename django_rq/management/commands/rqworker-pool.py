@@ -1,15 +1,27 @@
 import os
 import sys
+import time
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from rq.logutils import setup_loghandlers
 from rq.serializers import resolve_serializer
-from rq.worker_pool import WorkerPool
 
+from ...contrib.prometheus import is_multiprocess_mode, start_worker_metrics_server
 from ...jobs import get_job_class
 from ...queues import get_queues
 from ...utils import reset_db_connections
-from ...workers import get_worker_class
+from ...worker_pool import DjangoWorkerPool, get_scaling_policy_class
+from ...workers import (
+    EXECUTION_WORKER_CLASSES,
+    DjangoThreadWorker,
+    DjangoWorkerMixin,
+    get_dequeue_strategy,
+    get_exception_handlers,
+    get_preload_modules,
+    get_queues_serializer,
+    get_worker_class,
+    preload_modules,
+)
 
 
 class Command(BaseCommand):
@@ -28,6 +40,29 @@ class Command(BaseCommand):
         parser.add_argument(
             '--num-workers', action='store', dest='num_workers', type=int, default=1, help='Number of workers to spawn'
         )
+        parser.add_argument(
+            '--min-workers',
+            action='store',
+            dest='min_workers',
+            type=int,
+            default=None,
+            help='Minimum number of workers when autoscaling (defaults to 1)',
+        )
+        parser.add_argument(
+            '--max-workers',
+            action='store',
+            dest='max_workers',
+            type=int,
+            default=None,
+            help='Maximum number of workers, enables autoscaling based on queue backlog',
+        )
+        parser.add_argument(
+            '--scaling-policy',
+            action='store',
+            dest='scaling_policy',
+            default=None,
+            help='Autoscaling policy class to use',
+        )
         parser.add_argument('--worker-class', action='store', dest='worker_class', help='RQ Worker class to use')
         parser.add_argument(
             '--pid', action='store', dest='pid', default=None, help='PID file to write the worker`s pid into'
@@ -40,21 +75,97 @@ class Command(BaseCommand):
         parser.add_argument(
             '--serializer',
             action='store',
-            default='rq.serializers.DefaultSerializer',
+            default=None,
             dest='serializer',
-            help='Specify a custom Serializer.',
+            help="Specify a custom Serializer, defaults to the queues' SERIALIZER.",
+        )
+        parser.add_argument(
+            '--execution',
+            action='store',
+            default=None,
+            dest='execution',
+            choices=['fork', 'thread', 'asyncio'],
+            help='Perform jobs in forked work horses (default), in threads or on an asyncio event loop',
+        )
+        parser.add_argument(
+            '--concurrency',
+            action='store',
+            default=None,
+            dest='concurrency',
+            type=int,
+            help='Number of jobs performed at a time by each worker with --execution thread or asyncio',
+        )
+        parser.add_argument(
+            '--dequeue-strategy',
+            action='store',
+            default=None,
+            dest='dequeue_strategy',
+            choices=['default', 'random', 'round_robin', 'weighted'],
+            help='Order in which queues are checked for jobs, "weighted" uses WEIGHT in RQ_QUEUES',
+        )
+        parser.add_argument(
+            '--preload',
+            action='store',
+            default=None,
+            dest='preload',
+            help='Comma separated modules to import before forking work horses, in addition to RQ["PRELOAD_MODULES"]',
+        )
+        parser.add_argument(
+            '--metrics-port',
+            action='store',
+            default=None,
+            dest='metrics_port',
+            type=int,
+            help='Expose pool and worker metrics in Prometheus format on this port',
+        )
+        parser.add_argument(
+            '--with-scheduler',
+            action='store_true',
+            dest='with_scheduler',
+            default=True,
+            help='Run one of the pool workers with scheduler enabled (default)',
+        )
+        parser.add_argument(
+            '--without-scheduler',
+            action='store_false',
+            dest='with_scheduler',
+            help="Don't run the scheduler in any of the pool workers",
+        )
+        parser.add_argument('--name', action='store', dest='name', default=None, help='Name of the worker pool')
+        parser.add_argument(
+            '--worker-ttl',
+            action='store',
+            type=int,
+            dest='worker_ttl',
+            default=420,
+            help='Default worker timeout to be used',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            action='store',
+            default=None,
+            dest='max_jobs',
+            type=int,
+            help='Maximum number of jobs to execute per worker before it is respawned',
+        )
+        parser.add_argument(
+            '--max-idle-time',
+            action='store',
+            default=None,
+            dest='max_idle_time',
+            type=int,
+            help='Seconds to wait for job before shutting down the pool',
+        )
+        parser.add_argument(
+            '--max-memory',
+            action='store',
+            default=None,
+            dest='max_memory',
+            type=int,
+            help='Respawn workers once their memory usage exceeds this many megabytes',
         )
         parser.add_argument('args', nargs='*', type=str, help='The queues to work on, separated by space')
 
-        # Args present in `rqworker` command but not yet implemented here
-        # parser.add_argument('--worker-ttl', action='store', type=int,
-        #                     dest='worker_ttl', default=420,
-        #                     help='Default worker timeout to be used')
-        # parser.add_argument('--max-jobs', action='store', default=None, dest='max_jobs', type=int,
-        #                     help='Maximum number of jobs to execute')
-        # parser.add_argument('--with-scheduler', action='store_true', dest='with_scheduler',
-        #                     default=False, help='Run worker with scheduler enabled')
-
     def handle(self, *args, **options):
         pid = options.get('pid')
         if pid:
@@ -71,19 +182,81 @@ class Command(BaseCommand):
             logging_level = 'INFO'
         setup_loghandlers(logging_level)
 
+        scaling_policy = None
+        if options.get('max_workers') is not None:
+            min_workers = options.get('min_workers') or 1
+            if min_workers > options['max_workers']:
+                raise CommandError('--min-workers must not be greater than --max-workers')
+            scaling_policy_class = get_scaling_policy_class(options.get('scaling_policy'))
+            scaling_policy = scaling_policy_class(min_workers=min_workers, max_workers=options['max_workers'])
+        elif options.get('min_workers') is not None or options.get('scaling_policy'):
+            raise CommandError('--min-workers and --scaling-policy require --max-workers')
+
+        if options.get('metrics_port'):
+            if not is_multiprocess_mode():
+                self.stderr.write(
+                    'PROMETHEUS_MULTIPROC_DIR is not set, metrics recorded by pool workers will not be exposed'
+                )
+            try:
+                start_worker_metrics_server(options['metrics_port'])
+            except ImportError as e:
+                raise CommandError(str(e)) from e
+
+        worker_class = options.get('worker_class', None)
+        if options.get('execution'):
+            if worker_class:
+                raise CommandError('--execution and --worker-class are mutually exclusive')
+            worker_class = EXECUTION_WORKER_CLASSES[options['execution']]
+        worker_class = get_worker_class(worker_class)
+        if options.get('max_memory') is not None and not issubclass(worker_class, DjangoWorkerMixin):
+            raise CommandError('--max-memory requires a worker class based on django_rq.workers.DjangoWorker')
+        if options.get('concurrency') is not None and not issubclass(worker_class, DjangoThreadWorker):
+            raise CommandError('--concurrency requires --execution thread or asyncio')
+        dequeue_strategy = get_dequeue_strategy(options.get('dequeue_strategy'))
+        if dequeue_strategy == 'weighted' and not issubclass(worker_class, DjangoWorkerMixin):
+            raise CommandError(
+                'The weighted dequeue strategy requires a worker class based on django_rq.workers.DjangoWorker'
+            )
+
         job_class = get_job_class(options['job_class'])
         queues = get_queues(*args, **{'job_class': job_class, 'queue_class': options['queue_class']})
-        worker_class = get_worker_class(options.get('worker_class', None))
-        serializer = resolve_serializer(options['serializer'])
+        if options.get('serializer'):
+            serializer = resolve_serializer(options['serializer'])
+        else:
+            try:
+                serializer = get_queues_serializer(queues)
+            except ValueError as e:
+                raise CommandError(str(e)) from e
 
-        pool = WorkerPool(
+        pool = DjangoWorkerPool(
             queues=queues,
             connection=queues[0].connection,
             num_workers=options['num_workers'],
             serializer=serializer,
             worker_class=worker_class,
             job_class=job_class,
+            queue_class=queues[0].__class__,
+            exception_handlers=get_exception_handlers() or None,
+            scaling_policy=scaling_policy,
+            name=options['name'],
+            worker_ttl=options['worker_ttl'],
+            max_jobs=options['max_jobs'],
+            max_idle_time=options['max_idle_time'],
+            max_memory=options['max_memory'],
+            concurrency=options['concurrency'],
+            dequeue_strategy=dequeue_strategy,
+            with_scheduler=options['with_scheduler'],
         )
+
+        preload = get_preload_modules(options['preload'].split(',') if options.get('preload') else None)
+        if preload:
+            start = time.monotonic()
+            try:
+                preload_modules(preload)
+            except ImportError as e:
+                raise CommandError(str(e)) from e
+            pool.log.info('Preloaded %s in %.2f seconds', ', '.join(preload), time.monotonic() - start)
+
         # Close any opened DB connection before any fork.
         reset_db_connections()
         pool.start(burst=options.get('burst', False), logging_level=logging_level)
@@ -1,12 +1,23 @@
 import os
 import sys
+import time
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from redis.exceptions import ConnectionError
 from rq.logutils import setup_loghandlers
 
+from ...contrib.prometheus import start_worker_metrics_server
 from ...utils import reset_db_connections
-from ...workers import get_worker
+from ...workers import (
+    EXECUTION_WORKER_CLASSES,
+    DjangoThreadWorker,
+    DjangoWorkerMixin,
+    get_dequeue_strategy,
+    get_preload_modules,
+    get_worker,
+    get_worker_class,
+    preload_modules,
+)
 
 
 class Command(BaseCommand):
@@ -62,12 +73,59 @@ class Command(BaseCommand):
             type=int,
             help='Seconds to wait for job before shutting down',
         )
+        parser.add_argument(
+            '--max-memory',
+            action='store',
+            default=None,
+            dest='max_memory',
+            type=int,
+            help='Shut down gracefully after a job once memory usage exceeds this many megabytes',
+        )
         parser.add_argument(
             '--serializer',
             action='store',
-            default='rq.serializers.DefaultSerializer',
+            default=None,
             dest='serializer',
-            help='Specify a custom Serializer.',
+            help="Specify a custom Serializer, defaults to the queues' SERIALIZER.",
+        )
+        parser.add_argument(
+            '--execution',
+            action='store',
+            default=None,
+            dest='execution',
+            choices=['fork', 'thread', 'asyncio'],
+            help='Perform jobs in forked work horses (default), in threads or on an asyncio event loop',
+        )
+        parser.add_argument(
+            '--concurrency',
+            action='store',
+            default=None,
+            dest='concurrency',
+            type=int,
+            help='Number of jobs performed at a time by each worker with --execution thread or asyncio',
+        )
+        parser.add_argument(
+            '--dequeue-strategy',
+            action='store',
+            default=None,
+            dest='dequeue_strategy',
+            choices=['default', 'random', 'round_robin', 'weighted'],
+            help='Order in which queues are checked for jobs, "weighted" uses WEIGHT in RQ_QUEUES',
+        )
+        parser.add_argument(
+            '--preload',
+            action='store',
+            default=None,
+            dest='preload',
+            help='Comma separated modules to import before forking work horses, in addition to RQ["PRELOAD_MODULES"]',
+        )
+        parser.add_argument(
+            '--metrics-port',
+            action='store',
+            default=None,
+            dest='metrics_port',
+            type=int,
+            help='Expose worker metrics in Prometheus format on this port',
         )
         parser.add_argument('args', nargs='*', type=str, help='The queues to work on, separated by space')
 
@@ -87,17 +145,60 @@ class Command(BaseCommand):
             level = 'INFO'
         setup_loghandlers(level)
 
+        worker_class = options['worker_class']
+        if options.get('execution'):
+            if worker_class:
+                raise CommandError('--execution and --worker-class are mutually exclusive')
+            worker_class = EXECUTION_WORKER_CLASSES[options['execution']]
+
+        if options.get('max_memory') is not None:
+            if not issubclass(get_worker_class(worker_class), DjangoWorkerMixin):
+                raise CommandError('--max-memory requires a worker class based on django_rq.workers.DjangoWorker')
+
+        if options.get('concurrency') is not None:
+            if not issubclass(get_worker_class(worker_class), DjangoThreadWorker):
+                raise CommandError('--concurrency requires --execution thread or asyncio')
+
+        dequeue_strategy = get_dequeue_strategy(options.get('dequeue_strategy'))
+        if dequeue_strategy == 'weighted' and not issubclass(get_worker_class(worker_class), DjangoWorkerMixin):
+            raise CommandError(
+                'The weighted dequeue strategy requires a worker class based on django_rq.workers.DjangoWorker'
+            )
+
+        if options.get('metrics_port'):
+            try:
+                start_worker_metrics_server(options['metrics_port'])
+            except ImportError as e:
+                raise CommandError(str(e)) from e
+
         try:
             # Instantiate a worker
             worker_kwargs = {
-                'worker_class': options['worker_class'],
+                'worker_class': worker_class,
                 'queue_class': options['queue_class'],
                 'job_class': options['job_class'],
                 'name': options['name'],
                 'worker_ttl': options['worker_ttl'],
                 'serializer': options['serializer'],
             }
-            w = get_worker(*args, **worker_kwargs)
+            if options.get('max_memory') is not None:
+                worker_kwargs['max_memory'] = options['max_memory']
+            if options.get('concurrency') is not None:
+                worker_kwargs['concurrency'] = options['concurrency']
+            try:
+                w = get_worker(*args, **worker_kwargs)
+            except ValueError as e:
+                # Queues with different serializers, without --serializer
+                raise CommandError(str(e)) from e
+
+            preload = get_preload_modules(options['preload'].split(',') if options.get('preload') else None)
+            if preload:
+                start = time.monotonic()
+                try:
+                    preload_modules(preload)
+                except ImportError as e:
+                    raise CommandError(str(e)) from e
+                w.log.info('Preloaded %s in %.2f seconds', ', '.join(preload), time.monotonic() - start)
 
             # Close any opened DB connection before any fork
             reset_db_connections()
@@ -108,6 +209,7 @@ class Command(BaseCommand):
                 logging_level=level,
                 max_jobs=options['max_jobs'],
                 max_idle_time=options['max_idle_time'],
+                dequeue_strategy=dequeue_strategy,  # type: ignore[arg-type]
             )
         except ConnectionError as e:
             self.stderr.write(str(e))
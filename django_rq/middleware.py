@@ -0,0 +1,67 @@
+import logging
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from django.http import HttpRequest, HttpResponse
+
+from . import signals, thread_queue
+
+logger = logging.getLogger(__name__)
+
+
+class EnqueueStats:
+    """Jobs enqueued while handling a request"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+
+_stats: ContextVar[Optional[EnqueueStats]] = ContextVar('django_rq_enqueue_stats', default=None)
+
+
+def record_enqueue(sender: Any, duration: float, **kwargs: Any) -> None:
+    stats = _stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += duration
+
+
+class EnqueueTimingMiddleware:
+    """
+    Reports how many jobs each request enqueued and the time spent
+    enqueueing them, in a ``Server-Timing`` header and a log line. Jobs
+    deferred until the request finishes, in the "request_finished" commit
+    mode, are reported as pending since they're enqueued after the response.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        signals.post_enqueue.connect(record_enqueue, dispatch_uid='django_rq.middleware.record_enqueue')
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        stats = EnqueueStats()
+        token = _stats.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _stats.reset(token)
+
+        pending = len(thread_queue.get_queue())
+        metrics = [f'rq-enqueue;dur={stats.duration * 1000:.3f};desc="{stats.count} jobs"']
+        if pending:
+            metrics.append(f'rq-pending;desc="{pending} jobs"')
+        if response.get('Server-Timing'):
+            metrics.insert(0, response['Server-Timing'])
+        response['Server-Timing'] = ', '.join(metrics)
+
+        if stats.count or pending:
+            logger.info(
+                '%s %s: %d jobs enqueued in %.1f ms, %d pending',
+                request.method,
+                request.path,
+                stats.count,
+                stats.duration * 1000,
+                pending,
+            )
+        return response
@@ -0,0 +1,193 @@
+"""
+Offloading of large job payloads (arguments, meta and results) to external
+storage, enabled with ``'JOB_CLASS': 'django_rq.payloads.OffloadingJob'``.
+"""
+
+import time
+from typing import Any, Optional
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage, default_storage
+from redis import Redis
+from rq.job import Job
+from rq.serializers import Serializer
+from rq.utils import import_attribute
+
+DEFAULT_OFFLOAD_THRESHOLD = 512 * 1024
+
+# Offloaded payloads are replaced with a null byte, like compressed ones (see
+# ``django_rq.serializers``), followed by "o" and the name of the payload in
+# the store
+OFFLOADED_MARKER = b'\x00o'
+
+# Sorted set of the IDs of jobs that have offloaded payloads, scored by when
+# their last payload was offloaded
+PAYLOADS_KEY = 'rq:payloads'
+
+# Payloads are offloaded before their job is saved, they're only collected
+# once their job has been missing for this many seconds
+COLLECT_GRACE_PERIOD = 60
+
+
+def get_offload_threshold() -> int:
+    """
+    Returns the size in bytes above which payloads are offloaded, defined in
+    settings.py:
+    RQ = {
+        'PAYLOAD_OFFLOAD_THRESHOLD': 512 * 1024,
+    }
+    """
+    return getattr(settings, 'RQ', {}).get('PAYLOAD_OFFLOAD_THRESHOLD', DEFAULT_OFFLOAD_THRESHOLD)
+
+
+class StoragePayloadStore:
+    """Stores payloads with a Django storage, ``default_storage`` unless another one is given"""
+
+    location = 'rq-payloads'
+
+    def __init__(self, storage: Optional[Storage] = None):
+        self.storage = default_storage if storage is None else storage
+
+    def save(self, name: str, data: bytes) -> str:
+        """Stores ``data``, replacing the payload of the same name, and returns the name it's stored under"""
+        name = f'{self.location}/{name}'
+        # Storages save files under another name rather than overwriting them
+        self.storage.delete(name)
+        return self.storage.save(name, ContentFile(data))
+
+    def load(self, name: str) -> bytes:
+        with self.storage.open(name, 'rb') as payload:
+            return payload.read()
+
+    def delete(self, name: str) -> None:
+        self.storage.delete(name)
+
+
+class FileSystemPayloadStore(StoragePayloadStore):
+    """Stores payloads in the local directory ``location``"""
+
+    def __init__(self, location: str):
+        super().__init__(FileSystemStorage(location=location))
+
+
+def get_payload_store() -> StoragePayloadStore:
+    """
+    Returns the store of offloaded payloads, defined in settings.py as an
+    instance or the import path of a class:
+    RQ = {
+        'PAYLOAD_STORE': 'path.to.PayloadStore',
+    }
+    """
+    store = getattr(settings, 'RQ', {}).get('PAYLOAD_STORE')
+    if store is None:
+        return StoragePayloadStore()
+    if isinstance(store, str):
+        return import_attribute(store)()
+    return store
+
+
+def get_payload_names_key(job_id: str) -> str:
+    return f'{PAYLOADS_KEY}:{job_id}'
+
+
+class OffloadingSerializer:
+    """
+    Wraps the serializer of ``job`` so that payloads larger than
+    ``PAYLOAD_OFFLOAD_THRESHOLD`` are kept in the payload store, with only a
+    reference in Redis. The payloads are tracked by job so that they can be
+    deleted along with it.
+    """
+
+    def __init__(self, serializer: Serializer, job: Job):
+        self.serializer = serializer
+        self.job = job
+
+    def get_payload_name(self, obj: Any) -> str:
+        """
+        Returns the name of the payload of ``obj`` within its job. The job's
+        arguments and meta replace their previous payload when the job is
+        saved again, results get a payload for every execution.
+        """
+        job = self.job
+        if obj is job.meta:
+            return 'meta'
+        # Arguments are serialized as a tuple of the function, instance, args and kwargs
+        if isinstance(obj, tuple) and len(obj) == 4 and obj[2] is job.args and obj[3] is job.kwargs:
+            return 'data'
+        return uuid4().hex
+
+    def dumps(self, obj: Any) -> bytes:
+        data = self.serializer.dumps(obj)
+        if len(data) <= get_offload_threshold():
+            return data
+        job_id = self.job.id
+        name = get_payload_store().save(f'{job_id}/{self.get_payload_name(obj)}', data)
+        with self.job.connection.pipeline() as pipeline:
+            pipeline.sadd(get_payload_names_key(job_id), name)
+            pipeline.zadd(PAYLOADS_KEY, {job_id: time.time()})
+            pipeline.execute()
+        return OFFLOADED_MARKER + name.encode()
+
+    def loads(self, data: bytes) -> Any:
+        if data[:2] == OFFLOADED_MARKER:
+            data = get_payload_store().load(data[2:].decode())
+        return self.serializer.loads(data)
+
+
+class OffloadingJob(Job):
+    """
+    Job whose arguments, meta and results are offloaded to the payload store
+    when they're larger than ``PAYLOAD_OFFLOAD_THRESHOLD``. Payloads are
+    deleted with their job, those of jobs that expired are deleted by
+    ``collect_payloads``, which workers run periodically.
+    """
+
+    def __init__(self, id: Optional[str] = None, connection: Optional[Redis] = None, serializer=None):
+        super().__init__(id, connection=connection, serializer=serializer)
+        serializer = self.serializer
+        # Jobs fetched by other jobs of this class get their wrapped serializer
+        if isinstance(serializer, OffloadingSerializer):
+            serializer = serializer.serializer
+        self.serializer = OffloadingSerializer(serializer, self)
+
+    def delete(self, *args, **kwargs) -> None:
+        super().delete(*args, **kwargs)
+        delete_payloads(self.connection, self.id)
+
+
+def delete_payloads(connection: Redis, job_id: str) -> None:
+    """Deletes the offloaded payloads of the job ``job_id``"""
+    key = get_payload_names_key(job_id)
+    names = connection.smembers(key)
+    if names:
+        store = get_payload_store()
+        for name in names:
+            store.delete(name.decode() if isinstance(name, bytes) else name)
+    with connection.pipeline() as pipeline:
+        pipeline.delete(key)
+        pipeline.zrem(PAYLOADS_KEY, job_id)
+        pipeline.execute()
+
+
+def collect_payloads(connection: Redis, job_class: type[Job] = Job) -> int:
+    """
+    Deletes the offloaded payloads of jobs that no longer exist, because they
+    expired or were deleted without their payloads. Returns the number of
+    jobs whose payloads were deleted.
+    """
+    job_ids = [
+        job_id.decode() if isinstance(job_id, bytes) else job_id
+        for job_id in connection.zrangebyscore(PAYLOADS_KEY, '-inf', time.time() - COLLECT_GRACE_PERIOD)
+    ]
+    if not job_ids:
+        return 0
+    with connection.pipeline() as pipeline:
+        for job_id in job_ids:
+            pipeline.exists(job_class.key_for(job_id))
+        exists = pipeline.execute()
+    missing = [job_id for job_id, job_exists in zip(job_ids, exists) if not job_exists]
+    for job_id in missing:
+        delete_payloads(connection, job_id)
+    return len(missing)
@@ -0,0 +1,166 @@
+"""
+Sampled profiling of jobs with cProfile and tracemalloc. A fraction of all
+jobs is profiled with ``PROFILE_SAMPLE_RATE``, single jobs are profiled when
+enqueued with ``meta={'profile': True}``.
+"""
+
+import cProfile
+import json
+import pstats
+import random
+import time
+import tracemalloc
+import zlib
+from typing import Any, Optional
+
+from django.conf import settings
+from redis import Redis
+from rq.defaults import DEFAULT_FAILURE_TTL, DEFAULT_RESULT_TTL
+from rq.job import Job
+from rq.results import Result
+
+PROFILE_KEY_PREFIX = 'rq:profile:'
+
+CPROFILE = 'cprofile'
+TRACEMALLOC = 'tracemalloc'
+PROFILERS = (CPROFILE, TRACEMALLOC)
+
+# Number of functions and allocation sites kept in a profile
+DEFAULT_PROFILE_TOP = 25
+
+
+def get_profile_settings() -> dict[str, Any]:
+    """
+    Returns the profiling settings, defined in settings.py:
+    RQ = {
+        'PROFILE_SAMPLE_RATE': 0.01,  # Profile 1% of all jobs
+        'PROFILERS': ['cprofile', 'tracemalloc'],
+        'PROFILE_TOP': 25,
+    }
+    """
+    RQ = getattr(settings, 'RQ', {})
+    return {
+        'sample_rate': RQ.get('PROFILE_SAMPLE_RATE', 0),
+        'profilers': list(RQ.get('PROFILERS', PROFILERS)),
+        'top': RQ.get('PROFILE_TOP', DEFAULT_PROFILE_TOP),
+    }
+
+
+def get_profilers(job: Job) -> list[str]:
+    """
+    Returns the profilers to run ``job`` under, if any. ``meta['profile']``
+    is either a boolean or a list of profilers.
+    """
+    profile_settings = get_profile_settings()
+    profile = job.meta.get('profile')
+    if isinstance(profile, (list, tuple)):
+        return [profiler for profiler in profile if profiler in PROFILERS]
+    if profile is True:
+        return profile_settings['profilers']
+    if profile is None and profile_settings['sample_rate'] and random.random() < profile_settings['sample_rate']:
+        return profile_settings['profilers']
+    return []
+
+
+class JobProfiler:
+    """
+    Profiles the code run within it. Once it exits, ``profile`` holds the
+    functions with the highest cumulative time and the lines that allocated
+    the most memory still in use.
+    """
+
+    def __init__(self, profilers: list[str], top: int = DEFAULT_PROFILE_TOP):
+        self.profilers = profilers
+        self.top = top
+        self.profile: Optional[dict[str, Any]] = None
+
+    def __enter__(self) -> 'JobProfiler':
+        self._cprofile: Optional[cProfile.Profile] = None
+        if CPROFILE in self.profilers:
+            self._cprofile = cProfile.Profile()
+            try:
+                self._cprofile.enable()
+            except ValueError:
+                # Another profiler is active in this thread
+                self._cprofile = None
+
+        # Memory may already be traced by someone else, who stops tracing
+        self._stop_tracemalloc = TRACEMALLOC in self.profilers and not tracemalloc.is_tracing()
+        if self._stop_tracemalloc:
+            tracemalloc.start()
+        if TRACEMALLOC in self.profilers:
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        duration = time.perf_counter() - self._start
+        profile: dict[str, Any] = {'duration': duration, 'functions': [], 'allocations': [], 'peak_memory': None}
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            stats = pstats.Stats(self._cprofile).stats  # type: ignore[attr-defined]
+            functions = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[: self.top]
+            profile['functions'] = [
+                {
+                    'function': '{}:{}({})'.format(*function),
+                    'calls': calls,
+                    'total_time': total_time,
+                    'cumulative_time': cumulative_time,
+                }
+                for function, (_, calls, total_time, cumulative_time, _) in functions
+            ]
+
+        if TRACEMALLOC in self.profilers and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            profile['peak_memory'] = tracemalloc.get_traced_memory()[1]
+            if self._stop_tracemalloc:
+                tracemalloc.stop()
+            snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            profile['allocations'] = [
+                {'location': str(statistic.traceback[0]), 'size': statistic.size, 'count': statistic.count}
+                for statistic in snapshot.statistics('lineno')[: self.top]
+            ]
+
+        self.profile = profile
+
+
+def get_profile_key(job_id: str) -> str:
+    return f'{PROFILE_KEY_PREFIX}{job_id}'
+
+
+def save_profile(connection: Redis, job: Job, profile: dict[str, Any]) -> None:
+    """
+    Saves the profile of the latest execution of ``job`` along with its
+    result, compressed, for as long as the result is kept
+    """
+    result = job.latest_result()
+    if result is None or result.id is None:
+        return
+
+    if result.type == Result.Type.SUCCESSFUL:
+        ttl = DEFAULT_RESULT_TTL if job.result_ttl is None else job.result_ttl
+    else:
+        ttl = DEFAULT_FAILURE_TTL if job.failure_ttl is None else job.failure_ttl
+    key = get_profile_key(job.id)
+    with connection.pipeline() as pipeline:
+        pipeline.hset(key, result.id, zlib.compress(json.dumps(profile).encode()))
+        if ttl > 0:
+            pipeline.expire(key, ttl)
+        else:
+            pipeline.persist(key)
+        pipeline.execute()
+
+
+def get_profiles(connection: Redis, job_id: str) -> dict[str, dict[str, Any]]:
+    """Returns the profiles of the job ``job_id``, by result ID"""
+    return {
+        result_id.decode(): json.loads(zlib.decompress(profile))
+        for result_id, profile in connection.hgetall(get_profile_key(job_id)).items()
+    }
+
+
+def get_profile(connection: Redis, job_id: str, result_id: str) -> Optional[dict[str, Any]]:
+    """Returns the profile of the execution of the job ``job_id`` that had the result ``result_id``"""
+    profile = connection.hget(get_profile_key(job_id), result_id)
+    return None if profile is None else json.loads(zlib.decompress(profile))
@@ -1,25 +1,36 @@
+import math
+import time
 import warnings
+from datetime import timedelta
+from inspect import signature
 from typing import Any, Callable, Optional, Union, cast
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.db import connection, transaction
-from redis import Redis
-from rq.job import Job
+from redis import Redis, WatchError
+from rq.exceptions import DequeueTimeout
+from rq.job import Job, JobStatus
 from rq.queue import Queue
-from rq.utils import import_attribute
+from rq.utils import get_version, import_attribute, now
 
-from . import thread_queue
+from . import signals, thread_queue
 from .connection_utils import (
     filter_connection_params,
     get_connection,
     get_redis_connection,
 )
-from .jobs import get_job_class
+from .jobs import format_job_key, get_job_class
+from .rate_limits import RateLimit, acquire_tokens, parse_rate_limit, release_tokens
 from .settings import get_queues_list
+from .tracing import trace_enqueue
+from .uniqueness import DEFAULT_UNIQUE_TTL, get_debounce_key, get_suppressed_key, get_unique_key
 
 VALID_COMMIT_MODES = ('auto', 'request_finished', 'on_db_commit')
 
+# Statuses of jobs that haven't started yet
+PENDING = (JobStatus.QUEUED, JobStatus.DEFERRED, JobStatus.SCHEDULED)
+
 
 def get_commit_mode() -> str:
     """
@@ -95,22 +106,269 @@ class DjangoRQ(Queue):
 
         super().__init__(*args, **kwargs)
 
+    @property
+    def weight(self) -> float:
+        """
+        Share of jobs workers using the "weighted" dequeue strategy take from
+        this queue, relative to their other queues. Configured with ``WEIGHT``
+        in ``RQ_QUEUES``, defaults to 1.
+        """
+        return getattr(settings, 'RQ_QUEUES', {}).get(self.name, {}).get('WEIGHT', 1)
+
+    @property
+    def rate_limit(self) -> Optional[RateLimit]:
+        """
+        Maximum rate at which workers take jobs from this queue, configured
+        with ``RATE_LIMIT`` in ``RQ_QUEUES``, e.g. "100/s".
+        """
+        rate_limit = getattr(settings, 'RQ_QUEUES', {}).get(self.name, {}).get('RATE_LIMIT')
+        return parse_rate_limit(rate_limit) if rate_limit else None
+
+    @classmethod
+    def dequeue_any(  # type: ignore[override]
+        cls,
+        queues: list[Queue],
+        timeout: Optional[int],
+        connection: Redis,
+        job_class: Optional[type[Job]] = None,
+        serializer: Any = None,
+        death_penalty_class: Any = None,
+    ) -> Optional[tuple[Job, Queue]]:
+        """
+        Like ``Queue.dequeue_any``, but skips queues that have exceeded their
+        ``rate_limit`` until a token becomes available in their bucket.
+        """
+        kwargs = {'job_class': job_class, 'serializer': serializer, 'death_penalty_class': death_penalty_class}
+        rate_limits = [(queue.name, limit) for queue in queues if (limit := getattr(queue, 'rate_limit', None))]
+        if not rate_limits:
+            return super().dequeue_any(queues, timeout, connection=connection, **kwargs)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            buckets = dict(zip((name for name, _ in rate_limits), acquire_tokens(connection, rate_limits)))
+            available = [queue for queue in queues if queue.name not in buckets or buckets[queue.name].taken]
+            # Seconds until one of the skipped queues has a token again
+            wait = min((bucket.wait for bucket in buckets.values() if not bucket.taken), default=None)
+
+            block: Optional[float] = timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DequeueTimeout(timeout, [queue.key for queue in queues])
+                # Stop blocking when a skipped queue can be served again
+                block = min(remaining, wait) if wait is not None else remaining
+                if get_version(connection) >= (6, 0, 0):
+                    # Timeouts of 0 block forever
+                    block = max(0.01, block)
+                elif wait is None:
+                    block = max(1, math.ceil(block))
+                else:
+                    # Redis 5 only blocks for whole seconds, so skipped queues
+                    # that can be served within a second are polled for instead
+                    block = math.floor(block) or None
+
+            result = None
+            if available:
+                try:
+                    # Redis 6 takes fractions of a second, rq annotates whole seconds
+                    result = super().dequeue_any(available, block, connection=connection, **kwargs)  # type: ignore[arg-type]
+                except DequeueTimeout:
+                    pass
+                finally:
+                    unused = [
+                        (name, rate_limit)
+                        for name, rate_limit in rate_limits
+                        if buckets[name].taken and (result is None or result[1].name != name)
+                    ]
+                    release_tokens(connection, unused)
+                if result is not None:
+                    return result
+
+            if wait is None:
+                # No queue was skipped, they are all empty
+                if deadline is None:
+                    return None
+                continue
+            if available and block is not None:
+                # Already blocked until a skipped queue could be served again
+                continue
+            time.sleep(wait if deadline is None else min(wait, max(0, deadline - time.monotonic())))
+
     def original_enqueue_call(self, *args, **kwargs):
+        # Enqueueing isn't timed unless someone is listening
+        if not (signals.pre_enqueue.receivers or signals.post_enqueue.receivers):
+            return self._original_enqueue_call(*args, **kwargs)
+
+        signals.pre_enqueue.send(sender=self.__class__, queue=self, args=args, kwargs=kwargs)
+        start = time.perf_counter()
+        job = self._original_enqueue_call(*args, **kwargs)
+        signals.post_enqueue.send(sender=self.__class__, queue=self, job=job, duration=time.perf_counter() - start)
+        return job
+
+    def _original_enqueue_call(self, *args, **kwargs):
         queue_name = kwargs.get('queue_name') or self.name
         kwargs['result_ttl'] = kwargs.get('result_ttl', get_result_ttl(queue_name))
+        unique_key = kwargs.pop('unique_key', None)
+        unique_for = kwargs.pop('unique_for', None)
+
+        if unique_key is None:
+            # Set with the ``unique_key`` argument of ``@job``
+            func = args[0] if args else kwargs.get('func')
+            unique_key = getattr(func, 'unique_key', None)
+            unique_for = getattr(func, 'unique_for', None)
+        if unique_key is None or not self._is_async:
+            return super().enqueue_call(*args, **kwargs)
+
+        arguments = signature(Queue.enqueue_call).bind(self, *args, **kwargs).arguments
+        unique_key = format_job_key(
+            unique_key, arguments['func'], arguments.get('args') or (), arguments.get('kwargs') or {}
+        )
+        return self.enqueue_unique_call(unique_key, unique_for, *args, **kwargs)
+
+    def enqueue_unique_call(self, unique_key: str, unique_for: Optional[int], *args, **kwargs) -> Optional[Job]:
+        """
+        Enqueues the job unless a job with the same ``unique_key`` is already
+        enqueued, in which case that job is returned instead. The unique key is
+        set in the same transaction as the job is enqueued.
 
-        return super().enqueue_call(*args, **kwargs)
+        Without ``unique_for``, another job with the same key can be enqueued
+        as soon as the job starts. Otherwise duplicates are suppressed for
+        ``unique_for`` seconds, whether the job already ran or not.
+        """
+        if kwargs.get('depends_on') is not None:
+            raise ValueError('unique_key is not supported with job dependencies')
+        if kwargs.get('pipeline') is not None:
+            raise ValueError('unique_key is not supported with a pipeline')
+        if unique_for is None:
+            # The worker deletes the unique key when the job starts
+            kwargs['meta'] = {**(kwargs.get('meta') or {}), 'unique_key': unique_key}
+
+        key = get_unique_key(unique_key)
+        with self.connection.pipeline() as pipeline:
+            while True:
+                try:
+                    pipeline.watch(key)
+                    job_id = cast(Optional[bytes], pipeline.get(key))
+                    job = self.fetch_job(job_id.decode()) if job_id is not None else None
+                    # Keys of jobs that were deleted, or that ran without releasing
+                    # their key, don't suppress duplicates
+                    if job is not None and (unique_for is not None or job.get_status(refresh=False) in PENDING):
+                        pipeline.reset()
+                        self.connection.incr(get_suppressed_key(self.name))
+                        return job
+
+                    pipeline.multi()
+                    kwargs['pipeline'] = pipeline
+                    job = super().enqueue_call(*args, **kwargs)
+                    pipeline.set(key, job.id, ex=unique_for or DEFAULT_UNIQUE_TTL)
+                    pipeline.execute()
+                    return job
+                except WatchError:
+                    # Another job with the same key was enqueued in the meantime
+                    continue
+
+    def enqueue_debounced(
+        self,
+        func: Callable,
+        key: str,
+        delay: Union[int, float, timedelta],
+        args: Union[tuple, list, None] = None,
+        kwargs: Optional[dict] = None,
+        max_delay: Union[int, float, timedelta, None] = None,
+        **job_kwargs: Any,
+    ) -> Optional[Job]:
+        """
+        Schedules ``func`` to run ``delay`` after the last call with the same
+        ``key``. While the job is still scheduled, calls with the same key
+        postpone it and replace its arguments instead of creating a new job.
+        With ``max_delay``, the job isn't postponed further than that after it
+        was first scheduled. Other keyword arguments are passed to
+        ``create_job``.
+
+        The job is moved to the queue by the scheduler, see ``rqworker
+        --with-scheduler``. Like ``enqueue_call``, the job is only scheduled
+        once the current database transaction commits or the request
+        finishes, depending on the commit mode, in which case ``None`` is
+        returned.
+        """
+        if not isinstance(delay, timedelta):
+            delay = timedelta(seconds=delay)
+        if max_delay is not None and not isinstance(max_delay, timedelta):
+            max_delay = timedelta(seconds=max_delay)
+        job_kwargs.setdefault('result_ttl', get_result_ttl(self.name))
+        return self._commit(self._enqueue_debounced, (func, key, delay, args, kwargs, max_delay), job_kwargs)
+
+    def _enqueue_debounced(
+        self,
+        func: Callable,
+        key: str,
+        delay: timedelta,
+        args: Union[tuple, list, None],
+        kwargs: Optional[dict],
+        max_delay: Optional[timedelta],
+        **job_kwargs: Any,
+    ) -> Job:
+        debounce_key = get_debounce_key(key)
+        registry = self.scheduled_job_registry
+        with self.connection.pipeline() as pipeline:
+            while True:
+                try:
+                    # The scheduler removes jobs from the registry when it enqueues them
+                    pipeline.watch(debounce_key, registry.key)
+                    job_id = cast(Optional[bytes], pipeline.get(debounce_key))
+                    scheduled = self.fetch_job(job_id.decode()) if job_id is not None else None
+                    if scheduled is not None and scheduled.get_status(refresh=False) != JobStatus.SCHEDULED:
+                        scheduled = None
+                    scheduled_at = now() + delay
+
+                    # A scheduled job is replaced by one with the same id and the new arguments
+                    options = {**job_kwargs, 'job_id': scheduled.id} if scheduled is not None else job_kwargs
+                    job = self.create_job(func, args=args, kwargs=kwargs, status=JobStatus.SCHEDULED, **options)
+
+                    pipeline.multi()
+                    if scheduled is not None:
+                        job.created_at = scheduled.created_at
+                        if max_delay is not None:
+                            scheduled_at = min(scheduled_at, job.created_at + max_delay)
+                        pipeline.incr(get_suppressed_key(self.name))
+                    else:
+                        pipeline.sadd(self.redis_queues_keys, self.key)
+                    job.save(pipeline=pipeline)
+                    job.cleanup(ttl=job.ttl, pipeline=pipeline)
+
+                    # Not ScheduledJobRegistry.schedule(), which doesn't use the pipeline
+                    pipeline.zadd(registry.key, {job.id: scheduled_at.timestamp()})
+                    pipeline.set(debounce_key, job.id, ex=int(delay.total_seconds()) + DEFAULT_UNIQUE_TTL)
+                    pipeline.execute()
+                    return job
+                except WatchError:
+                    continue
 
     def enqueue_call(self, *args, **kwargs):
+        # The trace context is captured now, even if enqueueing is deferred
+        with trace_enqueue(self.name, kwargs) as span:
+            job = self._enqueue_call(*args, **kwargs)
+            if span is not None and job is not None:
+                span.set_attribute('messaging.message.id', job.id)
+            return job
+
+    def _enqueue_call(self, *args, **kwargs):
+        return self._commit(self.original_enqueue_call, args, kwargs)
+
+    def _commit(self, enqueue: Callable, args: tuple, kwargs: dict) -> Any:
+        """
+        Calls ``enqueue`` right away, once the current database transaction
+        commits or at the end of the request, depending on the commit mode.
+        """
         if self._commit_mode == 'auto':
-            return self.original_enqueue_call(*args, **kwargs)
+            return enqueue(*args, **kwargs)
         elif self._commit_mode == 'on_db_commit':
             if connection.in_atomic_block:
-                transaction.on_commit(lambda: self.original_enqueue_call(*args, **kwargs))
+                transaction.on_commit(lambda: enqueue(*args, **kwargs))
             else:
-                return self.original_enqueue_call(*args, **kwargs)
+                return enqueue(*args, **kwargs)
         else:
-            thread_queue.add(self, args, kwargs)
+            thread_queue.add(self if enqueue == self.original_enqueue_call else enqueue, args, kwargs)
 
 
 def get_queue(
@@ -169,6 +427,7 @@ def get_queue_by_index(index: int) -> Queue:
         config['name'],
         connection=get_redis_connection(config['connection_config']),
         is_async=config.get('ASYNC', True),
+        job_class=get_job_class(),
         serializer=config['connection_config'].get('SERIALIZER'),
     )
 
@@ -0,0 +1,127 @@
+import re
+from collections.abc import Iterable, Sequence
+from typing import NamedTuple, Optional
+
+from django.core.exceptions import ImproperlyConfigured
+from redis import Redis
+from redis.commands.core import Script
+
+RATE_LIMIT_KEY_PREFIX = 'rq:rate-limit:'
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Token buckets are stored in hashes holding the number of tokens left and
+# when it was last updated (in milliseconds, from the Redis server's clock).
+# ARGV[1] is the number of tokens to take from every bucket: 1 to acquire a
+# token, 0 to only read the buckets or -1 to give back a token. It's followed
+# by the rate (tokens per second) and capacity of every bucket in KEYS.
+# For every bucket, returns whether the tokens were taken, the number of
+# tokens left and the number of milliseconds until a token is available.
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local requested = tonumber(ARGV[1])
+local results = {}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2])
+    local capacity = tonumber(ARGV[i * 2 + 1])
+    local bucket = redis.call('HMGET', key, 'tokens', 'updated_at')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated_at = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate / 1000)
+
+    local taken = 0
+    if tokens >= requested then
+        tokens = math.min(capacity, tokens - requested)
+        taken = 1
+    end
+    if requested ~= 0 then
+        redis.call('HSET', key, 'tokens', tostring(tokens), 'updated_at', now)
+        redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000) + 1000)
+    end
+
+    local wait = 0
+    if tokens < 1 then
+        wait = math.ceil((1 - tokens) * 1000 / rate)
+    end
+    table.insert(results, {taken, tostring(tokens), wait})
+end
+return results
+"""
+
+_token_bucket_script: Optional[Script] = None
+
+
+class RateLimit(NamedTuple):
+    """A number of ``requests`` allowed every ``period`` seconds"""
+
+    requests: int
+    period: int
+
+    @property
+    def rate(self) -> float:
+        """Tokens added to the bucket every second"""
+        return self.requests / self.period
+
+    def __str__(self) -> str:
+        unit = next(unit for unit, seconds in PERIODS.items() if seconds == self.period)
+        return f'{self.requests}/{unit}'
+
+
+class BucketState(NamedTuple):
+    taken: bool
+    tokens: float
+    wait: float
+
+
+def parse_rate_limit(value: str) -> RateLimit:
+    """
+    Parses rate limits such as "100/s", "6000/m", "100/h" or "1000/d".
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*([smhd])\s*', str(value))
+    if match is None or int(match.group(1)) == 0:
+        raise ImproperlyConfigured(
+            f'Invalid RATE_LIMIT {value!r}, expected a number of jobs per period such as "100/s" or "6000/m".'
+        )
+    return RateLimit(int(match.group(1)), PERIODS[match.group(2)])
+
+
+def get_rate_limit_key(queue_name: str) -> str:
+    return f'{RATE_LIMIT_KEY_PREFIX}{queue_name}'
+
+
+def update_token_buckets(
+    connection: Redis, rate_limits: Sequence[tuple[str, RateLimit]], requested: int
+) -> list[BucketState]:
+    """
+    Takes ``requested`` tokens from the buckets of the given queue names and
+    rate limits in a single round trip, see ``TOKEN_BUCKET_SCRIPT``.
+    """
+    global _token_bucket_script
+
+    if not rate_limits:
+        return []
+    if _token_bucket_script is None:
+        _token_bucket_script = connection.register_script(TOKEN_BUCKET_SCRIPT)
+
+    args: list[float] = [requested]
+    for _, rate_limit in rate_limits:
+        args.extend((rate_limit.rate, rate_limit.requests))
+    keys = [get_rate_limit_key(name) for name, _ in rate_limits]
+    results = _token_bucket_script(keys=keys, args=args, client=connection)
+    return [BucketState(bool(taken), float(tokens), wait / 1000) for taken, tokens, wait in results]
+
+
+def acquire_tokens(connection: Redis, rate_limits: Sequence[tuple[str, RateLimit]]) -> list[BucketState]:
+    """Takes a token from each of the buckets if one is available"""
+    return update_token_buckets(connection, rate_limits, 1)
+
+
+def release_tokens(connection: Redis, rate_limits: Sequence[tuple[str, RateLimit]]) -> None:
+    """Gives back tokens that were acquired but not used"""
+    update_token_buckets(connection, rate_limits, -1)
+
+
+def get_tokens(connection: Redis, rate_limits: Iterable[tuple[str, RateLimit]]) -> list[float]:
+    """Returns the number of tokens currently available in each of the buckets"""
+    return [state.tokens for state in update_token_buckets(connection, list(rate_limits), 0)]
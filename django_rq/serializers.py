@@ -0,0 +1,141 @@
+"""
+Serializers that can be used with ``SERIALIZER`` in ``RQ_QUEUES``, e.g.
+``'SERIALIZER': 'django_rq.serializers.ZlibPickleSerializer'``.
+"""
+
+import zlib
+from typing import Any, ClassVar
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rq.serializers import DefaultSerializer, Serializer
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+
+# Compressed payloads start with a null byte followed by the codec. Neither
+# pickle, JSON nor msgpack payloads longer than a byte start with a null byte,
+# so payloads that weren't compressed are stored as is.
+COMPRESSED_MARKER = b'\x00'
+ZLIB = b'z'
+ZSTD = b's'
+
+
+def get_compression_threshold() -> int:
+    """
+    Returns the size in bytes above which payloads are compressed, defined in
+    settings.py:
+    RQ = {
+        'COMPRESSION_THRESHOLD': 1024,
+    }
+    """
+    return getattr(settings, 'RQ', {}).get('COMPRESSION_THRESHOLD', DEFAULT_COMPRESSION_THRESHOLD)
+
+
+def decompress(data: bytes) -> bytes:
+    """Decompresses payloads compressed by any ``CompressedSerializer``"""
+    if data[:1] != COMPRESSED_MARKER or len(data) < 2:
+        return data
+    codec, payload = data[1:2], data[2:]
+    if codec == ZLIB:
+        return zlib.decompress(payload)
+    if codec == ZSTD:
+        if zstandard is None:
+            raise ImproperlyConfigured('zstandard is required to load zstd compressed jobs')
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f'Unknown compression codec {codec!r}')
+
+
+class CompressedSerializer:
+    """
+    Compresses the payloads of ``serializer`` that are larger than
+    ``COMPRESSION_THRESHOLD``. Payloads compressed with any codec, and ones
+    that weren't compressed, can be loaded, so the serializer or threshold of
+    a queue can be changed while it still holds jobs.
+    """
+
+    serializer: ClassVar[Serializer] = DefaultSerializer
+    codec: ClassVar[bytes] = ZLIB
+
+    @classmethod
+    def compress(cls, data: bytes) -> bytes:
+        return zlib.compress(data)
+
+    @classmethod
+    def dumps(cls, obj: Any) -> bytes:
+        data = cls.serializer.dumps(obj)
+        if len(data) <= get_compression_threshold():
+            return data
+        return COMPRESSED_MARKER + cls.codec + cls.compress(data)
+
+    @classmethod
+    def loads(cls, data: bytes) -> Any:
+        return cls.serializer.loads(decompress(data))
+
+
+class ZlibPickleSerializer(CompressedSerializer):
+    """Pickle, compressed with zlib"""
+
+
+class ZstdPickleSerializer(CompressedSerializer):
+    """Pickle, compressed with zstd. Requires the ``zstandard`` package."""
+
+    codec = ZSTD
+
+    @classmethod
+    def compress(cls, data: bytes) -> bytes:
+        if zstandard is None:
+            raise ImproperlyConfigured('ZstdPickleSerializer requires the zstandard package')
+        return zstandard.ZstdCompressor().compress(data)
+
+
+class MsgpackSerializer:
+    """
+    msgpack, more compact than pickle but limited to basic types: tuples are
+    loaded as lists. Requires the ``msgpack`` package.
+    """
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        if msgpack is None:
+            raise ImproperlyConfigured('MsgpackSerializer requires the msgpack package')
+        return msgpack.packb(obj, use_bin_type=True)
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        if msgpack is None:
+            raise ImproperlyConfigured('MsgpackSerializer requires the msgpack package')
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class OrjsonSerializer:
+    """
+    JSON, using orjson for speed. Limited to JSON types: tuples are loaded as
+    lists. Requires the ``orjson`` package.
+    """
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        if orjson is None:
+            raise ImproperlyConfigured('OrjsonSerializer requires the orjson package')
+        return orjson.dumps(obj)
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        if orjson is None:
+            raise ImproperlyConfigured('OrjsonSerializer requires the orjson package')
+        return orjson.loads(data)
@@ -0,0 +1,14 @@
+from django.dispatch import Signal
+
+# Sent before a job is enqueued, with the ``queue`` and the ``args`` and
+# ``kwargs`` of the ``enqueue_call``. Receivers may change ``kwargs``.
+pre_enqueue = Signal()
+
+# Sent after a job is enqueued, with the ``queue``, the ``job`` and the
+# ``duration`` of the enqueue in seconds
+post_enqueue = Signal()
+
+# Sent after the jobs deferred until the end of a request, in the
+# "request_finished" commit mode, are enqueued, with their ``count`` and the
+# ``duration`` in seconds
+jobs_flushed = Signal()
@@ -0,0 +1,122 @@
+"""
+Log of jobs that took longer than their queue's ``SLOW_JOB_THRESHOLD``,
+configured in seconds in settings.py:
+RQ_QUEUES = {
+    'default': {
+        'HOST': 'localhost',
+        'PORT': 6379,
+        'SLOW_JOB_THRESHOLD': 10,
+    },
+}
+
+Each queue logs to a Redis stream capped at ``SLOWLOG_MAX_LENGTH`` entries:
+RQ = {
+    'SLOWLOG_MAX_LENGTH': 1000,
+}
+"""
+
+import hashlib
+import math
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from django.conf import settings
+from redis import Redis
+from rq.job import Job
+
+SLOWLOG_KEY_PREFIX = 'rq:slowlog:'
+
+DEFAULT_SLOWLOG_MAX_LENGTH = 1000
+
+PERCENTILES = (50, 95, 99)
+
+
+def get_slow_job_threshold(queue_name: str) -> Optional[float]:
+    return getattr(settings, 'RQ_QUEUES', {}).get(queue_name, {}).get('SLOW_JOB_THRESHOLD')
+
+
+def get_slowlog_max_length() -> int:
+    return getattr(settings, 'RQ', {}).get('SLOWLOG_MAX_LENGTH', DEFAULT_SLOWLOG_MAX_LENGTH)
+
+
+def get_slowlog_key(queue_name: str) -> str:
+    return f'{SLOWLOG_KEY_PREFIX}{queue_name}'
+
+
+def get_args_digest(job: Job) -> str:
+    """
+    Returns a short digest of the serialized call of ``job``, so slow calls
+    with the same arguments can be told apart without logging the arguments
+    """
+    return hashlib.blake2b(job.data, digest_size=8).hexdigest()
+
+
+def log_slow_job(connection: Redis, job: Job, queue_name: str, duration: float, worker_name: str) -> bool:
+    """
+    Logs ``job`` if it took longer than its queue's ``SLOW_JOB_THRESHOLD``.
+    Returns whether it was logged.
+    """
+    threshold = get_slow_job_threshold(queue_name)
+    if threshold is None or duration < threshold:
+        return False
+
+    fields = {
+        'job_id': job.id,
+        'func': job.func_name or '',
+        'queue': queue_name,
+        'duration': repr(duration),
+        'worker': worker_name,
+        'args_digest': get_args_digest(job),
+    }
+    connection.xadd(get_slowlog_key(queue_name), fields, maxlen=get_slowlog_max_length(), approximate=True)
+    return True
+
+
+def get_slow_jobs(connection: Redis, queue_name: str, count: Optional[int] = None) -> list[dict[str, Any]]:
+    """Returns the slow jobs logged for ``queue_name``, most recent first"""
+    entries = connection.xrevrange(get_slowlog_key(queue_name), count=count)
+    slow_jobs = []
+    for entry_id, fields in entries:
+        slow_job: dict[str, Any] = {key.decode(): value.decode() for key, value in fields.items()}
+        slow_job['duration'] = float(slow_job['duration'])
+        # Stream entry IDs start with the time they were added at, in milliseconds
+        slow_job['logged_at'] = datetime.fromtimestamp(int(entry_id.split(b'-')[0]) / 1000, timezone.utc)
+        slow_jobs.append(slow_job)
+    return slow_jobs
+
+
+def percentile(durations: list[float], percent: float) -> float:
+    """Returns the ``percent`` percentile of sorted ``durations``, using the nearest-rank method"""
+    rank = max(math.ceil(percent / 100 * len(durations)), 1)
+    return durations[rank - 1]
+
+
+def get_slowest_functions(slow_jobs: list[dict[str, Any]], top: Optional[int] = None) -> list[dict[str, Any]]:
+    """
+    Summarizes ``slow_jobs`` by function, slowest functions by 95th percentile
+    first
+    """
+    durations: dict[str, list[float]] = defaultdict(list)
+    for slow_job in slow_jobs:
+        durations[slow_job['func']].append(slow_job['duration'])
+
+    functions = []
+    for func, func_durations in durations.items():
+        func_durations.sort()
+        function: dict[str, Any] = {
+            'func': func,
+            'count': len(func_durations),
+            'mean': sum(func_durations) / len(func_durations),
+            'max': func_durations[-1],
+        }
+        for percent in PERCENTILES:
+            function[f'p{percent}'] = percentile(func_durations, percent)
+        functions.append(function)
+
+    functions.sort(key=lambda function: (function['p95'], function['max']), reverse=True)
+    return functions[:top] if top is not None else functions
+
+
+def clear_slowlog(connection: Redis, queue_name: str) -> None:
+    connection.delete(get_slowlog_key(queue_name))
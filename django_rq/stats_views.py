@@ -1,3 +1,4 @@
+from functools import partial
 from secrets import compare_digest
 
 from typing import Optional
@@ -8,6 +9,9 @@ from django.shortcuts import render
 from django.views.decorators.cache import never_cache
 
 from . import settings as django_rq_settings
+from .fanout import fan_out
+from .function_stats import DEFAULT_WINDOW, get_function_statistics, get_function_stats_ttl
+from .history import MINUTELY, get_queue_depth_history, get_queue_groups
 from .utils import get_cron_schedulers, get_scheduler_statistics, get_statistics
 from .views import each_context
 
@@ -63,10 +67,19 @@ def prometheus_metrics(request):
 @never_cache
 @staff_member_required
 def stats(request: HttpRequest) -> HttpResponse:
+    statistics = get_statistics(run_maintenance_tasks=True)
+    history = {}
+    groups = get_queue_groups([queue['name'] for queue in statistics['queues'] if 'error' not in queue])
+    for result in fan_out(partial(get_queue_depth_history, resolutions=(MINUTELY,)), groups):
+        if not isinstance(result, Exception):
+            history.update(result)
+    for queue in statistics['queues']:
+        queue['depth_history'] = history.get(queue['name'], {})
     context_data = {
         **each_context(request),
-        **get_statistics(run_maintenance_tasks=True),
+        **statistics,
         **get_scheduler_statistics(),
+        "rate_limited": any(queue.get('rate_limit') for queue in statistics['queues']),
         "view_metrics": RQCollector is not None,
         "cron_schedulers": get_cron_schedulers(),
     }
@@ -89,3 +102,42 @@ def stats_json(request: HttpRequest, token: Optional[str] = None) -> JsonRespons
             )
 
     return JsonResponse(get_statistics())
+
+
+def get_window(request: HttpRequest) -> int:
+    """
+    Returns the minutes of function statistics requested, one hour by
+    default, up to the minutes they're kept for
+    """
+    try:
+        minutes = int(request.GET.get('minutes', DEFAULT_WINDOW))
+    except ValueError:
+        minutes = DEFAULT_WINDOW
+    return min(max(minutes, 1), max(get_function_stats_ttl() // 60, 1))
+
+
+@never_cache
+@staff_member_required
+def functions(request: HttpRequest) -> HttpResponse:
+    minutes = get_window(request)
+    context_data = {
+        **each_context(request),
+        'minutes': minutes,
+        'functions': get_function_statistics(minutes),
+    }
+    return render(request, 'django_rq/functions.html', context_data)
+
+
+@never_cache
+def functions_json(request: HttpRequest) -> JsonResponse:
+    if not is_authorized(request):
+        return JsonResponse(
+            {
+                "error": True,
+                "description": "Missing bearer token. Set token in headers and configure RQ_API_TOKEN in settings.py",
+            },
+            status=401,
+        )
+
+    minutes = get_window(request)
+    return JsonResponse({'minutes': minutes, 'functions': get_function_statistics(minutes)})
@@ -96,3 +96,40 @@ def rq_url(context, viewname, *args, **kwargs):
     else:
         prefix = "django_rq:"
     return reverse(f"{prefix}{viewname}", args=args, kwargs=kwargs)
+
+
+@register.filter
+def sparkline(depths, size='120x24'):
+    """
+    Renders a series of queue depths, oldest first, as an inline SVG line.
+    Missing samples, which are ``None``, leave gaps.
+    """
+    width, height = (int(dimension) for dimension in size.split('x'))
+    samples = [depth for depth in depths if depth is not None]
+    if not samples:
+        return '—'
+
+    highest = max(max(samples), 1)
+    step = width / max(len(depths) - 1, 1)
+    segments: list[list[str]] = []
+    points: list[str] = []
+    for index, depth in enumerate(depths):
+        if depth is None:
+            if points:
+                segments.append(points)
+                points = []
+            continue
+        points.append(f'{index * step:.1f},{height - 1 - depth / highest * (height - 2):.1f}')
+    if points:
+        segments.append(points)
+
+    polylines = ''.join(
+        f'<polyline points="{" ".join(points)}" fill="none" stroke="currentColor" stroke-width="1"/>'
+        if len(points) > 1
+        else f'<circle cx="{points[0].split(",")[0]}" cy="{points[0].split(",")[1]}" r="1" fill="currentColor"/>'
+        for points in segments
+    )
+    return mark_safe(
+        f'<svg class="rq-sparkline" width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
+        f'role="img"><title>Latest {samples[-1]}, peak {max(samples)}</title>{polylines}</svg>'
+    )
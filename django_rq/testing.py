@@ -0,0 +1,71 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.test import override_settings
+
+from .instrumentation import RedisStats, track_redis
+
+
+class RedisAssertionsMixin:
+    """
+    Assertions on the Redis usage of a block or function, for test cases.
+    Instrumentation is enabled for their duration, so only connections
+    created within them, e.g. with ``get_queue()``, are tracked.
+    """
+
+    @contextmanager
+    def _assert_max_redis_usage(self, attribute: str, label: str, num: int) -> Iterator[RedisStats]:
+        with override_settings(RQ={**getattr(settings, 'RQ', {}), 'REDIS_INSTRUMENTATION': True}):
+            with track_redis() as stats:
+                yield stats
+        value = getattr(stats, attribute)
+        if value > num:
+            commands = ', '.join(f'{command} x{count}' for command, count in stats.command_counts.most_common())
+            self.fail(f'{value} Redis {label} made, expected at most {num}. Commands: {commands}')  # type: ignore[attr-defined]
+
+    def assertMaxRedisRoundTrips(self, num: int, func: Optional[Callable] = None, *args: Any, **kwargs: Any) -> Any:
+        """Like ``assertNumQueries``, for the maximum number of round trips to Redis"""
+        context = self._assert_max_redis_usage('round_trips', 'round trips', num)
+        if func is None:
+            return context
+        with context:
+            func(*args, **kwargs)
+
+    def assertMaxRedisCommands(self, num: int, func: Optional[Callable] = None, *args: Any, **kwargs: Any) -> Any:
+        """Like ``assertNumQueries``, for the maximum number of Redis commands"""
+        context = self._assert_max_redis_usage('commands', 'commands', num)
+        if func is None:
+            return context
+        with context:
+            func(*args, **kwargs)
+
+
+_span_exporter = None
+
+
+@contextmanager
+def capture_spans() -> Iterator[Any]:
+    """
+    Records the OpenTelemetry spans finished within the block in memory.
+    Yields an ``InMemorySpanExporter``, whose ``get_finished_spans()``
+    returns them. Requires ``opentelemetry-sdk``, whose tracer provider is
+    installed globally unless the global provider is already one.
+    """
+    global _span_exporter
+    if _span_exporter is None:
+        from opentelemetry import trace
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        provider = trace.get_tracer_provider()
+        if not isinstance(provider, TracerProvider):
+            provider = TracerProvider()
+            trace.set_tracer_provider(provider)
+        _span_exporter = InMemorySpanExporter()
+        provider.add_span_processor(SimpleSpanProcessor(_span_exporter))
+
+    _span_exporter.clear()
+    yield _span_exporter
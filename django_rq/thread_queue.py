@@ -1,5 +1,8 @@
 import threading
-from typing import TYPE_CHECKING, Any
+import time
+from typing import TYPE_CHECKING, Any, Callable, Union
+
+from . import signals
 
 if TYPE_CHECKING:
     from .queues import DjangoRQ
@@ -18,13 +21,16 @@ def get_queue():
 
     job_queue = [(default_queue, foo, {'kwargs': {'bar': 'baz'}})]
 
+    Calls other than enqueueing a job, e.g. scheduling a debounced job, are
+    stored with the function to call instead of the queue.
+
     This implementation is heavily inspired by
     https://github.com/chrisdoble/django-celery-transactions
     """
     return _thread_data.__dict__.setdefault("job_queue", [])
 
 
-def add(queue: 'DjangoRQ', args: tuple, kwargs: dict) -> None:
+def add(queue: Union['DjangoRQ', Callable], args: tuple, kwargs: dict) -> None:
     get_queue().append((queue, args, kwargs))
 
 
@@ -33,13 +39,19 @@ def commit(*args: Any, **kwargs: Any) -> None:
     Processes all jobs in the delayed queue.
     """
     delayed_queue = get_queue()
+    count = len(delayed_queue)
+    start = time.perf_counter()
     try:
         while delayed_queue:
             queue, args, kwargs = delayed_queue.pop(0)
-            queue.original_enqueue_call(*args, **kwargs)
+            enqueue = queue if callable(queue) else queue.original_enqueue_call
+            enqueue(*args, **kwargs)
     finally:
         clear()
 
+    if count and signals.jobs_flushed.receivers:
+        signals.jobs_flushed.send(sender=None, count=count, duration=time.perf_counter() - start)
+
 
 def clear(*args: Any, **kwargs: Any) -> None:
     try:
@@ -0,0 +1,109 @@
+"""
+OpenTelemetry tracing of jobs, from the span they were enqueued in to their
+execution by workers. Enabled when ``opentelemetry-api`` is installed, unless
+disabled in settings.py:
+RQ = {
+    'TRACING': False,
+}
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from django.conf import settings
+from rq.job import Job
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import Link, Span, SpanKind
+except ImportError:
+    propagate = trace = None
+
+TRACE_CONTEXT_META_KEY = 'trace_context'
+
+
+def is_tracing_enabled() -> bool:
+    return trace is not None and getattr(settings, 'RQ', {}).get('TRACING', True)
+
+
+def get_tracer() -> 'trace.Tracer':
+    from . import __version__
+
+    assert trace is not None
+    return trace.get_tracer('django_rq', __version__)
+
+
+@contextmanager
+def trace_enqueue(queue_name: str, job_kwargs: dict[str, Any]) -> Iterator[Optional['Span']]:
+    """
+    Starts a producer span for enqueueing a job with ``job_kwargs``, whose
+    context is added to the job's ``meta`` so the job's execution can be
+    traced as part of the same trace. Yields the span, or ``None`` if
+    tracing is disabled.
+    """
+    if not is_tracing_enabled():
+        yield None
+        return
+    assert propagate is not None
+
+    attributes = {
+        'messaging.system': 'rq',
+        'messaging.operation': 'publish',
+        'messaging.destination.name': queue_name,
+    }
+    with get_tracer().start_as_current_span(
+        f'publish {queue_name}', kind=SpanKind.PRODUCER, attributes=attributes
+    ) as span:
+        carrier: dict[str, str] = {}
+        propagate.inject(carrier)
+        # Nothing is injected unless a tracer provider records spans
+        if carrier:
+            job_kwargs['meta'] = {**(job_kwargs.get('meta') or {}), TRACE_CONTEXT_META_KEY: carrier}
+        yield span
+
+
+@contextmanager
+def trace_job(job: Job, queue_name: str) -> Iterator[Optional['Span']]:
+    """
+    Starts a consumer span for performing ``job``, a child of and linked to
+    the span it was enqueued in, if any. Exceptions raised by the job are
+    recorded on the span. Yields the span, or ``None`` if tracing is disabled.
+    """
+    if not is_tracing_enabled():
+        yield None
+        return
+    assert propagate is not None and trace is not None
+
+    context = propagate.extract(job.meta.get(TRACE_CONTEXT_META_KEY) or {})
+    producer = trace.get_current_span(context).get_span_context()
+    attributes: dict[str, Any] = {
+        'messaging.system': 'rq',
+        'messaging.operation': 'process',
+        'messaging.destination.name': queue_name,
+        'messaging.message.id': job.id,
+        'code.function': job.func_name or '',
+    }
+    if job.enqueued_at is not None and job.started_at is not None:
+        # Time the job spent waiting in the queue
+        attributes['messaging.rq.queue_latency'] = (job.started_at - job.enqueued_at).total_seconds()
+    with get_tracer().start_as_current_span(
+        f'process {queue_name}',
+        context=context,
+        kind=SpanKind.CONSUMER,
+        links=[Link(producer)] if producer.is_valid else None,
+        attributes=attributes,
+    ) as span:
+        yield span
+
+
+def flush_spans() -> None:
+    """
+    Exports the spans that ended so far, if the tracer provider batches them.
+    Work horses exit with ``os._exit()``, before batched spans are exported.
+    """
+    if trace is None:
+        return
+    force_flush = getattr(trace.get_tracer_provider(), 'force_flush', None)
+    if force_flush is not None:
+        force_flush()
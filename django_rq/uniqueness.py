@@ -0,0 +1,58 @@
+from typing import Optional
+
+from redis import Redis
+from redis.commands.core import Script
+from rq.job import Job
+
+UNIQUE_KEY_PREFIX = 'rq:unique:'
+SUPPRESSED_KEY_PREFIX = 'rq:unique-suppressed:'
+DEBOUNCE_KEY_PREFIX = 'rq:debounce:'
+
+# Unique keys without ``unique_for`` are deleted once their job starts, they
+# only expire after a day in case the job never runs
+DEFAULT_UNIQUE_TTL = 24 * 60 * 60
+
+# Deletes the unique key KEYS[1] if it's still held by the job ARGV[1]
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_release_script: Optional[Script] = None
+
+
+def get_unique_key(key: str) -> str:
+    return f'{UNIQUE_KEY_PREFIX}{key}'
+
+
+def get_debounce_key(key: str) -> str:
+    return f'{DEBOUNCE_KEY_PREFIX}{key}'
+
+
+def get_suppressed_key(queue_name: str) -> str:
+    return f'{SUPPRESSED_KEY_PREFIX}{queue_name}'
+
+
+def get_suppressed_count(connection: Redis, queue_name: str) -> int:
+    """
+    Returns the number of duplicate jobs that weren't enqueued to the queue,
+    including debounced jobs that were postponed instead
+    """
+    return int(connection.get(get_suppressed_key(queue_name)) or 0)
+
+
+def release_unique_key(connection: Redis, job: Job) -> None:
+    """
+    Allows jobs with the same unique key as ``job`` to be enqueued again. Only
+    jobs enqueued without ``unique_for`` have their unique key in their meta.
+    """
+    global _release_script
+
+    key = job.meta.get('unique_key')
+    if key is None:
+        return
+    if _release_script is None:
+        _release_script = connection.register_script(RELEASE_SCRIPT)
+    _release_script(keys=[get_unique_key(key)], args=[job.id], client=connection)
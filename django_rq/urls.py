@@ -4,6 +4,7 @@ from django.urls import URLPattern, path, re_path
 
 from . import cron_views, stats_views, views
 from .contrib.prometheus import RQCollector
+from .instrumentation import instrument_view
 
 
 def get_api_urlpatterns(name_prefix: str = '') -> list[URLPattern]:
@@ -19,7 +20,7 @@ def get_api_urlpatterns(name_prefix: str = '') -> list[URLPattern]:
     # Conditional metrics view (only if prometheus_client is installed)
     metrics_view = (
         [
-            re_path(r'^metrics/?$', stats_views.prometheus_metrics, name=f'{name_prefix}metrics'),
+            re_path(r'^metrics/?$', instrument_view(stats_views.prometheus_metrics), name=f'{name_prefix}metrics'),
         ]
         if RQCollector is not None
         else []
@@ -27,8 +28,14 @@ def get_api_urlpatterns(name_prefix: str = '') -> list[URLPattern]:
 
     return [
         # Stats JSON (supports API token authentication)
-        re_path(r'^stats.json/?$', stats_views.stats_json, name=f'{name_prefix}home_json'),
-        re_path(r'^stats.json/(?P<token>[\w]+)?/?$', stats_views.stats_json, name=f'{name_prefix}home_json'),
+        re_path(r'^stats.json/?$', instrument_view(stats_views.stats_json), name=f'{name_prefix}home_json'),
+        re_path(
+            r'^stats.json/(?P<token>[\w]+)?/?$', instrument_view(stats_views.stats_json), name=f'{name_prefix}home_json'
+        ),
+        # Per-function statistics (supports API token authentication)
+        re_path(
+            r'^functions.json/?$', instrument_view(stats_views.functions_json), name=f'{name_prefix}functions_json'
+        ),
         # Prometheus metrics (supports API token authentication)
         *metrics_view,
     ]
@@ -46,12 +53,14 @@ def get_admin_urlpatterns(name_prefix: str = '', view_wrapper: Optional[Callable
     """
 
     def maybe_wrap(view: Callable) -> Callable:
-        """Apply wrapper if provided, otherwise return view as-is"""
+        """Instrument the view and apply wrapper if provided"""
+        view = instrument_view(view)
         return view_wrapper(view) if view_wrapper else view
 
     return [
         # Dashboard
         path('', maybe_wrap(stats_views.stats), name=f'{name_prefix}home'),
+        path('functions/', maybe_wrap(stats_views.functions), name=f'{name_prefix}functions'),
         # Queue views
         path('queues/<int:queue_index>/', maybe_wrap(views.jobs), name=f'{name_prefix}jobs'),
         path('queues/<int:queue_index>/details/', maybe_wrap(views.queue_details), name=f'{name_prefix}queue_details'),
@@ -62,6 +71,7 @@ def get_admin_urlpatterns(name_prefix: str = '', view_wrapper: Optional[Callable
         path('queues/<int:queue_index>/started/', maybe_wrap(views.started_jobs), name=f'{name_prefix}started_jobs'),
         path('queues/<int:queue_index>/deferred/', maybe_wrap(views.deferred_jobs), name=f'{name_prefix}deferred_jobs'),
         path('queues/<int:queue_index>/empty/', maybe_wrap(views.clear_queue), name=f'{name_prefix}clear'),
+        path('queues/<int:queue_index>/slow/', maybe_wrap(views.slow_jobs), name=f'{name_prefix}slow_jobs'),
         path('queues/<int:queue_index>/requeue-all/', maybe_wrap(views.requeue_all), name=f'{name_prefix}requeue_all'),
         # Job detail and actions
         path('queues/<int:queue_index>/<str:job_id>/', maybe_wrap(views.job_detail), name=f'{name_prefix}job_detail'),
@@ -19,11 +19,19 @@ from rq.registry import (
 from rq.worker import Worker
 from rq.worker_registration import clean_worker_registry
 
-from .connection_utils import get_connection, get_redis_connection, get_unique_connection_configs
+from .connection_utils import (
+    filter_connection_params,
+    get_connection,
+    get_redis_connection,
+    get_unique_connection_configs,
+)
 from .cron import DjangoCronScheduler
+from .fanout import describe_error, fan_out
 from .queues import get_queue_by_index, get_scheduler
+from .rate_limits import get_tokens
 from .settings import get_queues_list
 from .templatetags.django_rq import to_localtime
+from .uniqueness import get_suppressed_count
 
 
 def get_scheduler_pid(queue: Queue) -> Union[bool, int, None]:
@@ -106,102 +114,148 @@ def get_displayable_connection_kwargs(queue: Queue) -> dict[str, Any]:
     }
 
 
-def get_statistics(run_maintenance_tasks: bool = False) -> dict[str, list[dict[str, Any]]]:
-    queues = []
+def get_queue_index_groups() -> list[list[int]]:
+    """Returns the indexes of all queues in ``get_queues_list()``, grouped by Redis connection"""
+    groups: list[tuple[dict[str, Any], list[int]]] = []
     for index, config in enumerate(get_queues_list()):
-        queue = get_queue_by_index(index)
-        connection = queue.connection
-
-        if run_maintenance_tasks:
-            clean_registries(queue)
-            clean_worker_registry(queue)
-
-        # Raw access to the first item from left of the redis list.
-        # This might not be accurate since new job can be added from the left
-        # with `at_front` parameters.
-        # Ideally rq should supports Queue.oldest_job
-        last_job_id = connection.lindex(queue.key, 0)
-        last_job = queue.fetch_job(last_job_id.decode('utf-8')) if last_job_id else None
-        if last_job:
-            oldest_job_timestamp = to_localtime(last_job.enqueued_at).strftime('%Y-%m-%d, %H:%M:%S')
+        connection_params = filter_connection_params(config['connection_config'])
+        for params, indexes in groups:
+            if params == connection_params:
+                indexes.append(index)
+                break
         else:
-            oldest_job_timestamp = "-"
-
-        connection_kwargs = get_displayable_connection_kwargs(queue)
+            groups.append((connection_params, [index]))
+    return [indexes for _, indexes in groups]
+
+
+def get_queue_statistics(index: int, run_maintenance_tasks: bool = False) -> dict[str, Any]:
+    queue = get_queue_by_index(index)
+    connection = queue.connection
+
+    if run_maintenance_tasks:
+        clean_registries(queue)
+        clean_worker_registry(queue)
+
+    # Raw access to the first item from left of the redis list.
+    # This might not be accurate since new job can be added from the left
+    # with `at_front` parameters.
+    # Ideally rq should supports Queue.oldest_job
+    last_job_id = connection.lindex(queue.key, 0)
+    last_job = queue.fetch_job(last_job_id.decode('utf-8')) if last_job_id else None
+    if last_job:
+        oldest_job_timestamp = to_localtime(last_job.enqueued_at).strftime('%Y-%m-%d, %H:%M:%S')
+    else:
+        oldest_job_timestamp = "-"
+
+    connection_kwargs = get_displayable_connection_kwargs(queue)
+
+    queue_data = {
+        'name': queue.name,
+        'jobs': queue.count,
+        'oldest_job_timestamp': oldest_job_timestamp,
+        'index': index,
+        'connection_kwargs': connection_kwargs,
+        'scheduler_pid': get_scheduler_pid(queue),
+    }
 
-        queue_data = {
-            'name': queue.name,
-            'jobs': queue.count,
-            'oldest_job_timestamp': oldest_job_timestamp,
-            'index': index,
-            'connection_kwargs': connection_kwargs,
-            'scheduler_pid': get_scheduler_pid(queue),
+    connection = get_connection(queue.name)
+    queue_data['workers'] = Worker.count(queue=queue)
+
+    finished_job_registry = FinishedJobRegistry(queue.name, connection)
+    started_job_registry = StartedJobRegistry(queue.name, connection)
+    deferred_job_registry = DeferredJobRegistry(queue.name, connection)
+    failed_job_registry = FailedJobRegistry(queue.name, connection)
+    scheduled_job_registry = ScheduledJobRegistry(queue.name, connection)
+    queue_data['finished_jobs'] = len(finished_job_registry)
+    queue_data['started_jobs'] = len(started_job_registry)
+    queue_data['deferred_jobs'] = len(deferred_job_registry)
+    queue_data['failed_jobs'] = len(failed_job_registry)
+    queue_data['scheduled_jobs'] = len(scheduled_job_registry)
+    queue_data['suppressed_jobs'] = get_suppressed_count(connection, queue.name)
+
+    rate_limit = getattr(queue, 'rate_limit', None)
+    if rate_limit:
+        queue_data['rate_limit'] = {
+            'limit': str(rate_limit),
+            'tokens': get_tokens(connection, [(queue.name, rate_limit)])[0],
         }
+    else:
+        queue_data['rate_limit'] = None
 
-        connection = get_connection(queue.name)
-        queue_data['workers'] = Worker.count(queue=queue)
+    return queue_data
 
-        finished_job_registry = FinishedJobRegistry(queue.name, connection)
-        started_job_registry = StartedJobRegistry(queue.name, connection)
-        deferred_job_registry = DeferredJobRegistry(queue.name, connection)
-        failed_job_registry = FailedJobRegistry(queue.name, connection)
-        scheduled_job_registry = ScheduledJobRegistry(queue.name, connection)
-        queue_data['finished_jobs'] = len(finished_job_registry)
-        queue_data['started_jobs'] = len(started_job_registry)
-        queue_data['deferred_jobs'] = len(deferred_job_registry)
-        queue_data['failed_jobs'] = len(failed_job_registry)
-        queue_data['scheduled_jobs'] = len(scheduled_job_registry)
 
-        queues.append(queue_data)
+def get_statistics(run_maintenance_tasks: bool = False) -> dict[str, list[dict[str, Any]]]:
+    """
+    Returns the statistics of all queues. Redis connections are queried
+    concurrently. Queues whose Redis server fails or doesn't answer in time
+    only have their ``name``, ``index`` and an ``error``.
+    """
+    queues_list = get_queues_list()
+    groups = get_queue_index_groups()
+
+    def get_group_statistics(indexes: list[int]) -> list[dict[str, Any]]:
+        return [get_queue_statistics(index, run_maintenance_tasks) for index in indexes]
+
+    queues: dict[int, dict[str, Any]] = {}
+    for indexes, result in zip(groups, fan_out(get_group_statistics, groups)):
+        if isinstance(result, Exception):
+            error = describe_error(result)
+            for index in indexes:
+                queues[index] = {'name': queues_list[index]['name'], 'index': index, 'error': error}
+        else:
+            queues.update(zip(indexes, result))
 
-    return {'queues': queues}
+    return {'queues': [queues[index] for index in range(len(queues_list))]}
 
 
 def get_scheduler_statistics() -> dict[str, dict[str, Any]]:
-    schedulers = {}
+    # there is only one scheduler per redis connection, so we use the connection as key
+    # to handle the possibility of a configuration with multiple redis connections and scheduled
+    # jobs in more than one of them
+    first_queues: dict[str, tuple[int, str]] = {}
     for index, config in enumerate(get_queues_list()):
-        # there is only one scheduler per redis connection, so we use the connection as key
-        # to handle the possibility of a configuration with multiple redis connections and scheduled
-        # jobs in more than one of them
         queue = get_queue_by_index(index)
         connection_kwargs = get_displayable_connection_kwargs(queue)
         conn_key = (
             f"{connection_kwargs.get('host', 'NOHOST')}:{connection_kwargs.get('port', 6379)}/"
             f"{connection_kwargs.get('db', 0)}"
         )
-        if conn_key not in schedulers:
-            try:
-                scheduler = get_scheduler(config['name'])
-                schedulers[conn_key] = {
-                    'count': scheduler.count(),
-                    'index': index,
-                }
-            except ImproperlyConfigured:
-                pass
+        first_queues.setdefault(conn_key, (index, config['name']))
+
+    def count_scheduled_jobs(conn_key: str) -> dict[str, int]:
+        index, queue_name = first_queues[conn_key]
+        return {'count': get_scheduler(queue_name).count(), 'index': index}
+
+    schedulers = {}
+    conn_keys = list(first_queues)
+    for conn_key, result in zip(conn_keys, fan_out(count_scheduled_jobs, conn_keys)):
+        # Skip connections without rq-scheduler or whose Redis server failed
+        if not isinstance(result, Exception):
+            schedulers[conn_key] = result
     return {'schedulers': schedulers}
 
 
 def get_cron_schedulers() -> list[DjangoCronScheduler]:
     """
     Fetches all running CronScheduler instances from each unique Redis connection
-    defined in RQ_QUEUES.
+    defined in RQ_QUEUES, querying connections concurrently.
 
     Returns:
         List of running DjangoCronScheduler instances
     """
-    unique_configs = get_unique_connection_configs()
-    cron_schedulers = []
 
-    for config in unique_configs:
-        try:
-            connection = get_redis_connection(config)
-            # Fetch all running schedulers for this connection
-            schedulers = DjangoCronScheduler.all(connection, cleanup=True)
-            cron_schedulers.extend(schedulers)
-        except Exception:
-            # Skip configs that fail to create a connection
-            # (e.g., USE_REDIS_CACHE without django-redis installed)
-            pass
+    def get_schedulers(config: dict[str, Any]) -> list[DjangoCronScheduler]:
+        connection = get_redis_connection(config)
+        # Fetch all running schedulers for this connection
+        return DjangoCronScheduler.all(connection, cleanup=True)
+
+    cron_schedulers = []
+    for result in fan_out(get_schedulers, get_unique_connection_configs()):
+        # Skip configs that fail to create a connection
+        # (e.g., USE_REDIS_CACHE without django-redis installed)
+        if not isinstance(result, Exception):
+            cron_schedulers.extend(result)
 
     return cron_schedulers
 
@@ -223,7 +277,7 @@ def get_jobs(
     1. If job data is not present in Redis, discard the result
     2. If `registry` argument is supplied, delete empty jobs from registry
     """
-    jobs = Job.fetch_many(job_ids, connection=queue.connection, serializer=queue.serializer)
+    jobs = queue.job_class.fetch_many(job_ids, connection=queue.connection, serializer=queue.serializer)
     valid_jobs = []
     for i, job in enumerate(jobs):
         if job is None:
@@ -290,3 +344,16 @@ def requeue_job(queue: Queue, job: Job) -> None:
 def reset_db_connections() -> None:
     for c in connections.all():
         c.close()
+
+
+def close_old_db_connections(persistent: bool = False) -> None:
+    """
+    Closes database connections that are unusable or have exceeded their
+    ``CONN_MAX_AGE``, like Django does at the start and end of each request.
+    If ``persistent`` is True, ``CONN_MAX_AGE`` is ignored and healthy
+    connections are kept open.
+    """
+    for c in connections.all(initialized_only=True):
+        if persistent:
+            c.close_at = None
+        c.close_if_unusable_or_obsolete()
@@ -10,7 +10,6 @@ from django.views.decorators.cache import never_cache
 from django.views.decorators.http import require_POST
 from rq import requeue_job
 from rq.exceptions import NoSuchJobError
-from rq.job import Job
 from rq.registry import (
     DeferredJobRegistry,
     FailedJobRegistry,
@@ -21,8 +20,11 @@ from rq.registry import (
 from rq.worker import Worker
 from rq.worker_registration import clean_worker_registry
 
+from .history import get_queue_depth_history
+from .profiling import get_profile, get_profiles
 from .queues import get_queue_by_index, get_scheduler_by_index
 from .settings import get_queues_list, get_queues_map
+from .slowlog import clear_slowlog, get_slow_job_threshold, get_slow_jobs, get_slowest_functions, get_slowlog_key
 from .utils import (
     get_displayable_connection_kwargs,
     get_executions,
@@ -104,6 +106,8 @@ def queue_details(request: HttpRequest, queue_index: int) -> HttpResponse:
         'num_failed': len(FailedJobRegistry(queue.name, connection)),
         'num_deferred': len(DeferredJobRegistry(queue.name, connection)),
         'num_scheduled': len(ScheduledJobRegistry(queue.name, connection)),
+        'num_slow_jobs': connection.xlen(get_slowlog_key(queue.name)),
+        'depth_history': get_queue_depth_history([queue])[queue.name],
         'scheduler_pid': get_scheduler_pid(queue),
         'oldest_queued_job': oldest_queued_job,
         'newest_queued_job': newest_queued_job,
@@ -323,6 +327,29 @@ def worker_details(request: HttpRequest, queue_index: int, key: str) -> HttpResp
     return render(request, 'django_rq/worker_details.html', context_data)
 
 
+@never_cache
+@staff_member_required
+def slow_jobs(request: HttpRequest, queue_index: int) -> HttpResponse:
+    queue = get_queue_by_index(queue_index)
+
+    if request.method == 'POST':
+        clear_slowlog(queue.connection, queue.name)
+        messages.info(request, f'You have successfully cleared the slow job log of queue {queue.name}')
+        return redirect(rq_viewname(request, 'slow_jobs'), queue_index)
+
+    entries = get_slow_jobs(queue.connection, queue.name)
+    context_data = {
+        **each_context(request),
+        'queue': queue,
+        'queue_index': queue_index,
+        'threshold': get_slow_job_threshold(queue.name),
+        'functions': get_slowest_functions(entries),
+        'slow_jobs': entries[:100],
+        'num_slow_jobs': len(entries),
+    }
+    return render(request, 'django_rq/slow_jobs.html', context_data)
+
+
 @never_cache
 @staff_member_required
 def deferred_jobs(request: HttpRequest, queue_index: int) -> HttpResponse:
@@ -347,7 +374,7 @@ def deferred_jobs(request: HttpRequest, queue_index: int) -> HttpResponse:
         job_ids = registry.get_job_ids(offset, offset + items_per_page - 1, desc=sort_direction == 'descending')
         for job_id in job_ids:
             try:
-                jobs.append(Job.fetch(job_id, connection=queue.connection, serializer=queue.serializer))
+                jobs.append(queue.job_class.fetch(job_id, connection=queue.connection, serializer=queue.serializer))
             except NoSuchJobError:
                 pass
 
@@ -374,7 +401,7 @@ def job_detail(request: HttpRequest, queue_index: int, job_id: str) -> HttpRespo
     queue = get_queue_by_index(queue_index)
 
     try:
-        job = Job.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
+        job = queue.job_class.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
     except NoSuchJobError:
         raise Http404(f"Couldn't find job with this ID: {job_id}")
 
@@ -402,7 +429,7 @@ def job_detail(request: HttpRequest, queue_index: int, job_id: str) -> HttpRespo
     # )
     for dependency_id in job._dependency_ids:
         try:
-            dependency = Job.fetch(dependency_id, connection=queue.connection, serializer=queue.serializer)
+            dependency = queue.job_class.fetch(dependency_id, connection=queue.connection, serializer=queue.serializer)
         except NoSuchJobError:
             dependency = None
         dependencies.append((dependency_id, dependency))
@@ -410,11 +437,17 @@ def job_detail(request: HttpRequest, queue_index: int, job_id: str) -> HttpRespo
     dependents = []
     for dependent_id in job.dependent_ids:
         try:
-            dependent = Job.fetch(dependent_id, connection=queue.connection, serializer=queue.serializer)
+            dependent = queue.job_class.fetch(dependent_id, connection=queue.connection, serializer=queue.serializer)
         except NoSuchJobError:
             dependent = None
         dependents.append((dependent_id, dependent))
 
+    # The profile of the most recent profiled execution, if any
+    profiles = get_profiles(queue.connection, job.id)
+    profile = None
+    if profiles:
+        profile = next((profiles[result.id] for result in job.results() if result.id in profiles), None)
+
     context_data = {
         **each_context(request),
         'queue_index': queue_index,
@@ -424,6 +457,7 @@ def job_detail(request: HttpRequest, queue_index: int, job_id: str) -> HttpRespo
         'exc_info': exc_info,
         'dependencies': dependencies,
         'dependents': dependents,
+        'profile': profile,
     }
     return render(request, 'django_rq/job_detail.html', context_data)
 
@@ -434,7 +468,7 @@ def result_detail(request: HttpRequest, queue_index: int, job_id: str, result_id
     queue = get_queue_by_index(queue_index)
 
     try:
-        job = Job.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
+        job = queue.job_class.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
     except NoSuchJobError:
         raise Http404(f"Couldn't find job with this ID: {job_id}")
 
@@ -448,6 +482,7 @@ def result_detail(request: HttpRequest, queue_index: int, job_id: str, result_id
         'job': job,
         'queue': queue,
         'result': result,
+        'profile': get_profile(queue.connection, job.id, result_id),
     }
     return render(request, 'django_rq/result_detail.html', context_data)
 
@@ -456,7 +491,7 @@ def result_detail(request: HttpRequest, queue_index: int, job_id: str, result_id
 @staff_member_required
 def delete_job(request: HttpRequest, queue_index: int, job_id: str) -> HttpResponse:
     queue = get_queue_by_index(queue_index)
-    job = Job.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
+    job = queue.job_class.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
 
     if request.method == 'POST':
         # Remove job id from queue and delete the actual job
@@ -478,7 +513,7 @@ def delete_job(request: HttpRequest, queue_index: int, job_id: str) -> HttpRespo
 @staff_member_required
 def requeue_job_view(request: HttpRequest, queue_index: int, job_id: str) -> HttpResponse:
     queue = get_queue_by_index(queue_index)
-    job = Job.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
+    job = queue.job_class.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
 
     if request.method == 'POST':
         requeue_job(job_id, connection=queue.connection, serializer=queue.serializer)
@@ -550,7 +585,7 @@ def delete_failed_jobs(request: HttpRequest, queue_index: int) -> HttpResponse:
 
     if request.method == 'POST':
         job_ids = registry.get_job_ids()
-        jobs = Job.fetch_many(job_ids, connection=queue.connection)
+        jobs = queue.job_class.fetch_many(job_ids, connection=queue.connection, serializer=queue.serializer)
         count = 0
         for job in jobs:
             if job:
@@ -584,7 +619,7 @@ def confirm_action(request: HttpRequest, queue_index: int) -> HttpResponse:
             jobs: list[Any] = []
             for job_id in job_ids:
                 try:
-                    jobs.append(Job.fetch(job_id, connection=queue.connection, serializer=queue.serializer))
+                    jobs.append(queue.job_class.fetch(job_id, connection=queue.connection, serializer=queue.serializer))
                     actionable_job_ids.append(job_id)
                 except NoSuchJobError:
                     jobs.append({'id': job_id, 'missing': True})
@@ -615,7 +650,7 @@ def actions(request: HttpRequest, queue_index: int) -> HttpResponse:
 
             if request.POST['action'] == 'delete':
                 for job_id in job_ids:
-                    job = Job.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
+                    job = queue.job_class.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
                     # Remove job id from queue and delete the actual job
                     queue.connection.lrem(queue.key, 0, job.id)
                     job.delete()
@@ -624,7 +659,7 @@ def actions(request: HttpRequest, queue_index: int) -> HttpResponse:
                 requeued = 0
                 for job_id in job_ids:
                     try:
-                        job = Job.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
+                        job = queue.job_class.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
                     except NoSuchJobError:
                         continue
                     _requeue_job(queue, job)
@@ -648,7 +683,7 @@ def actions(request: HttpRequest, queue_index: int) -> HttpResponse:
 def enqueue_job(request: HttpRequest, queue_index: int, job_id: str) -> HttpResponse:
     """Enqueue deferred jobs"""
     queue = get_queue_by_index(queue_index)
-    job = Job.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
+    job = queue.job_class.fetch(job_id, connection=queue.connection, serializer=queue.serializer)
 
     if request.method == 'POST':
         _requeue_job(queue, job)
@@ -0,0 +1,410 @@
+import math
+import os
+import signal
+import time
+from collections.abc import Iterable
+from multiprocessing.process import BaseProcess
+from typing import Any, NamedTuple, Optional, Union
+from uuid import uuid4
+
+from django.conf import settings
+from redis import ConnectionPool
+from rq.defaults import DEFAULT_WORKER_TTL
+from rq.job import Job
+from rq.queue import Queue
+from rq.serializers import DefaultSerializer
+from rq.utils import as_text, import_attribute, now, utcparse
+from rq.worker import BaseWorker, Worker, WorkerStatus
+from rq.worker_pool import ForkProcess, WorkerData, WorkerPool
+
+from .contrib.prometheus import get_worker_metrics, mark_worker_process_dead
+
+
+class QueueStats(NamedTuple):
+    """Backlog of the queues a worker pool listens on."""
+
+    queued: int
+    oldest_job_age: float
+
+
+class ScalingPolicy:
+    """
+    Decides how many workers a ``DjangoWorkerPool`` should run. Subclasses
+    implement ``get_num_workers()``, which is called every ``interval`` seconds.
+    """
+
+    interval: float = 5
+
+    def __init__(self, min_workers: int, max_workers: int):
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+
+    def get_num_workers(self, num_workers: int, stats: QueueStats) -> int:
+        """
+        Returns the desired number of workers given the number of running
+        workers and the current backlog. The result is clamped to
+        ``min_workers`` and ``max_workers`` by the pool.
+        """
+        raise NotImplementedError
+
+
+class BacklogScalingPolicy(ScalingPolicy):
+    """
+    Scales up when there are more than ``jobs_per_worker`` queued jobs per
+    running worker or when the oldest job has waited more than ``max_job_age``
+    seconds. Scales down one worker at a time once the queues have been empty
+    for ``scale_down_delay`` seconds.
+    """
+
+    jobs_per_worker: int = 10
+    max_job_age: float = 30
+    scale_up_cooldown: float = 10
+    scale_down_delay: float = 60
+
+    def __init__(self, min_workers: int, max_workers: int):
+        super().__init__(min_workers, max_workers)
+        self._last_scale_up: Optional[float] = None
+        self._empty_since: Optional[float] = None
+
+    def get_num_workers(self, num_workers: int, stats: QueueStats) -> int:
+        current_time = time.monotonic()
+
+        if stats.queued:
+            self._empty_since = None
+            if self._last_scale_up is not None and current_time - self._last_scale_up < self.scale_up_cooldown:
+                return num_workers
+
+            desired = num_workers
+            if stats.queued > num_workers * self.jobs_per_worker:
+                desired = math.ceil(stats.queued / self.jobs_per_worker)
+            if stats.oldest_job_age > self.max_job_age:
+                desired = max(desired, num_workers + 1)
+            if desired > num_workers:
+                self._last_scale_up = current_time
+            return desired
+
+        if self._empty_since is None:
+            self._empty_since = current_time
+            return num_workers
+        if current_time - self._empty_since >= self.scale_down_delay:
+            # Restart the delay so that workers are retired one at a time
+            self._empty_since = current_time
+            return num_workers - 1
+        return num_workers
+
+
+def get_scaling_policy_class(
+    scaling_policy_class: Optional[Union[str, type[ScalingPolicy]]] = None,
+) -> type[ScalingPolicy]:
+    """
+    Return scaling policy class from RQ settings, otherwise return
+    BacklogScalingPolicy. If `scaling_policy_class` is not None, it is used
+    as an override (can be python import path as string).
+    """
+    RQ = getattr(settings, 'RQ', {})
+
+    if scaling_policy_class is None:
+        scaling_policy_class = RQ.get('SCALING_POLICY_CLASS', BacklogScalingPolicy)
+
+    if isinstance(scaling_policy_class, str):
+        scaling_policy_class = import_attribute(scaling_policy_class)
+    return scaling_policy_class  # type: ignore[return-value]
+
+
+class DjangoWorkerPool(WorkerPool):
+    """
+    RQ's ``WorkerPool`` with Django specific additions. Used by the
+    ``rqworker-pool`` management command.
+
+    If a ``scaling_policy`` is given, the number of workers is adjusted
+    according to the backlog of the pool's queues. Surplus workers are
+    retired with a warm shutdown, preferring idle ones.
+
+    Workers exiting after ``max_jobs`` jobs or because they exceeded
+    ``max_memory`` are respawned. Like in RQ's pool, the scheduler runs unless
+    ``with_scheduler`` is False: a single worker of the pool is designated to
+    run it, another one takes over when it exits. With ``max_idle_time``, the
+    pool shuts down once its queues have been empty and its workers idle for
+    that many seconds.
+    """
+
+    def __init__(
+        self,
+        *args,
+        scaling_policy: Optional[ScalingPolicy] = None,
+        name: Optional[str] = None,
+        worker_ttl: int = DEFAULT_WORKER_TTL,
+        max_jobs: Optional[int] = None,
+        max_idle_time: Optional[int] = None,
+        max_memory: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        dequeue_strategy: str = 'default',
+        with_scheduler: bool = True,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        if name:
+            self.name = name
+        self.worker_ttl = worker_ttl
+        self.max_jobs = max_jobs
+        self.max_idle_time = max_idle_time
+        self.max_memory = max_memory
+        self.concurrency = concurrency
+        self.dequeue_strategy = dequeue_strategy
+        self.with_scheduler = with_scheduler
+        self.scaling_policy = scaling_policy
+        if scaling_policy is not None:
+            self.num_workers = min(max(self.num_workers, scaling_policy.min_workers), scaling_policy.max_workers)
+        self._initial_workers_started = False
+        self._logging_level = 'INFO'
+        self._last_scaling_check: Optional[float] = None
+        self._idle_since: Optional[float] = None
+        # Name of the worker designated to run the scheduler
+        self._scheduler_worker_name: Optional[str] = None
+        # Names of workers that have been asked to shut down
+        self._retiring_workers: set[str] = set()
+
+    def start(self, burst: bool = False, logging_level: str = 'INFO'):
+        self._logging_level = logging_level
+        super().start(burst=burst, logging_level=logging_level)
+
+    def start_workers(self, *args, **kwargs):
+        super().start_workers(*args, **kwargs)
+        self._initial_workers_started = True
+
+    def start_worker(
+        self,
+        count: Optional[int] = None,
+        burst: bool = True,
+        _sleep: float = 0,
+        logging_level: str = 'INFO',
+    ):
+        """
+        Starts a worker and adds the data to worker_dict. Worker names are
+        prefixed with the pool name.
+        """
+        name = f'{self.name}.{uuid4().hex[:8]}'
+        if self.with_scheduler and self._scheduler_worker_name is None:
+            self._scheduler_worker_name = name
+        process = self.get_worker_process(name, burst=burst, _sleep=_sleep, logging_level=logging_level)
+        process.start()
+        self.worker_dict[name] = WorkerData(name=name, pid=process.pid, process=process)  # type: ignore[arg-type]
+        self.log.debug('Spawned worker: %s with PID %d', name, process.pid)
+
+        metrics = get_worker_metrics()
+        if metrics is not None:
+            metrics.pool_workers_started.inc()
+            if self._initial_workers_started:
+                metrics.pool_workers_respawned.inc()
+
+    def get_worker_process(
+        self,
+        name: str,
+        burst: bool,
+        _sleep: float = 0,
+        logging_level: str = 'INFO',
+    ) -> BaseProcess:
+        """Returns the worker process"""
+        return ForkProcess(
+            target=run_worker,
+            args=(name, self._queue_names, self._connection_class, self._pool_class, self._pool_kwargs),
+            kwargs={
+                '_sleep': _sleep,
+                'burst': burst,
+                'logging_level': logging_level,
+                'worker_class': self.worker_class,
+                'job_class': self.job_class,
+                'queue_class': self.queue_class,
+                'serializer': self.serializer,
+                'exception_handlers': self.exception_handlers,
+                'worker_ttl': self.worker_ttl,
+                'max_jobs': self.max_jobs,
+                'max_memory': self.max_memory,
+                'concurrency': self.concurrency,
+                'dequeue_strategy': self.dequeue_strategy,
+                'with_scheduler': name == self._scheduler_worker_name,
+            },
+            name=f'Worker {name} (WorkerPool {self.name})',
+        )
+
+    def handle_dead_worker(self, worker_data: WorkerData):
+        super().handle_dead_worker(worker_data)
+        self._retiring_workers.discard(worker_data.name)
+        if worker_data.name == self._scheduler_worker_name:
+            # The next spawned worker takes over the scheduler
+            self._scheduler_worker_name = None
+        mark_worker_process_dead(worker_data.pid)
+        metrics = get_worker_metrics()
+        if metrics is not None:
+            metrics.pool_workers_died.inc()
+
+    @property
+    def number_of_serving_workers(self) -> int:
+        """Returns the number of active workers that are not shutting down"""
+        return self.number_of_active_workers - len(self._retiring_workers)
+
+    def check_workers(self, respawn: bool = True) -> None:
+        """
+        Check whether workers are still alive, scale and respawn them
+        """
+        self.log.debug('Checking worker processes')
+        self.reap_workers()
+        if self.status == self.Status.STOPPED:
+            return
+
+        if self.max_idle_time is not None and self.is_idle_timeout_reached():
+            self.log.info('Worker pool %s: idle for %d seconds, shutting down', self.name, self.max_idle_time)
+            self.status = self.Status.STOPPED
+            self.stop_workers()
+            return
+
+        if respawn:
+            if self.scaling_policy is not None:
+                self.scale_workers()
+            delta = self.num_workers - self.number_of_serving_workers
+            for _ in range(delta):
+                self.start_worker(burst=self._burst, _sleep=self._sleep, logging_level=self._logging_level)
+
+    def get_worker_states(self) -> dict[str, Optional[str]]:
+        """Returns the state of every active worker, fetched in one pipeline"""
+        names = list(self.worker_dict)
+        with self.connection.pipeline() as pipeline:
+            for name in names:
+                pipeline.hget(self.worker_class.redis_worker_namespace_prefix + name, 'state')
+            states = pipeline.execute()
+        return {name: as_text(state) if state else None for name, state in zip(names, states)}
+
+    def is_idle_timeout_reached(self) -> bool:
+        """
+        Returns True once the queues have been empty and no worker has been
+        busy for ``max_idle_time`` seconds.
+        """
+        assert self.max_idle_time is not None
+        current_time = time.monotonic()
+        busy = self.get_queue_stats().queued or WorkerStatus.BUSY in self.get_worker_states().values()
+        if busy or self._idle_since is None:
+            self._idle_since = current_time
+            return False
+        return current_time - self._idle_since >= self.max_idle_time
+
+    def get_queue_stats(self) -> QueueStats:
+        """
+        Returns the backlog of the pool's queues, using one pipeline for
+        queue lengths and oldest job IDs and one for their enqueue times.
+        """
+        queues = self.queues
+        with self.connection.pipeline() as pipeline:
+            for queue in queues:
+                pipeline.llen(queue.key)
+                pipeline.lindex(queue.key, 0)
+            results = pipeline.execute()
+
+        queued = sum(results[::2])
+        oldest_job_ids = [as_text(job_id) for job_id in results[1::2] if job_id]
+        if not oldest_job_ids:
+            return QueueStats(queued=queued, oldest_job_age=0)
+
+        with self.connection.pipeline() as pipeline:
+            for job_id in oldest_job_ids:
+                pipeline.hget(self.job_class.key_for(job_id), 'enqueued_at')
+            timestamps = [utcparse(as_text(value)) for value in pipeline.execute() if value]
+
+        oldest_job_age = (now() - min(timestamps)).total_seconds() if timestamps else 0
+        return QueueStats(queued=queued, oldest_job_age=max(oldest_job_age, 0))
+
+    def scale_workers(self) -> None:
+        """Asks the scaling policy for the number of workers and applies it"""
+        assert self.scaling_policy is not None
+        current_time = time.monotonic()
+        if self._last_scaling_check is not None:
+            if current_time - self._last_scaling_check < self.scaling_policy.interval:
+                return
+        self._last_scaling_check = current_time
+
+        num_workers = self.number_of_serving_workers
+        desired = self.scaling_policy.get_num_workers(num_workers, self.get_queue_stats())
+        desired = min(max(desired, self.scaling_policy.min_workers), self.scaling_policy.max_workers)
+
+        if desired > num_workers:
+            self.log.info('Scaling up from %d to %d workers', num_workers, desired)
+            self.num_workers = desired
+        elif desired < num_workers:
+            retired = self.retire_workers(num_workers - desired)
+            if retired:
+                self.log.info('Scaling down from %d to %d workers', num_workers, num_workers - retired)
+            self.num_workers = num_workers - retired
+
+    def retire_workers(self, count: int) -> int:
+        """
+        Sends a warm shutdown signal to up to ``count`` idle workers and
+        returns the number of workers retired.
+        """
+        states = self.get_worker_states()
+        idle_workers = [
+            data
+            for name, data in self.worker_dict.items()
+            if states.get(name) == WorkerStatus.IDLE
+            and name not in self._retiring_workers
+            # Keep the worker running the scheduler
+            and name != self._scheduler_worker_name
+        ]
+        for data in idle_workers[:count]:
+            self._retiring_workers.add(data.name)
+            self.stop_worker(data, sig=signal.SIGINT)
+        return len(idle_workers[:count])
+
+
+def run_worker(
+    worker_name: str,
+    queue_names: Iterable[str],
+    connection_class,
+    connection_pool_class,
+    connection_pool_kwargs: dict,
+    worker_class: type[BaseWorker] = Worker,
+    serializer=DefaultSerializer,
+    job_class: type[Job] = Job,
+    queue_class: type[Queue] = Queue,
+    exception_handlers=None,
+    burst: bool = True,
+    logging_level: str = 'INFO',
+    _sleep: float = 0,
+    worker_ttl: int = DEFAULT_WORKER_TTL,
+    max_jobs: Optional[int] = None,
+    max_memory: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    dequeue_strategy: str = 'default',
+    with_scheduler: bool = True,
+):
+    """
+    Entry point of pool worker processes. Like RQ's ``run_worker`` but also
+    passes ``rqworker`` options on to the worker.
+    """
+    connection = connection_class(
+        connection_pool=ConnectionPool(connection_class=connection_pool_class, **connection_pool_kwargs)
+    )
+    queues = [queue_class(name, connection=connection, serializer=serializer) for name in queue_names]
+    worker_kwargs: dict[str, Any] = {}
+    if max_memory is not None:
+        worker_kwargs['max_memory'] = max_memory
+    if concurrency is not None:
+        worker_kwargs['concurrency'] = concurrency
+    worker = worker_class(
+        queues,
+        name=worker_name,
+        connection=connection,
+        serializer=serializer,
+        job_class=job_class,
+        queue_class=queue_class,
+        exception_handlers=exception_handlers,
+        worker_ttl=worker_ttl,
+        **worker_kwargs,
+    )
+    worker.log.info('Starting worker started with PID %s', os.getpid())
+    time.sleep(_sleep)
+    worker.work(
+        burst=burst,
+        with_scheduler=with_scheduler,
+        logging_level=logging_level,
+        max_jobs=max_jobs,
+        dequeue_strategy=dequeue_strategy,  # type: ignore[arg-type]
+    )
@@ -1,12 +1,45 @@
-from typing import Optional, Union
+import asyncio
+import contextlib
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from collections.abc import Coroutine, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from importlib import import_module
+from typing import Any, Optional, Union, cast
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from rq import Worker
-from rq.job import Job
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from redis.client import Pipeline
+from rq import SimpleWorker, Worker
+from rq.executions import Execution
+from rq.job import Job, JobStatus
+from rq.queue import Queue
+from rq.registry import StartedJobRegistry
+from rq.timeouts import JobTimeoutException, TimerDeathPenalty
 from rq.utils import import_attribute
+from rq.worker import WorkerStatus
 
+from .concurrency import acquire_slot, get_concurrency_limit, get_waiting_keys, release_slot
+from .function_stats import record_job
+from .history import record_queue_depths
 from .jobs import get_job_class
+from .live_stats import count_processed
+from .payloads import collect_payloads
+from .profiling import JobProfiler, get_profile_settings, get_profilers, save_profile
 from .queues import DjangoRQ, get_queues
+from .slowlog import log_slow_job
+from .tracing import flush_spans, is_tracing_enabled, trace_job
+from .uniqueness import release_unique_key
+from .utils import close_old_db_connections
+
+logger = logging.getLogger(__name__)
 
 
 def get_exception_handlers():
@@ -21,16 +54,591 @@ def get_exception_handlers():
     return [import_attribute(path) for path in EXCEPTION_HANDLERS]
 
 
+def get_memory_usage() -> int:
+    """
+    Returns the resident set size of the current process in bytes. Falls back
+    to the peak resident set size where ``/proc`` isn't available.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return get_peak_memory_usage(resource.getrusage(resource.RUSAGE_SELF))
+
+
+def get_peak_memory_usage(rusage) -> int:
+    """Returns ``ru_maxrss`` of ``rusage`` in bytes."""
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return rusage.ru_maxrss
+    return rusage.ru_maxrss * 1024
+
+
+DEQUEUE_STRATEGIES = ('default', 'random', 'round_robin', 'weighted')
+
+
+def get_dequeue_strategy(dequeue_strategy: Optional[str] = None) -> str:
+    """
+    Returns ``dequeue_strategy`` if given, otherwise the strategy defined in
+    settings.py:
+    RQ = {
+        'DEQUEUE_STRATEGY': 'weighted',
+    }
+    """
+    if dequeue_strategy is None:
+        dequeue_strategy = getattr(settings, 'RQ', {}).get('DEQUEUE_STRATEGY', 'default')
+    if dequeue_strategy not in DEQUEUE_STRATEGIES:
+        raise ImproperlyConfigured(f'DEQUEUE_STRATEGY must be one of {DEQUEUE_STRATEGIES}.')
+    return dequeue_strategy
+
+
+def get_preload_modules(module_names: Optional[Iterable[str]] = None) -> list[str]:
+    """
+    Returns ``module_names`` followed by the modules listed in settings.py:
+    RQ = {
+        'PRELOAD_MODULES': ['myapp.tasks'],
+    }
+    """
+    modules = list(module_names or [])
+    for name in getattr(settings, 'RQ', {}).get('PRELOAD_MODULES', []):
+        if name not in modules:
+            modules.append(name)
+    return modules
+
+
+def preload_modules(module_names: Iterable[str]) -> None:
+    """
+    Imports ``module_names`` and warms up Django's URL resolver and template
+    engines. Called in the worker process before any work horse is forked, so
+    that horses inherit all of it instead of loading it again for every job.
+    """
+    for name in module_names:
+        import_module(name)
+
+    from django.template import engines
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    # Accessing reverse_dict populates the resolver's lookup tables
+    resolver.reverse_dict
+    engines.all()
+
+
+class DjangoWorkerMixin:
+    """
+    Django specific additions shared by django-rq's worker classes.
+
+    If ``max_memory`` (in megabytes) is given, the worker shuts down gracefully
+    after a job once its resident memory, or the peak memory of the work horse
+    that performed the job, exceeds it.
+
+    Database connections that are unusable or have exceeded ``CONN_MAX_AGE``
+    are closed before and after every job. With ``persistent_db_connections``
+    (defaults to ``RQ['PERSISTENT_DB_CONNECTIONS']``), healthy connections are
+    kept open regardless of ``CONN_MAX_AGE``, which only makes a difference for
+    workers that don't fork a work horse for every job.
+
+    On top of RQ's dequeue strategies, the "weighted" strategy takes jobs from
+    each queue in proportion to its ``weight`` (see ``DjangoRQ.weight``), in
+    the manner of deficit round robin: queues earn credit according to their
+    weight and the queue with the most credit is tried first. Empty queues
+    don't accumulate credit, so a queue can't starve others after being idle.
+
+    Jobs whose function sets a concurrency limit (see ``@job``'s
+    ``max_concurrency``) take a slot of their concurrency key before they run.
+    When all slots are taken, the job is deferred instead of occupying the
+    worker, and enqueued again at the front of its queue once a slot is
+    released.
+    """
+
+    def __init__(
+        self,
+        *args,
+        max_memory: Optional[int] = None,
+        persistent_db_connections: Optional[bool] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.max_memory = max_memory
+        if persistent_db_connections is None:
+            persistent_db_connections = getattr(settings, 'RQ', {}).get('PERSISTENT_DB_CONNECTIONS', False)
+        self.persistent_db_connections = persistent_db_connections
+        self._horse_memory_usage = 0
+        self._queue_credits: dict[str, float] = {}
+        # Concurrency key and maximum concurrency of the slots held by running jobs
+        self._concurrency_slots: dict[str, tuple[str, int]] = {}
+        # IDs of the jobs whose success is being handled, jobs run concurrently in thread workers
+        self._succeeding_job_ids: set[str] = set()
+        # Outcome of the jobs being executed, reported to worker metrics
+        self._job_statuses: dict[str, str] = {}
+
+    def reorder_queues(self, reference_queue: Queue):
+        worker = cast(Worker, self)
+        if worker._dequeue_strategy != 'weighted':
+            return super().reorder_queues(reference_queue)  # type: ignore[misc]
+
+        queues = worker._ordered_queues
+        weights = [getattr(queue, 'weight', 1) for queue in queues]
+        total_weight = sum(weights) or 1
+        position = queues.index(reference_queue)
+        for index, (queue, weight) in enumerate(zip(queues, weights)):
+            if index < position:
+                # Queues that were tried before the one the job came from are empty
+                self._queue_credits[queue.name] = 0
+            else:
+                self._queue_credits[queue.name] = self._queue_credits.get(queue.name, 0) + weight / total_weight
+        self._queue_credits[reference_queue.name] -= 1
+
+        # Queues with the most credit first, ties are broken by the configured order
+        worker._ordered_queues = sorted(
+            worker.queues,
+            key=lambda queue: -self._queue_credits.get(queue.name, 0),
+        )
+
+    def dequeue_job_and_maintain_ttl(
+        self, timeout: Optional[int], max_idle_time: Optional[int] = None
+    ) -> Optional[tuple[Job, Queue]]:
+        while True:
+            result = super().dequeue_job_and_maintain_ttl(timeout, max_idle_time)  # type: ignore[misc]
+            if result is None or self.acquire_concurrency_slot(*result):
+                return result
+
+    def acquire_concurrency_slot(self, job: Job, queue: Queue) -> bool:
+        """
+        Takes a slot for ``job`` if its function has a concurrency limit.
+        Returns False if the job was deferred until a slot is released.
+        """
+        worker = cast(Worker, self)
+        try:
+            limit = get_concurrency_limit(job)
+            if limit is None:
+                return True
+            key = limit.get_key(job.func, job.args, job.kwargs)
+        except Exception:
+            # The job will fail anyway if its function can't be loaded
+            worker.log.warning('Job %s: could not get its concurrency key', job.id, exc_info=True)
+            return True
+
+        if not acquire_slot(worker.connection, key, limit.max_concurrency, job):
+            with worker.connection.pipeline() as pipeline:
+                job.set_status(JobStatus.DEFERRED, pipeline=pipeline)
+                queue.deferred_job_registry.add(job, pipeline=pipeline)
+                # Jobs dequeued with LMOVE are failed by maintenance if left
+                # in the intermediate queue
+                pipeline.lrem(queue.intermediate_queue_key, 1, job.id)
+                pipeline.execute()
+            # The job is only added to the waiting list once it's deferred, in
+            # case a slot is released and it's enqueued again right away
+            if not acquire_slot(worker.connection, key, limit.max_concurrency, job, wait=True):
+                worker.log.info('Job %s: deferred until a slot of %s is released', job.id, key)
+                return False
+            queue.deferred_job_registry.remove(job)
+
+        self._concurrency_slots[job.id] = (key, limit.max_concurrency)
+        return True
+
+    def release_concurrency_slot(self, key: str, max_concurrency: int, job_id: str = '') -> None:
+        """Releases the slot of ``job_id`` and enqueues the jobs waiting for it again"""
+        worker = cast(Worker, self)
+        job_ids = release_slot(worker.connection, key, max_concurrency, job_id)
+        while job_ids:
+            # Jobs that were deleted or canceled while waiting don't need the slots reserved for them
+            job_ids = [
+                waiting_job_id
+                for missing_job_id in self.requeue_waiting_jobs(job_ids)
+                for waiting_job_id in release_slot(worker.connection, key, max_concurrency, missing_job_id)
+            ]
+
+    def requeue_waiting_jobs(self, job_ids: list[str]) -> list[str]:
+        """
+        Enqueues deferred jobs at the front of their queue again. Returns the
+        IDs of the jobs that no longer exist or aren't deferred anymore.
+        """
+        worker = cast(Worker, self)
+        jobs = [
+            job
+            for job in worker.job_class.fetch_many(job_ids, connection=worker.connection, serializer=worker.serializer)
+            if job is not None and job.get_status(refresh=False) == JobStatus.DEFERRED
+        ]
+        with worker.connection.pipeline() as pipeline:
+            for job in jobs:
+                queue = worker.queue_class(
+                    job.origin, connection=worker.connection, job_class=worker.job_class, serializer=worker.serializer
+                )
+                queue._enqueue_job(job, pipeline=pipeline, at_front=True)
+            pipeline.execute()
+        requeued = {job.id for job in jobs}
+        return [job_id for job_id in job_ids if job_id not in requeued]
+
+    def clean_registries(self):
+        super().clean_registries()  # type: ignore[misc]
+        # Slots of jobs whose worker died are only freed once their lease expires
+        for key, max_concurrency in get_waiting_keys(cast(Worker, self).connection).items():
+            self.release_concurrency_slot(key, max_concurrency)
+        collect_payloads(cast(Worker, self).connection, cast(Worker, self).job_class)
+        record_queue_depths(cast(Worker, self).queues)
+
+    def handle_job_success(self, job: Job, queue: Queue, started_job_registry: StartedJobRegistry):
+        self._succeeding_job_ids.add(job.id)
+        try:
+            result = super().handle_job_success(job, queue, started_job_registry)  # type: ignore[misc]
+        finally:
+            self._succeeding_job_ids.discard(job.id)
+        self._job_statuses[job.id] = JobStatus.FINISHED.value
+        return result
+
+    def handle_job_failure(self, job: Job, queue: Queue, *args, **kwargs):
+        stopped = cast(Worker, self)._stopped_job_id == job.id
+        self._job_statuses[job.id] = (JobStatus.STOPPED if stopped else JobStatus.FAILED).value
+        return super().handle_job_failure(job, queue, *args, **kwargs)  # type: ignore[misc]
+
+    def cleanup_execution(self, job: Job, pipeline: Pipeline) -> None:
+        # Called within the pipeline that records the job's success or failure
+        super().cleanup_execution(job, pipeline)  # type: ignore[misc]
+        record_job(pipeline, job, finished=job.id in self._succeeding_job_ids)
+        count_processed(pipeline, job)
+
+    def perform_job(self, job: Job, queue: Queue) -> bool:
+        # Jobs with the same unique key can be enqueued again once this one started
+        release_unique_key(cast(Worker, self).connection, job)
+        profiler = self.get_job_profiler(job)
+        self.trace_job(job, queue)
+        self.close_old_db_connections()
+        try:
+            return super().perform_job(job, queue)  # type: ignore[misc]
+        finally:
+            self.close_old_db_connections()
+            # The job's outcome is already recorded, failing to profile or log it mustn't change it
+            if profiler is not None and profiler.profile is not None:
+                try:
+                    save_profile(cast(Worker, self).connection, job, profiler.profile)
+                except Exception:
+                    self.log.warning(  # type: ignore[attr-defined]
+                        'Worker %s: could not save the profile of job %s',
+                        self.name,  # type: ignore[attr-defined]
+                        job.id,
+                        exc_info=True,
+                    )
+            if job.started_at is not None and job.ended_at is not None:
+                duration = (job.ended_at - job.started_at).total_seconds()
+                try:
+                    log_slow_job(cast(Worker, self).connection, job, queue.name, duration, cast(Worker, self).name)
+                except Exception:
+                    self.log.warning(  # type: ignore[attr-defined]
+                        'Worker %s: could not add job %s to the slow log',
+                        self.name,  # type: ignore[attr-defined]
+                        job.id,
+                        exc_info=True,
+                    )
+
+    def get_job_profiler(self, job: Job) -> Optional[JobProfiler]:
+        """Returns the profiler of the job, if it's sampled, set up to profile only the job's function"""
+        profilers = get_profilers(job)
+        if not profilers:
+            return None
+        profiler = JobProfiler(profilers, top=get_profile_settings()['top'])
+        execute = job._execute
+
+        def profiled_execute():
+            with profiler:
+                return execute()
+
+        job._execute = profiled_execute  # type: ignore[method-assign]
+        return profiler
+
+    def trace_job(self, job: Job, queue: Queue) -> None:
+        """Traces the execution of the job's function, if tracing is enabled"""
+        if not is_tracing_enabled():
+            return
+        execute = job._execute
+
+        def traced_execute():
+            with trace_job(job, queue.name):
+                return execute()
+
+        job._execute = traced_execute  # type: ignore[method-assign]
+
+    def close_old_db_connections(self) -> None:
+        try:
+            close_old_db_connections(self.persistent_db_connections)
+        except Exception:
+            # Not worth failing the job over, it will fail anyway if it can't use the database
+            self.log.warning(  # type: ignore[attr-defined]
+                'Worker %s: could not close old database connections',
+                self.name,  # type: ignore[attr-defined]
+                exc_info=True,
+            )
+
+    def execute_job(self, job: Job, queue: Queue):
+        start = time.monotonic()
+        try:
+            super().execute_job(job, queue)  # type: ignore[misc]
+        finally:
+            self.handle_job_executed(job, queue, time.monotonic() - start)
+
+    def handle_job_executed(self, job: Job, queue: Queue, duration: float) -> None:
+        """
+        Releases the job's concurrency slot, records worker metrics and enforces
+        ``max_memory`` once a job has been executed
+        """
+        from .contrib.prometheus import get_worker_metrics
+
+        slot = self._concurrency_slots.pop(job.id, None)
+        if slot is not None:
+            self.release_concurrency_slot(*slot, job_id=job.id)
+
+        # Jobs whose outcome wasn't handled, e.g. because handling it raised, count as failed
+        status = self._job_statuses.pop(job.id, JobStatus.FAILED.value)
+        metrics = get_worker_metrics()
+        if metrics is not None:
+            metrics.observe_job(queue, status, duration)
+
+        if self.max_memory is not None:
+            self.check_memory_usage()
+
+    def check_memory_usage(self) -> None:
+        """Requests a warm shutdown if memory usage exceeds ``max_memory``"""
+        from .contrib.prometheus import get_worker_metrics
+
+        assert self.max_memory is not None
+        memory_usage = max(get_memory_usage(), self._horse_memory_usage)
+        if memory_usage <= self.max_memory * 1024 * 1024:
+            return
+
+        self.log.info(  # type: ignore[attr-defined]
+            'Worker %s: memory usage of %d MB exceeds %d MB, quitting',
+            self.name,  # type: ignore[attr-defined]
+            memory_usage // (1024 * 1024),
+            self.max_memory,
+        )
+        self._stop_requested = True
+        metrics = get_worker_metrics()
+        if metrics is not None:
+            metrics.memory_recycles.inc()
+
+
+class DjangoWorker(DjangoWorkerMixin, Worker):
+    """
+    RQ's forking ``Worker`` with Django specific additions. This is the default
+    worker class used by ``rqworker`` and ``rqworker-pool``.
+    """
+
+    # Read and write ends of the pipe the work horse reports the job's outcome through
+    _status_pipe: Optional[tuple[int, int]] = None
+
+    def fork_work_horse(self, job: Job, queue: Queue):
+        from .contrib.prometheus import get_worker_metrics
+
+        metrics = get_worker_metrics()
+        if metrics is not None:
+            # The outcome is only known to the work horse, the pipe spares fetching it from Redis
+            self._status_pipe = os.pipe()
+        try:
+            super().fork_work_horse(job, queue)
+        finally:
+            if self._status_pipe is not None:
+                os.close(self._status_pipe[1])
+        if metrics is not None:
+            metrics.horse_forks.inc()
+
+    def main_work_horse(self, job: Job, queue: Queue):
+        # Resolving the job's function imports its module unless that was
+        # already done before forking, e.g. with ``rqworker --preload``
+        start = time.monotonic()
+        with contextlib.suppress(Exception):
+            job.func
+        self.log.debug('Job %s: loaded %s in %.2f ms', job.id, job.func_name, (time.monotonic() - start) * 1000)
+        super().main_work_horse(job, queue)
+
+    def perform_job(self, job: Job, queue: Queue) -> bool:
+        try:
+            return super().perform_job(job, queue)
+        finally:
+            if self.is_horse:
+                # Connections can't outlive the work horse, close them cleanly before it exits
+                connections.close_all()
+                if is_tracing_enabled():
+                    flush_spans()
+                if self._status_pipe is not None:
+                    os.write(self._status_pipe[1], self._job_statuses.get(job.id, JobStatus.FAILED.value).encode())
+
+    def handle_job_executed(self, job: Job, queue: Queue, duration: float) -> None:
+        if self._status_pipe is not None:
+            read_fd = self._status_pipe[0]
+            self._status_pipe = None
+            os.set_blocking(read_fd, False)
+            # Nothing was written if the work horse died, in which case the failure was handled here
+            with contextlib.suppress(BlockingIOError):
+                status = os.read(read_fd, 16).decode()
+                if status:
+                    self._job_statuses.setdefault(job.id, status)
+            os.close(read_fd)
+        super().handle_job_executed(job, queue, duration)
+
+    def wait_for_horse(self):
+        pid, stat, rusage = super().wait_for_horse()
+        self._horse_memory_usage = get_peak_memory_usage(rusage) if rusage is not None else 0
+        return pid, stat, rusage
+
+
+class DjangoSimpleWorker(DjangoWorkerMixin, SimpleWorker):
+    """
+    RQ's ``SimpleWorker``, which performs jobs in the worker process itself,
+    with Django specific additions.
+    """
+
+
+class DjangoThreadWorker(DjangoSimpleWorker):
+    """
+    Performs up to ``concurrency`` jobs at a time in a pool of threads within
+    the worker process. Suited to I/O bound jobs, which spend most of their
+    time waiting on the network rather than holding the GIL.
+
+    Each thread has its own Django database connections, which are managed
+    around every job as described in ``DjangoWorkerMixin``. Job timeouts are
+    enforced with ``TimerDeathPenalty`` since alarm signals only work in the
+    main thread. The worker's state is busy as long as one of its threads
+    performs a job.
+    """
+
+    death_penalty_class = TimerDeathPenalty
+
+    def __init__(self, *args, concurrency: int = 10, **kwargs):
+        # The execution being performed is tracked per thread
+        self._local = threading.local()
+        # Number of jobs being performed, the worker is busy as long as there's one
+        self._running_jobs = 0
+        self._running_jobs_lock = threading.RLock()
+        super().__init__(*args, **kwargs)
+        self.concurrency = concurrency
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f'rq-{self.name}')
+
+    @property
+    def execution(self) -> Optional[Execution]:
+        return getattr(self._local, 'execution', None)
+
+    @execution.setter
+    def execution(self, execution: Optional[Execution]) -> None:
+        self._local.execution = execution
+
+    def dequeue_job_and_maintain_ttl(self, timeout: Optional[int], max_idle_time: Optional[int] = None):
+        # Only take a job off the queue once there's a thread to perform it
+        while not self._slots.acquire(timeout=self.job_monitoring_interval):
+            self.heartbeat()
+
+        result = None
+        try:
+            if not self._stop_requested:
+                result = super().dequeue_job_and_maintain_ttl(timeout, max_idle_time)
+        finally:
+            if result is None:
+                self._slots.release()
+        return result
+
+    def set_state(self, state: str, pipeline: Optional[Pipeline] = None):
+        with self._running_jobs_lock:
+            # rq marks the worker idle before every dequeue, while other threads may still be performing jobs
+            if state == WorkerStatus.IDLE and self._running_jobs:
+                state = WorkerStatus.BUSY
+            super().set_state(state, pipeline)
+
+    def execute_job(self, job: Job, queue: Queue):
+        with self._running_jobs_lock:
+            self._running_jobs += 1
+        self._executor.submit(self.run_job, job, queue)
+
+    def run_job(self, job: Job, queue: Queue) -> None:
+        """Performs ``job`` in the current thread"""
+        start = time.monotonic()
+        try:
+            self.prepare_execution(job)
+            self.perform_job(job, queue)
+        except Exception:
+            self.log.exception('Worker %s: unhandled exception while performing job %s', self.name, job.id)
+        finally:
+            self._slots.release()
+            with self._running_jobs_lock:
+                self._running_jobs -= 1
+                if not self._running_jobs:
+                    self.set_state(WorkerStatus.IDLE)
+        self.handle_job_executed(job, queue, time.monotonic() - start)
+
+    def teardown(self):
+        # Wait for jobs that are still running
+        self._executor.shutdown(wait=True)
+        super().teardown()
+
+
+class DjangoAsyncioWorker(DjangoThreadWorker):
+    """
+    Runs ``async def`` job functions concurrently on a single event loop,
+    running in its own thread, so that they can share clients and connection
+    pools. Up to ``concurrency`` jobs are performed at a time, their
+    bookkeeping is done in a pool of threads as in ``DjangoThreadWorker``,
+    which also performs jobs with regular functions.
+
+    Database connections used through ``sync_to_async`` are managed after
+    every coroutine as described in ``DjangoWorkerMixin``.
+    """
+
+    def __init__(self, *args, concurrency: int = 100, **kwargs):
+        super().__init__(*args, concurrency=concurrency, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name=f'rq-{self.name}-loop', daemon=True)
+
+    def bootstrap(self, *args, **kwargs):
+        super().bootstrap(*args, **kwargs)
+        self._loop_thread.start()
+
+    def perform_job(self, job: Job, queue: Queue) -> bool:
+        # RQ runs coroutines on a new event loop for every job, run them on ours instead
+        job._execute = partial(self.execute_coroutine_job, job)  # type: ignore[method-assign]
+        return super().perform_job(job, queue)
+
+    def execute_coroutine_job(self, job: Job) -> Any:
+        result = job.func(*job.args, **job.kwargs)
+        if not asyncio.iscoroutine(result):
+            return result
+
+        timeout = job.timeout or self.queue_class.DEFAULT_TIMEOUT
+        future = asyncio.run_coroutine_threadsafe(self._run_coroutine(result, timeout), self._loop)
+        try:
+            return future.result()
+        except asyncio.TimeoutError:
+            raise JobTimeoutException(f'Task exceeded maximum timeout value ({timeout} seconds)') from None
+
+    async def _run_coroutine(self, coroutine: Coroutine, timeout: float) -> Any:
+        try:
+            return await asyncio.wait_for(coroutine, timeout if timeout > 0 else None)
+        finally:
+            await sync_to_async(close_old_db_connections)(self.persistent_db_connections)
+
+    def teardown(self):
+        super().teardown()
+        if self._loop_thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+        self._loop.close()
+
+
+EXECUTION_WORKER_CLASSES: dict[str, type[DjangoWorkerMixin]] = {
+    'fork': DjangoWorker,
+    'thread': DjangoThreadWorker,
+    'asyncio': DjangoAsyncioWorker,
+}
+
+
 def get_worker_class(worker_class=None):
     """
-    Return worker class from RQ settings, otherwise return Worker.
+    Return worker class from RQ settings, otherwise return DjangoWorker.
     If `worker_class` is not None, it is used as an override (can be
     python import path as string).
     """
     RQ = getattr(settings, 'RQ', {})
 
     if worker_class is None:
-        worker_class = Worker
+        worker_class = DjangoWorker
         if 'WORKER_CLASS' in RQ:
             worker_class = RQ.get('WORKER_CLASS')
 
@@ -39,6 +647,20 @@ def get_worker_class(worker_class=None):
     return worker_class
 
 
+def get_queues_serializer(queues: list[Queue]) -> Any:
+    """
+    Returns the serializer of ``queues``, set with ``SERIALIZER`` in
+    ``RQ_QUEUES``. A worker uses a single serializer for all its queues.
+    """
+    serializer = queues[0].serializer
+    for queue in queues[1:]:
+        if queue.serializer is not serializer:
+            raise ValueError(
+                f'Queues must have the same serializer. "{queue.name}" and "{queues[0].name}" have different ones'
+            )
+    return serializer
+
+
 def get_worker(
     *queue_names: str,
     job_class: Optional[Union[str, type[Job]]] = None,
@@ -54,6 +676,14 @@ def get_worker(
     # normalize queue_class to what get_queues returns
     queue_class = queues[0].__class__
     worker_class = get_worker_class(worker_class)
+    if not issubclass(worker_class, DjangoWorkerMixin):
+        logger.warning(
+            'Worker class %s is not based on django_rq.workers.DjangoWorkerMixin, concurrency caps, unique keys, '
+            'profiling, the slow log, function statistics, tracing and processed job counters are disabled',
+            worker_class.__qualname__,
+        )
+    if kwargs.get('serializer') is None:
+        kwargs['serializer'] = get_queues_serializer(queues)
     return worker_class(
         queues,
         connection=queues[0].connection,
@@ -1,7 +1,12 @@
+import asyncio
+import threading
+import time
+
 from rq import get_current_job
 from rq.job import Job
 from rq.worker import Worker
 
+from django_rq.decorators import job
 from django_rq.queues import DjangoRQ
 
 
@@ -40,3 +45,61 @@ def failing_job():
 def say_hello(name='World'):
     """Simple test function for cron job testing."""
     return f"Hello, {name}!"
+
+
+def sleep(seconds):
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+
+def get_worker_state(seconds):
+    """Returns the state of the worker performing the job, as stored in Redis, after ``seconds``"""
+    time.sleep(seconds)
+    job = get_current_job()
+    assert job
+    return job.connection.hget(Worker.redis_worker_namespace_prefix + job.worker_name, 'state').decode()
+
+
+async def async_sleep(seconds):
+    await asyncio.sleep(seconds)
+    return threading.current_thread().name
+
+
+# Names of the threads that started wait_for_peers() and async_wait_for_peers() jobs
+started_peers: list[str] = []
+
+
+def wait_for_peers(peers, timeout=10):
+    """Returns once ``peers`` jobs, including this one, have started, proving they overlap"""
+    started_peers.append(threading.current_thread().name)
+    deadline = time.monotonic() + timeout
+    while len(started_peers) < peers:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f'{len(started_peers)} of {peers} jobs started')
+        time.sleep(0.01)
+    return threading.current_thread().name
+
+
+async def async_wait_for_peers(peers, timeout=10):
+    started_peers.append(threading.current_thread().name)
+    deadline = time.monotonic() + timeout
+    while len(started_peers) < peers:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f'{len(started_peers)} of {peers} jobs started')
+        await asyncio.sleep(0.01)
+    return threading.current_thread().name
+
+
+@job('test2', concurrency_key='report:{customer_id}', max_concurrency=1)
+def build_report(customer_id, year=2024):
+    return f'{customer_id}-{year}'
+
+
+@job('test2', unique_key='reindex:{pk}')
+def reindex(pk):
+    return pk
+
+
+@job('test2', batch_size=3, batch_window=60)
+def send_notifications(items):
+    return [ValueError(user) if user == 'bob' else f'sent to {user}' for (user,) in items]
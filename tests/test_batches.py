@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from django_rq import thread_queue
+from django_rq.batches import flush_batch
+from django_rq.decorators import job
+from django_rq.queues import get_queue
+from django_rq.workers import DjangoSimpleWorker, get_worker
+
+from .fixtures import send_notifications
+
+
+@override_settings(RQ={'COMMIT_MODE': 'auto'})
+class BatchTest(TestCase):
+    def setUp(self):
+        self.queue = get_queue('test2')
+        self.connection = self.queue.connection
+        self.connection.flushdb()
+        # The decorator's queue was created with the commit mode of the test settings
+        patcher = patch.object(send_notifications.batch.decorator, 'queue', self.queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch_enqueued_when_full(self):
+        send_notifications.delay('alice')
+        send_notifications.delay('bob')
+        self.assertEqual(self.queue.count, 0)
+        self.assertEqual(self.connection.llen(send_notifications.batch.key), 2)
+        # A flush is scheduled when the first call is added
+        self.assertEqual(len(self.queue.scheduled_job_registry), 1)
+
+        send_notifications.delay('carol')
+        self.assertEqual(self.queue.count, 1)
+        self.assertEqual(self.connection.llen(send_notifications.batch.key), 0)
+        batch_job = self.queue.jobs[0]
+        self.assertEqual(batch_job.func_name, 'tests.fixtures.send_notifications')
+        self.assertEqual(batch_job.args, ([('alice',), ('bob',), ('carol',)],))
+
+        get_worker('test2', worker_class=DjangoSimpleWorker).work(burst=True)
+        batch_job.refresh()
+        self.assertTrue(batch_job.is_finished)
+        self.assertEqual(batch_job.return_value(), ['sent to alice', None, 'sent to carol'])
+        self.assertEqual(batch_job.meta['batch_size'], 3)
+        self.assertEqual(batch_job.meta['failed_items'], [{'index': 1, 'error': "ValueError('bob')"}])
+
+    def test_flush(self):
+        send_notifications.delay('alice')
+        flush_batch('tests.fixtures.send_notifications')
+        self.assertEqual(self.queue.count, 1)
+        self.assertEqual(self.queue.jobs[0].args, ([('alice',)],))
+        # Nothing left to flush
+        self.assertEqual(send_notifications.batch.flush(), [])
+
+    def test_calls_added_on_commit(self):
+        queue = get_queue('test2', commit_mode='on_db_commit')
+        with patch.object(send_notifications.batch.decorator, 'queue', queue):
+            with self.captureOnCommitCallbacks() as callbacks:
+                send_notifications.delay('alice')
+            self.assertEqual(self.connection.llen(send_notifications.batch.key), 0)
+            callbacks[0]()
+        self.assertEqual(self.connection.llen(send_notifications.batch.key), 1)
+
+    def test_calls_added_when_request_finishes(self):
+        queue = get_queue('test2', commit_mode='request_finished')
+        self.addCleanup(thread_queue.clear)
+        with patch.object(send_notifications.batch.decorator, 'queue', queue):
+            self.assertIsNone(send_notifications.delay('alice'))
+            self.assertEqual(self.connection.llen(send_notifications.batch.key), 0)
+            thread_queue.commit()
+        self.assertEqual(self.connection.llen(send_notifications.batch.key), 1)
+
+    def test_keyword_arguments_rejected(self):
+        with self.assertRaisesMessage(TypeError, 'only takes positional arguments, got name'):
+            send_notifications.delay(name='alice')
+        self.assertEqual(self.connection.llen(send_notifications.batch.key), 0)
+
+    def test_warning_without_scheduler(self):
+        with self.assertLogs('django_rq.batches', 'WARNING') as logs:
+            send_notifications.delay('alice')
+        self.assertIn('--with-scheduler', logs.output[0])
+
+        # No warning once a scheduler holds the queue's lock
+        send_notifications.batch.flush()
+        with patch('rq.queue.Queue.scheduler_pid', 1), self.assertNoLogs('django_rq.batches'):
+            send_notifications.delay('alice')
+
+    def test_job_decorator(self):
+        # Batched functions can still be called directly
+        self.assertEqual(send_notifications([('alice',)]), ['sent to alice'])
+        with self.assertRaises(ValueError):
+            job('test2', batch_size=0)
+        with self.assertRaises(TypeError):
+            job('test2', batch_size=10, unique_key='key')
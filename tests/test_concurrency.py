@@ -0,0 +1,132 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from rq.job import Job, JobStatus
+from rq.utils import now
+
+from django_rq.concurrency import ConcurrencyLimit, acquire_slot, get_slots_key, get_waiting_keys, release_slot
+from django_rq.decorators import job
+from django_rq.queues import get_queue
+from django_rq.workers import DjangoSimpleWorker, get_worker
+
+from .fixtures import build_report, say_hello
+
+
+@override_settings(RQ={'COMMIT_MODE': 'auto'})
+class ConcurrencyTest(TestCase):
+    def setUp(self):
+        self.queue = get_queue('test2')
+        self.connection = self.queue.connection
+        self.connection.flushdb()
+
+    def create_job(self):
+        return Job.create(say_hello, connection=self.connection)
+
+    def test_job_decorator(self):
+        limit = build_report.concurrency_limit
+        self.assertEqual(limit, ConcurrencyLimit('report:{customer_id}', 1))
+        self.assertEqual(limit.get_key(build_report, (1,), {}), 'report:1')
+        self.assertEqual(limit.get_key(build_report, (), {'customer_id': 2, 'year': 2025}), 'report:2')
+
+        @job('test2', max_concurrency=2)
+        def export():
+            pass
+
+        self.assertEqual(export.concurrency_limit.get_key(export, (), {}), f'{__name__}.{export.__qualname__}')
+
+        @job('test2', concurrency_key=lambda account: f'account:{account.lower()}', max_concurrency=2)
+        def sync(account):
+            pass
+
+        self.assertEqual(sync.concurrency_limit.get_key(sync, ('ACME',), {}), 'account:acme')
+
+        with self.assertRaises(TypeError):
+            job('test2', concurrency_key='reports')
+        with self.assertRaises(ValueError):
+            job('test2', max_concurrency=0)
+
+    def test_slots(self):
+        jobs = [self.create_job() for _ in range(4)]
+        self.assertTrue(acquire_slot(self.connection, 'key', 2, jobs[0]))
+        self.assertTrue(acquire_slot(self.connection, 'key', 2, jobs[1]))
+        # Acquiring a slot again is a no-op
+        self.assertTrue(acquire_slot(self.connection, 'key', 2, jobs[1]))
+        self.assertFalse(acquire_slot(self.connection, 'key', 2, jobs[2]))
+        self.assertEqual(get_waiting_keys(self.connection), {})
+
+        self.assertFalse(acquire_slot(self.connection, 'key', 2, jobs[2], wait=True))
+        self.assertFalse(acquire_slot(self.connection, 'key', 2, jobs[3], wait=True))
+        self.assertEqual(get_waiting_keys(self.connection), {'key': 2})
+
+        # A waiting job is popped for every slot that is released, and the slot is reserved for it
+        self.assertEqual(release_slot(self.connection, 'key', 2, jobs[0].id), [jobs[2].id])
+        self.assertEqual(release_slot(self.connection, 'key', 2), [])
+        self.assertFalse(acquire_slot(self.connection, 'key', 2, jobs[0]))
+        self.assertTrue(acquire_slot(self.connection, 'key', 2, jobs[2]))
+
+        # Slots are reclaimed once their lease expires
+        self.connection.zadd(get_slots_key('key'), {jobs[1].id: 0})
+        self.assertEqual(release_slot(self.connection, 'key', 2), [jobs[3].id])
+        self.assertEqual(get_waiting_keys(self.connection), {})
+
+    def test_worker_defers_jobs(self):
+        holder = self.create_job()
+        acquire_slot(self.connection, 'report:1', 1, holder)
+        blocked = self.queue.enqueue(build_report, 1)
+        other = self.queue.enqueue(build_report, 2)
+
+        worker = get_worker('test2', worker_class=DjangoSimpleWorker)
+        worker.work(burst=True)
+        self.assertEqual(blocked.get_status(), JobStatus.DEFERRED)
+        self.assertIn(blocked.id, self.queue.deferred_job_registry)
+        self.assertEqual(other.get_status(), JobStatus.FINISHED)
+        self.assertEqual(self.connection.zcard(get_slots_key('report:2')), 0)
+
+        # The blocked job is enqueued again once the slot is released
+        worker.release_concurrency_slot('report:1', 1, holder.id)
+        self.assertEqual(blocked.get_status(), JobStatus.QUEUED)
+        self.assertNotIn(blocked.id, self.queue.deferred_job_registry)
+        worker.work(burst=True)
+        self.assertEqual(blocked.get_status(), JobStatus.FINISHED)
+        self.assertEqual(blocked.return_value(), '1-2024')
+
+    @patch('rq.queue.get_version', return_value=(7, 0, 0))
+    def test_deferred_jobs_leave_the_intermediate_queue(self, get_version):
+        # Single queue workers dequeue with LMOVE, through the intermediate queue
+        holder = self.create_job()
+        acquire_slot(self.connection, 'report:1', 1, holder)
+        blocked = self.queue.enqueue(build_report, 1)
+        worker = get_worker('test2', worker_class=DjangoSimpleWorker)
+        worker.work(burst=True)
+        self.assertEqual(blocked.get_status(), JobStatus.DEFERRED)
+        self.assertEqual(self.queue.intermediate_queue.get_job_ids(), [])
+
+        # Maintenance fails jobs left in the intermediate queue for over a minute
+        self.connection.set(
+            self.queue.intermediate_queue.get_first_seen_key(blocked.id), (now() - timedelta(minutes=2)).timestamp()
+        )
+        self.queue.intermediate_queue.cleanup(worker, self.queue)
+        self.assertEqual(blocked.get_status(), JobStatus.DEFERRED)
+        self.assertNotIn(blocked.id, self.queue.failed_job_registry)
+
+    def test_expired_slots_reclaimed_by_maintenance(self):
+        holder = self.create_job()
+        acquire_slot(self.connection, 'report:1', 1, holder)
+        blocked = self.queue.enqueue(build_report, 1)
+        deleted = self.queue.enqueue(build_report, 1)
+        worker = get_worker('test2', worker_class=DjangoSimpleWorker)
+        worker.work(burst=True)
+        self.assertEqual(deleted.get_status(), JobStatus.DEFERRED)
+        deleted.delete()
+
+        # The worker that held the slot died
+        self.connection.zadd(get_slots_key('report:1'), {holder.id: 0})
+        worker.clean_registries()
+        self.assertEqual(blocked.get_status(), JobStatus.QUEUED)
+
+        # The slot reserved for the deleted job is released when the blocked job is done
+        worker.work(burst=True)
+        self.assertEqual(blocked.get_status(), JobStatus.FINISHED)
+        self.assertEqual(get_waiting_keys(self.connection), {})
+        self.assertEqual(self.connection.zcard(get_slots_key('report:1')), 0)
@@ -1,5 +1,6 @@
 import datetime
 from unittest import TestCase
+from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 from django.test import override_settings
@@ -8,7 +9,7 @@ from rq.registry import DeferredJobRegistry, FailedJobRegistry, FinishedJobRegis
 
 from django_rq.cron import DjangoCronScheduler
 from django_rq.queues import get_queue
-from django_rq.utils import get_cron_schedulers, get_jobs, get_statistics, requeue_job
+from django_rq.utils import close_old_db_connections, get_cron_schedulers, get_jobs, get_statistics, requeue_job
 from django_rq.workers import get_worker
 from tests.fixtures import access_self, failing_job
 from tests.redis_config import REDIS_CONFIG_1
@@ -148,3 +149,18 @@ class UtilsTest(TestCase):
         self.assertEqual(deferred_job.get_status(), JobStatus.QUEUED)
         self.assertIn(deferred_job.id, queue.job_ids)
         self.assertNotIn(deferred_job.id, DeferredJobRegistry(queue.name, queue.connection).get_job_ids())
+
+    @patch('django_rq.utils.connections')
+    def test_close_old_db_connections(self, connections):
+        connection = MagicMock(close_at=100)
+        connections.all.return_value = [connection]
+
+        close_old_db_connections()
+        connections.all.assert_called_with(initialized_only=True)
+        connection.close_if_unusable_or_obsolete.assert_called_once_with()
+        self.assertEqual(connection.close_at, 100)
+
+        # Persistent connections are only closed if they're unusable
+        close_old_db_connections(persistent=True)
+        self.assertIsNone(connection.close_at)
+        self.assertEqual(connection.close_if_unusable_or_obsolete.call_count, 2)
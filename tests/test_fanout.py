@@ -0,0 +1,134 @@
+import threading
+import time
+from contextvars import ContextVar
+from unittest import skipIf
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from django_rq.fanout import describe_error, fan_out
+from django_rq.queues import get_queue
+from django_rq.utils import get_cron_schedulers, get_scheduler_statistics, get_statistics
+
+from .fixtures import say_hello
+from .settings import RQ_QUEUES
+
+try:
+    import prometheus_client
+
+    from django_rq.contrib.prometheus import RQCollector
+except ImportError:
+    prometheus_client = None
+
+# Connections to this server are refused
+UNREACHABLE = {'HOST': 'localhost', 'PORT': 1, 'DB': 0}
+
+variable: ContextVar[str] = ContextVar('variable', default='')
+
+
+class FanOutTest(TestCase):
+    def test_results_are_in_order(self):
+        def slow_double(number):
+            time.sleep(0.3 - number / 10)
+            return number * 2
+
+        start = time.monotonic()
+        self.assertEqual(fan_out(slow_double, [1, 2, 3]), [2, 4, 6])
+        # Calls run concurrently
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_exceptions_are_returned(self):
+        def invert(number):
+            return 1 / number
+
+        results = fan_out(invert, [1, 0, 2])
+        self.assertEqual(results[0], 1)
+        self.assertIsInstance(results[1], ZeroDivisionError)
+        self.assertEqual(results[2], 0.5)
+
+    def test_timeout(self):
+        start = time.monotonic()
+        results = fan_out(time.sleep, [0, 2], timeout=0.2)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertIsNone(results[0])
+        self.assertIsInstance(results[1], TimeoutError)
+
+        with override_settings(RQ={'STATS_TIMEOUT': 0.2}):
+            self.assertIsInstance(fan_out(time.sleep, [0, 2])[1], TimeoutError)
+
+    def test_hung_calls_dont_hold_up_other_calls(self):
+        hung = threading.Event()
+        self.addCleanup(hung.set)
+
+        def query(server):
+            if server == 'hung':
+                # Like a Redis connection without a socket timeout
+                hung.wait()
+            return server
+
+        # Many more hung calls than a bounded pool of threads would hold
+        for _ in range(20):
+            results = fan_out(query, ['hung', 'healthy'], timeout=0.2)
+            self.assertIsInstance(results[0], TimeoutError)
+            self.assertEqual(results[1], 'healthy')
+
+    def test_single_item_runs_in_calling_thread(self):
+        self.assertEqual(fan_out(lambda item: threading.current_thread(), ['a']), [threading.current_thread()])
+        self.assertIsInstance(fan_out(lambda item: 1 / 0, ['a'])[0], ZeroDivisionError)
+        self.assertEqual(fan_out(str, []), [])
+
+    def test_context_is_copied(self):
+        token = variable.set('caller')
+        self.addCleanup(variable.reset, token)
+        self.assertEqual(fan_out(lambda item: variable.get(), ['a', 'b']), ['caller', 'caller'])
+
+    def test_describe_error(self):
+        self.assertEqual(describe_error(TimeoutError()), 'TimeoutError')
+        self.assertEqual(describe_error(ValueError('first\nsecond')), 'ValueError: first')
+        self.assertEqual(len(describe_error(ValueError('x' * 500))), 200)
+
+
+@override_settings(
+    # redis-py retries refused connections for a few seconds
+    RQ={'COMMIT_MODE': 'auto', 'STATS_TIMEOUT': 0.5},
+    RQ_QUEUES={'test2': RQ_QUEUES['test2'], 'test3': RQ_QUEUES['test3'], 'shard': UNREACHABLE},
+)
+class UnavailableServerTest(TestCase):
+    def setUp(self):
+        get_queue('test2').connection.flushdb()
+
+    def test_get_statistics(self):
+        get_queue('test2').enqueue(say_hello)
+        queues = {queue['name']: queue for queue in get_statistics()['queues']}
+        self.assertEqual(list(queues), ['shard', 'test2', 'test3'])
+        self.assertEqual(queues['test2']['jobs'], 1)
+        self.assertEqual(queues['test3']['index'], 2)
+        self.assertNotIn('error', queues['test2'])
+        self.assertEqual(queues['shard']['index'], 0)
+        self.assertEqual(queues['shard']['error'], 'TimeoutError: No answer within 0.5 seconds')
+        self.assertNotIn('jobs', queues['shard'])
+
+    def test_schedulers(self):
+        self.assertEqual(get_cron_schedulers(), [])
+        self.assertEqual(get_scheduler_statistics(), {'schedulers': {}})
+
+    def test_stats_page(self):
+        User.objects.create_user('foo', password='pass', is_staff=True)
+        self.client.login(username='foo', password='pass')
+        response = self.client.get(reverse('admin:django_rq_home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'unavailable')
+        self.assertContains(response, 'test2')
+
+    @skipIf(prometheus_client is None, 'prometheus_client is required')
+    def test_prometheus_collector(self):
+        get_queue('test2').enqueue(say_hello)
+        metrics = {
+            tuple(sample.labels.values()): sample.value
+            for family in RQCollector().collect()
+            if family.name == 'rq_jobs'
+            for sample in family.samples
+        }
+        self.assertEqual(metrics[('test2', 'queued')], 1)
+        self.assertNotIn(('shard', 'queued'), metrics)
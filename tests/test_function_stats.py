@@ -0,0 +1,119 @@
+import time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from django_rq.connection_utils import get_redis_connection
+from django_rq.function_stats import (
+    get_buckets,
+    get_duration_bucket,
+    get_function_statistics,
+    get_function_stats_key,
+    summarize,
+)
+from django_rq.queues import get_queue
+from django_rq.testing import RedisAssertionsMixin
+from django_rq.workers import DjangoSimpleWorker, get_worker
+
+from .fixtures import failing_job, say_hello
+from .settings import RQ_QUEUES
+
+
+@override_settings(
+    RQ={'COMMIT_MODE': 'auto'},
+    RQ_QUEUES={'test2': RQ_QUEUES['test2'], 'test3': RQ_QUEUES['test3']},
+    RQ_API_TOKEN='some_token',
+)
+class FunctionStatisticsTest(RedisAssertionsMixin, TestCase):
+    def setUp(self):
+        self.queue = get_queue('test2')
+        self.connection = self.queue.connection
+        self.connection.flushdb()
+
+    def work(self):
+        get_worker('test2', worker_class=DjangoSimpleWorker).work(burst=True)
+
+    def test_get_duration_bucket(self):
+        self.assertEqual(get_duration_bucket(0), 'le_0.01')
+        self.assertEqual(get_duration_bucket(0.3), 'le_0.5')
+        self.assertEqual(get_duration_bucket(1), 'le_1')
+        self.assertEqual(get_duration_bucket(10000), 'le_inf')
+
+    def test_jobs_are_recorded(self):
+        self.queue.enqueue(say_hello)
+        self.queue.enqueue(say_hello)
+        self.queue.enqueue(failing_job)
+        self.work()
+
+        key = get_function_stats_key(int(time.time() // 60))
+        self.assertGreater(self.connection.ttl(key), 86000)
+        functions = {function['func']: function for function in get_function_statistics()}
+        say_hello_stats = functions['tests.fixtures.say_hello']
+        self.assertEqual(say_hello_stats['jobs'], 2)
+        self.assertEqual(say_hello_stats['finished'], 2)
+        self.assertEqual(say_hello_stats['failure_rate'], 0)
+        self.assertAlmostEqual(say_hello_stats['jobs_per_minute'], 2 / 60)
+        self.assertGreaterEqual(say_hello_stats['mean_duration'], 0)
+        self.assertIsNotNone(say_hello_stats['p95_duration'])
+        self.assertEqual(functions['tests.fixtures.failing_job']['failed'], 1)
+        self.assertEqual(functions['tests.fixtures.failing_job']['failure_rate'], 1)
+
+        with override_settings(RQ={'COMMIT_MODE': 'auto', 'FUNCTION_STATS_TTL': 60}):
+            self.queue.enqueue(say_hello)
+            self.work()
+        self.assertLessEqual(self.connection.ttl(key), 60)
+
+    def test_jobs_without_result_are_recorded_as_finished(self):
+        # Fire-and-forget jobs are deleted without being marked as finished
+        self.queue.enqueue(say_hello, result_ttl=0)
+        self.work()
+        functions = {function['func']: function for function in get_function_statistics()}
+        self.assertEqual(functions['tests.fixtures.say_hello']['finished'], 1)
+        self.assertEqual(functions['tests.fixtures.say_hello']['failed'], 0)
+
+    def test_buckets_are_read_in_one_round_trip(self):
+        with patch('time.time', return_value=120 * 60):
+            self.assertEqual(len(get_buckets(self.connection, minutes=5)), 5)
+
+        with override_settings(RQ={'COMMIT_MODE': 'auto', 'REDIS_INSTRUMENTATION': True}):
+            connection = get_redis_connection(RQ_QUEUES['test2'])
+            connection.ping()
+            with self.assertMaxRedisRoundTrips(1):
+                get_buckets(connection, minutes=60)
+
+    def test_summarize(self):
+        buckets = [
+            {b'f:finished': b'8', b'f:duration': b'4.5', b'f:le_0.5': b'7', b'f:le_10': b'1'},
+            {b'f:failed': b'2', b'f:le_0.01': b'2', b'g:failed': b'1', b'g:le_inf': b'1'},
+        ]
+        f, g = summarize(buckets, minutes=2)
+        self.assertEqual(f['func'], 'f')
+        self.assertEqual(f['jobs'], 10)
+        self.assertEqual(f['jobs_per_minute'], 5)
+        self.assertEqual(f['failure_rate'], 0.2)
+        self.assertEqual(f['mean_duration'], 0.45)
+        self.assertEqual(f['p95_duration'], 10)
+        # Durations beyond the last bound are unknown
+        self.assertIsNone(g['p95_duration'])
+
+    def test_views(self):
+        self.queue.enqueue(say_hello)
+        self.work()
+
+        response = self.client.get(reverse('admin:django_rq_functions_json'))
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get(
+            reverse('admin:django_rq_functions_json'), {'minutes': 5}, HTTP_AUTHORIZATION='Bearer some_token'
+        )
+        self.assertEqual(response.json()['minutes'], 5)
+        self.assertEqual(response.json()['functions'][0]['func'], 'tests.fixtures.say_hello')
+
+        User.objects.create_user('foo', password='pass', is_staff=True)
+        self.client.login(username='foo', password='pass')
+        response = self.client.get(reverse('admin:django_rq_functions'), {'minutes': 'invalid'})
+        self.assertEqual(response.context['minutes'], 60)
+        self.assertContains(response, 'tests.fixtures.say_hello')
+        response = self.client.get(reverse('admin:django_rq_functions'), {'minutes': 1000000})
+        self.assertEqual(response.context['minutes'], 1440)
@@ -0,0 +1,101 @@
+from django.contrib.auth.models import User
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from django_rq.history import (
+    HOURLY,
+    MINUTELY,
+    get_history_key,
+    get_queue_depth_history,
+    get_queue_groups,
+    parse_history,
+    record_all_queue_depths,
+    record_queue_depths,
+)
+from django_rq.queues import get_queue
+from django_rq.settings import get_queues_map
+from django_rq.workers import DjangoSimpleWorker, get_worker
+
+from .fixtures import say_hello
+from .settings import RQ_QUEUES
+
+# 2024-01-01 00:00:00 UTC
+START = 1704067200
+
+
+@override_settings(RQ={'COMMIT_MODE': 'auto'}, RQ_QUEUES={'test2': RQ_QUEUES['test2'], 'test3': RQ_QUEUES['test3']})
+class QueueDepthHistoryTest(TestCase):
+    def setUp(self):
+        self.queue = get_queue('test2')
+        self.connection = self.queue.connection
+        self.connection.flushdb()
+
+    def test_record_queue_depths(self):
+        self.queue.enqueue(say_hello)
+        record_queue_depths([self.queue], timestamp=START)
+        self.queue.enqueue(say_hello)
+        self.queue.enqueue(say_hello)
+        record_queue_depths([self.queue], timestamp=START + 30)
+        self.queue.empty()
+        # Samples in the same bucket keep the highest depth
+        record_queue_depths([self.queue], timestamp=START + 59)
+        record_queue_depths([self.queue], timestamp=START + 60)
+
+        minute_key = get_history_key('test2', MINUTELY)
+        self.assertEqual(self.connection.hlen(minute_key), 2)
+        self.assertGreater(self.connection.ttl(minute_key), 24 * 60 * 60 - 10)
+        history = parse_history(self.connection.hgetall(minute_key), MINUTELY, timestamp=START + 60)
+        self.assertEqual(len(history), 24 * 60)
+        self.assertEqual(history[-2:], [3, 0])
+        self.assertEqual(set(history[:-2]), {None})
+
+        hourly = parse_history(self.connection.hgetall(get_history_key('test2', HOURLY)), HOURLY, START + 60)
+        self.assertEqual(hourly[-1], 3)
+        self.assertEqual(len(hourly), 30 * 24)
+
+    def test_ring_buffer_wraps(self):
+        self.queue.enqueue(say_hello)
+        record_queue_depths([self.queue], timestamp=START)
+        # The same slot, a day later
+        record_queue_depths([self.queue], timestamp=START + 24 * 60 * 60)
+        minute_key = get_history_key('test2', MINUTELY)
+        self.assertEqual(self.connection.hlen(minute_key), 1)
+        history = parse_history(self.connection.hgetall(minute_key), MINUTELY, timestamp=START + 24 * 60 * 60)
+        self.assertEqual(history[-1], 1)
+        self.assertEqual(history[0], None)
+
+    def test_record_all_queue_depths(self):
+        groups = get_queue_groups()
+        self.assertEqual([[queue.name for queue in queues] for queues in groups], [['test2', 'test3']])
+        get_queue('test3').enqueue(say_hello)
+        record_all_queue_depths()
+        history = get_queue_depth_history(groups[0])
+        self.assertEqual(history['test2']['minute'][-1], 0)
+        self.assertEqual(history['test3']['minute'][-1], 1)
+        self.assertEqual(history['test3']['hour'][-1], 1)
+
+    def test_workers_record_queue_depths(self):
+        get_worker('test2', worker_class=DjangoSimpleWorker).work(burst=True)
+        self.assertEqual(get_queue_depth_history([self.queue])['test2']['minute'][-1], 0)
+
+    def test_sparkline(self):
+        template = Template('{% load django_rq %}{{ depths|sparkline:"100x20" }}')
+        self.assertEqual(template.render(Context({'depths': [None, None]})), '—')
+        svg = template.render(Context({'depths': [1, 2, None, 4, None]}))
+        self.assertIn('width="100" height="20"', svg)
+        self.assertEqual(svg.count('<polyline'), 1)
+        self.assertEqual(svg.count('<circle'), 1)
+        self.assertIn('Latest 4, peak 4', svg)
+
+    def test_views(self):
+        self.queue.enqueue(say_hello)
+        record_all_queue_depths()
+
+        User.objects.create_user('foo', password='pass', is_staff=True)
+        self.client.login(username='foo', password='pass')
+        response = self.client.get(reverse('admin:django_rq_home'))
+        self.assertContains(response, 'rq-sparkline')
+        response = self.client.get(reverse('admin:django_rq_queue_details', args=[get_queues_map()['test2']]))
+        self.assertContains(response, 'Last 30 days')
+        self.assertContains(response, 'Latest 1, peak 1', count=2)
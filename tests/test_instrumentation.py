@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from django_rq.connection_utils import get_redis_connection
+from django_rq.instrumentation import InstrumentedConnectionMixin, track_redis
+from django_rq.queues import get_queue
+from django_rq.testing import RedisAssertionsMixin
+
+from .fixtures import say_hello
+from .settings import RQ_QUEUES
+
+INSTRUMENTED = {'COMMIT_MODE': 'auto', 'REDIS_INSTRUMENTATION': True}
+
+
+@override_settings(RQ=INSTRUMENTED, RQ_QUEUES={'test2': RQ_QUEUES['test2'], 'test3': RQ_QUEUES['test3']})
+class RedisInstrumentationTest(RedisAssertionsMixin, TestCase):
+    def setUp(self):
+        self.connection = get_redis_connection(RQ_QUEUES['test2'])
+        self.connection.flushdb()
+
+    def test_track_redis(self):
+        self.assertTrue(issubclass(self.connection.connection_pool.connection_class, InstrumentedConnectionMixin))
+        with track_redis() as outer:
+            self.connection.set('foo', 'bar')
+            with track_redis() as inner:
+                with self.connection.pipeline() as pipeline:
+                    pipeline.get('foo')
+                    pipeline.get('foo')
+                    pipeline.execute()
+
+        # The pipeline is wrapped in MULTI and EXEC
+        self.assertEqual(inner.commands, 4)
+        self.assertEqual(inner.round_trips, 1)
+        self.assertEqual(inner.command_counts['GET'], 2)
+        self.assertEqual(outer.commands, 5)
+        self.assertEqual(outer.round_trips, 2)
+        self.assertEqual(outer.connections, 0)
+        self.assertGreater(outer.bytes_sent, inner.bytes_sent)
+        self.assertGreater(inner.bytes_received, 0)
+        self.assertGreater(outer.time, 0)
+
+        # Usage outside tracked blocks isn't recorded
+        self.connection.get('foo')
+        self.assertEqual(outer.commands, 5)
+
+    @override_settings(RQ={'COMMIT_MODE': 'auto'})
+    def test_disabled(self):
+        connection = get_redis_connection(RQ_QUEUES['test2'])
+        self.assertFalse(issubclass(connection.connection_pool.connection_class, InstrumentedConnectionMixin))
+        with track_redis() as stats:
+            connection.get('foo')
+        self.assertEqual(stats.commands, 0)
+
+    def test_views(self):
+        User.objects.create_user('foo', password='pass', is_staff=True)
+        self.client.login(username='foo', password='pass')
+        with self.assertLogs('django_rq.instrumentation', 'INFO') as logs:
+            response = self.client.get(reverse('admin:django_rq_home'))
+        self.assertGreater(int(response['X-Redis-Commands']), 0)
+        self.assertGreater(int(response['X-Redis-Round-Trips']), 0)
+        self.assertGreater(int(response['X-Redis-Bytes-Received']), 0)
+        self.assertIn('X-Redis-Time', response)
+        self.assertIn('GET /admin/django_rq/', logs.output[0])
+
+        with override_settings(RQ={'COMMIT_MODE': 'auto'}):
+            response = self.client.get(reverse('admin:django_rq_home'))
+        self.assertNotIn('X-Redis-Commands', response)
+
+    def test_management_commands(self):
+        with self.assertLogs('django_rq.instrumentation', 'INFO') as logs:
+            call_command('rqstats', '--json', stdout=StringIO())
+        self.assertIn('rqstats: ', logs.output[0])
+
+    def test_assertions(self):
+        queue = get_queue('test2')
+        queue.enqueue(say_hello)
+        with self.assertMaxRedisRoundTrips(2):
+            queue.enqueue(say_hello)
+
+        with self.assertRaisesMessage(AssertionError, 'Redis round trips made, expected at most 1. Commands: '):
+            with self.assertMaxRedisRoundTrips(1):
+                queue.enqueue(say_hello)
+                queue.count
+
+        # Instrumentation is enabled for connections created within assertions
+        with override_settings(RQ={'COMMIT_MODE': 'auto'}):
+            with self.assertRaisesMessage(AssertionError, 'Redis commands made, expected at most 1'):
+                self.assertMaxRedisCommands(1, lambda: get_queue('test2').count)
@@ -0,0 +1,170 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from rq.utils import now
+
+from django_rq.connection_utils import get_redis_connection
+from django_rq.history import get_queue_groups
+from django_rq.live_stats import (
+    add_rates,
+    format_age,
+    format_header,
+    format_row,
+    get_processed_key,
+    poll_all_queues,
+    poll_queues,
+    sort_statistics,
+)
+from django_rq.queues import get_queue
+from django_rq.testing import RedisAssertionsMixin
+from django_rq.workers import DjangoSimpleWorker, get_worker
+
+from .fixtures import failing_job, say_hello
+from .settings import RQ_QUEUES
+
+
+@override_settings(RQ={'COMMIT_MODE': 'auto'}, RQ_QUEUES={'test2': RQ_QUEUES['test2'], 'test3': RQ_QUEUES['test3']})
+class LiveStatsTest(RedisAssertionsMixin, TestCase):
+    def setUp(self):
+        self.queue = get_queue('test2')
+        self.connection = self.queue.connection
+        self.connection.flushdb()
+
+    def test_poll_queues(self):
+        job = self.queue.enqueue(say_hello)
+        self.queue.enqueue(say_hello)
+        job.enqueued_at = now() - timedelta(seconds=90)
+        job.save()
+        worker = get_worker('test2', worker_class=DjangoSimpleWorker)
+        worker.register_birth()
+        worker.set_state('busy')
+        # Registered workers whose key expired are left out
+        self.connection.sadd('rq:workers:test2', 'rq:worker:dead')
+
+        (queue_data,) = poll_queues([self.queue])
+        self.assertEqual(queue_data['name'], 'test2')
+        self.assertEqual(queue_data['queued'], 2)
+        self.assertEqual(queue_data['started'], 0)
+        self.assertEqual(queue_data['failed'], 0)
+        self.assertEqual(queue_data['processed'], 0)
+        self.assertAlmostEqual(queue_data['oldest_job_age'], 90, delta=5)
+        self.assertEqual(queue_data['worker_states'], {'busy': 1})
+        self.assertEqual(queue_data['workers'], 1)
+
+        worker.register_death()
+        (queue_data,) = poll_queues([get_queue('test3')])
+        self.assertEqual(queue_data['queued'], 0)
+        self.assertIsNone(queue_data['oldest_job_age'])
+        self.assertEqual(queue_data['workers'], 0)
+
+    def test_poll_takes_one_round_trip(self):
+        # Loads the script
+        poll_queues([self.queue])
+
+        with override_settings(RQ={'COMMIT_MODE': 'auto', 'REDIS_INSTRUMENTATION': True}):
+            connection = get_redis_connection(RQ_QUEUES['test2'])
+            connection.ping()
+            queues = [get_queue('test2', connection=connection), get_queue('test3', connection=connection)]
+            with self.assertMaxRedisRoundTrips(1):
+                statistics = poll_queues(queues)
+        self.assertEqual([queue_data['name'] for queue_data in statistics], ['test2', 'test3'])
+
+    def test_script_is_loaded_when_missing(self):
+        self.connection.script_flush()
+        self.queue.enqueue(say_hello)
+        self.assertEqual(poll_queues([self.queue])[0]['queued'], 1)
+
+    def test_workers_count_processed_jobs(self):
+        self.queue.enqueue(say_hello)
+        self.queue.enqueue(failing_job)
+        get_worker('test2', worker_class=DjangoSimpleWorker).work(burst=True)
+        self.assertEqual(int(self.connection.get(get_processed_key('test2'))), 2)
+        self.assertEqual({queue_data['name']: queue_data['processed'] for queue_data in poll_all_queues()}['test2'], 2)
+
+    def test_add_rates(self):
+        previous = [
+            {'name': 'a', 'timestamp': 100, 'queued': 10, 'started': 2, 'processed': 50},
+            {'name': 'b', 'timestamp': 100, 'queued': 5, 'started': 0, 'processed': 0},
+        ]
+        statistics = [
+            # 20 jobs performed, 8 more queued, 1 fewer started
+            {'name': 'a', 'timestamp': 110, 'queued': 18, 'started': 1, 'processed': 70},
+            # Emptied
+            {'name': 'b', 'timestamp': 110, 'queued': 0, 'started': 0, 'processed': 0},
+            {'name': 'c', 'timestamp': 110, 'queued': 1, 'started': 0, 'processed': 0},
+        ]
+        a, b, c = add_rates(statistics, previous)
+        self.assertEqual(a['dequeue_rate'], 2)
+        self.assertEqual(a['enqueue_rate'], 2.7)
+        self.assertEqual(b['dequeue_rate'], 0)
+        self.assertEqual(b['enqueue_rate'], 0)
+        self.assertIsNone(c['enqueue_rate'])
+        self.assertIsNone(c['dequeue_rate'])
+
+    def test_sort_statistics(self):
+        statistics = [
+            {'name': 'default', 'queued': 3, 'enqueue_rate': None},
+            {'name': 'high', 'queued': 10, 'enqueue_rate': 1.5},
+            {'name': 'low', 'queued': 0, 'enqueue_rate': 0.5},
+        ]
+
+        def names(*args):
+            return [queue_data['name'] for queue_data in sort_statistics(statistics, *args)]
+
+        self.assertEqual(names(), ['default', 'high', 'low'])
+        self.assertEqual(names('queued', True), ['high', 'default', 'low'])
+        self.assertEqual(names('enqueue_rate', True), ['high', 'low', 'default'])
+        self.assertEqual(names('enqueue_rate', False), ['low', 'high', 'default'])
+        self.assertEqual(names('name', False, 'H'), ['high'])
+
+    def test_format(self):
+        self.assertEqual(format_age(None), '-')
+        self.assertEqual(format_age(42.7), '42s')
+        self.assertEqual(format_age(200), '3m20s')
+        self.assertEqual(format_age(5 * 3600 + 120), '5h02m')
+        self.assertEqual(format_age(2 * 86400 + 3600), '2d01h')
+
+        header = format_header('queued', True)
+        self.assertTrue(header.startswith('Queue'))
+        self.assertIn('vQueued', header)
+        queue_data = {
+            'name': 'default',
+            'queued': 12,
+            'enqueue_rate': 2.25,
+            'dequeue_rate': None,
+            'oldest_job_age': 75,
+            'started': 1,
+            'deferred': 0,
+            'scheduled': 0,
+            'failed': 3,
+            'workers': 4,
+            'worker_states': {'busy': 1, 'idle': 3},
+        }
+        row = format_row(queue_data)
+        self.assertEqual(len(row), len(header))
+        self.assertEqual(row.split(), ['default', '12', '2.2', '-', '1m15s', '1', '0', '0', '3', '4', '1', '3', '0'])
+
+    def test_top_requires_a_terminal(self):
+        with self.assertRaisesMessage(CommandError, '--top requires a terminal'):
+            call_command('rqstats', '--top', stdout=StringIO())
+
+    @patch('curses.curs_set')
+    def test_top_reuses_connections(self, curs_set):
+        from django_rq.management.commands.rqstats import Command
+
+        screen = MagicMock()
+        screen.getmaxyx.return_value = (24, 80)
+        # Polls on every key press, until "q" is pressed
+        screen.getch.side_effect = [-1, -1, ord('q')]
+        with (
+            patch('django_rq.management.commands.rqstats.get_queue_groups', wraps=get_queue_groups) as get_groups,
+            patch('django_rq.live_stats.poll_queues', wraps=poll_queues) as poll,
+        ):
+            Command()._run_top(screen, 0)
+        get_groups.assert_called_once()
+        self.assertEqual(poll.call_count, 3)
+        connections = {id(call.args[0][0].connection) for call in poll.call_args_list}
+        self.assertEqual(len(connections), 1)
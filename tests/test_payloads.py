@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from django_rq.payloads import (
+    OFFLOADED_MARKER,
+    PAYLOADS_KEY,
+    FileSystemPayloadStore,
+    OffloadingJob,
+    collect_payloads,
+    get_payload_names_key,
+)
+from django_rq.queues import get_queue, get_queue_by_index
+from django_rq.settings import get_queues_list
+from django_rq.workers import DjangoSimpleWorker, get_worker
+
+from .fixtures import access_self
+
+
+def echo(data):
+    return data
+
+
+class PayloadOffloadingTest(TestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        settings = override_settings(
+            RQ={
+                'COMMIT_MODE': 'auto',
+                'PAYLOAD_OFFLOAD_THRESHOLD': 1024,
+                'PAYLOAD_STORE': FileSystemPayloadStore(self.location),
+            }
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.queue = get_queue('test2', job_class=OffloadingJob)
+        self.connection = self.queue.connection
+        self.connection.flushdb()
+
+    def get_payloads(self, job_id):
+        directory = os.path.join(self.location, 'rq-payloads', job_id)
+        return os.listdir(directory) if os.path.isdir(directory) else []
+
+    def test_large_payloads_are_offloaded(self):
+        data = 'x' * 10_000
+        job = self.queue.enqueue(echo, data)
+        self.assertEqual(len(self.get_payloads(job.id)), 1)
+        raw = self.connection.hget(job.key, 'data')
+        self.assertLess(len(raw), 200)
+
+        job = self.queue.fetch_job(job.id)
+        self.assertIsInstance(job, OffloadingJob)
+        self.assertEqual(job.args, (data,))
+
+        get_worker('test2', job_class=OffloadingJob, worker_class=DjangoSimpleWorker).work(burst=True)
+        job.refresh()
+        self.assertEqual(job.return_value(), data)
+        # The result was offloaded too
+        self.assertEqual(len(self.get_payloads(job.id)), 2)
+
+    def test_saving_replaces_payloads(self):
+        job = self.queue.enqueue(echo, 'x' * 10_000)
+        job.meta['report'] = 'y' * 10_000
+        job.save_meta()
+        job.meta['report'] = 'z' * 10_000
+        job.save()
+        self.assertEqual(sorted(self.get_payloads(job.id)), ['data', 'meta'])
+        self.assertEqual(self.connection.scard(get_payload_names_key(job.id)), 2)
+
+        job = self.queue.fetch_job(job.id)
+        self.assertEqual(job.args, ('x' * 10_000,))
+        self.assertEqual(job.meta['report'], 'z' * 10_000)
+
+    def test_dashboard_shows_offloaded_jobs(self):
+        job = self.queue.enqueue(echo, 'x' * 10_000, meta={'report': 'y' * 10_000})
+        User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        self.client.login(username='admin', password='admin')
+
+        index = next(index for index, config in enumerate(get_queues_list()) if config['name'] == 'test2')
+        with override_settings(RQ={**settings.RQ, 'JOB_CLASS': 'django_rq.payloads.OffloadingJob'}):
+            self.assertEqual(get_queue_by_index(index).fetch_job(job.id).args, ('x' * 10_000,))
+            response = self.client.get(reverse('admin:django_rq_job_detail', args=[index, job.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['job'].args, ('x' * 10_000,))
+        self.assertEqual(response.context['job'].meta['report'], 'y' * 10_000)
+
+    def test_small_payloads_are_kept_in_redis(self):
+        job = self.queue.enqueue(access_self)
+        self.assertEqual(self.get_payloads(job.id), [])
+        self.assertFalse(self.connection.exists(get_payload_names_key(job.id)))
+
+        job = self.queue.fetch_job(job.id)
+        self.assertFalse(job.serializer.dumps({'small': True}).startswith(OFFLOADED_MARKER))
+
+    def test_payloads_are_deleted_with_their_job(self):
+        job = self.queue.enqueue(echo, 'x' * 10_000)
+        self.queue.fetch_job(job.id).delete()
+        self.assertEqual(self.get_payloads(job.id), [])
+        self.assertFalse(self.connection.exists(get_payload_names_key(job.id)))
+        self.assertEqual(self.connection.zcard(PAYLOADS_KEY), 0)
+
+    def test_payloads_of_expired_jobs_are_collected(self):
+        job = self.queue.enqueue(echo, 'x' * 10_000)
+        kept = self.queue.enqueue(echo, 'y' * 10_000)
+        # The job expired with its result
+        self.connection.delete(job.key)
+
+        # Recently offloaded payloads may belong to jobs that weren't saved yet
+        self.assertEqual(collect_payloads(self.connection), 0)
+        with patch('django_rq.payloads.time.time', return_value=self.connection.time()[0] + 120):
+            self.assertEqual(collect_payloads(self.connection, OffloadingJob), 1)
+        self.assertEqual(self.get_payloads(job.id), [])
+        self.assertEqual(len(self.get_payloads(kept.id)), 1)
+        self.assertEqual(self.queue.fetch_job(kept.id).args, ('y' * 10_000,))
+
+    def test_worker_collects_payloads(self):
+        job = self.queue.enqueue(echo, 'x' * 10_000)
+        self.connection.delete(job.key)
+        self.connection.zadd(PAYLOADS_KEY, {job.id: 0})
+        get_worker('test2', job_class=OffloadingJob, worker_class=DjangoSimpleWorker).clean_registries()
+        self.assertEqual(self.get_payloads(job.id), [])
@@ -0,0 +1,104 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from redis.exceptions import RedisError
+from rq.job import Job
+
+from django_rq.profiling import get_profile, get_profile_key, get_profilers, get_profiles
+from django_rq.queues import get_queue
+from django_rq.settings import get_queues_map
+from django_rq.workers import DjangoSimpleWorker, get_worker
+
+from .fixtures import failing_job, say_hello
+
+
+@override_settings(RQ={'COMMIT_MODE': 'auto'})
+class ProfilingTest(TestCase):
+    def setUp(self):
+        self.queue = get_queue('test2')
+        self.connection = self.queue.connection
+        self.connection.flushdb()
+
+    def work(self):
+        get_worker('test2', worker_class=DjangoSimpleWorker).work(burst=True)
+
+    def test_get_profilers(self):
+        job = Job.create(say_hello, connection=self.connection)
+        self.assertEqual(get_profilers(job), [])
+        job.meta['profile'] = True
+        self.assertEqual(get_profilers(job), ['cprofile', 'tracemalloc'])
+        job.meta['profile'] = ['tracemalloc', 'unknown']
+        self.assertEqual(get_profilers(job), ['tracemalloc'])
+
+        job.meta = {}
+        with override_settings(RQ={'PROFILE_SAMPLE_RATE': 0.5, 'PROFILERS': ['cprofile']}):
+            with patch('django_rq.profiling.random.random', return_value=0.4):
+                self.assertEqual(get_profilers(job), ['cprofile'])
+            with patch('django_rq.profiling.random.random', return_value=0.6):
+                self.assertEqual(get_profilers(job), [])
+            # Jobs can opt out of sampling
+            job.meta['profile'] = False
+            with patch('django_rq.profiling.random.random', return_value=0.4):
+                self.assertEqual(get_profilers(job), [])
+
+    def test_profiled_job(self):
+        job = self.queue.enqueue(say_hello, result_ttl=600, meta={'profile': True})
+        self.work()
+
+        result = job.latest_result()
+        profiles = get_profiles(self.connection, job.id)
+        self.assertEqual(list(profiles), [result.id])
+        profile = get_profile(self.connection, job.id, result.id)
+        self.assertEqual(profile, profiles[result.id])
+        self.assertTrue(any('say_hello' in function['function'] for function in profile['functions']))
+        self.assertGreater(profile['peak_memory'], 0)
+        self.assertIsInstance(profile['allocations'], list)
+        self.assertGreater(profile['duration'], 0)
+        self.assertLessEqual(self.connection.ttl(get_profile_key(job.id)), 600)
+        self.assertGreater(self.connection.ttl(get_profile_key(job.id)), 500)
+
+    def test_failed_job(self):
+        job = self.queue.enqueue(failing_job, failure_ttl=1000, meta={'profile': ['cprofile']})
+        self.work()
+
+        profile = get_profile(self.connection, job.id, job.latest_result().id)
+        self.assertTrue(any('failing_job' in function['function'] for function in profile['functions']))
+        self.assertEqual(profile['allocations'], [])
+        self.assertIsNone(profile['peak_memory'])
+        self.assertGreater(self.connection.ttl(get_profile_key(job.id)), 900)
+
+    @patch('django_rq.workers.save_profile', side_effect=RedisError)
+    def test_failing_to_save_profile(self, _):
+        jobs = [self.queue.enqueue(say_hello, meta={'profile': True}) for _ in range(2)]
+        with self.assertLogs('rq.worker', 'WARNING') as logs:
+            self.work()
+        # The worker carries on and the jobs' outcome is kept
+        self.assertTrue(all(job.is_finished for job in jobs))
+        self.assertEqual(sum('could not save the profile' in message for message in logs.output), 2)
+
+    def test_jobs_are_not_profiled_by_default(self):
+        job = self.queue.enqueue(say_hello)
+        self.work()
+        self.assertEqual(get_profiles(self.connection, job.id), {})
+
+    def test_views(self):
+        job = self.queue.enqueue(say_hello, meta={'profile': True})
+        self.work()
+        result = job.latest_result()
+
+        User.objects.create_user('foo', password='pass', is_staff=True)
+        self.client.login(username='foo', password='pass')
+        queue_index = get_queues_map()['test2']
+        response = self.client.get(reverse('admin:django_rq_job_detail', args=[queue_index, job.id]))
+        self.assertContains(response, 'Cumulative Time')
+        self.assertContains(response, 'say_hello')
+        response = self.client.get(reverse('admin:django_rq_result_detail', args=[queue_index, job.id, result.id]))
+        self.assertContains(response, 'Cumulative Time')
+        self.assertContains(response, 'Allocated At')
+
+        unprofiled = self.queue.enqueue(say_hello)
+        self.work()
+        response = self.client.get(reverse('admin:django_rq_job_detail', args=[queue_index, unprofiled.id]))
+        self.assertNotContains(response, 'Cumulative Time')
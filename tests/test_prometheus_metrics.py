@@ -1,13 +1,16 @@
+from io import StringIO
 from unittest import skipIf
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.test import TestCase, override_settings
 from django.test.client import Client
 from django.urls import NoReverseMatch, reverse
+from rq.job import Job
 
 from django_rq import get_queue, thread_queue
-from django_rq.workers import get_worker
+from django_rq.workers import DjangoSimpleWorker, DjangoWorker, get_worker
 
 from .fixtures import access_self, failing_job
 from .redis_config import REDIS_CONFIG_1
@@ -141,3 +144,53 @@ class NoPrometheusTest(TestCase):
 
         with self.assertRaises(NoReverseMatch):
             reverse('django_rq:metrics')
+
+
+@skipIf(prometheus_client is None, 'prometheus_client is required')
+@override_settings(RQ={'AUTOCOMMIT': True})
+class WorkerMetricsTest(TestCase):
+    def setUp(self):
+        get_queue('default').connection.flushdb()
+
+    def get_sample_value(self, name, labels=None):
+        return prometheus_client.REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+    @patch('django_rq.contrib.prometheus._worker_metrics_enabled', True)
+    def test_worker_records_job_metrics(self):
+        finished_labels = {'queue': 'default', 'status': 'finished'}
+        failed_labels = {'queue': 'default', 'status': 'failed'}
+        finished = self.get_sample_value('rq_worker_jobs_total', finished_labels)
+        failed = self.get_sample_value('rq_worker_jobs_total', failed_labels)
+        forks = self.get_sample_value('rq_worker_horse_forks_total')
+        observed = self.get_sample_value('rq_worker_job_duration_seconds_count', {'queue': 'default'})
+
+        queue = get_queue('default')
+        for worker_class in (DjangoWorker, DjangoSimpleWorker):
+            queue.enqueue(access_self)
+            queue.enqueue(failing_job)
+            # Workers know the outcome of their jobs without fetching their status
+            with patch.object(Job, 'get_status', side_effect=AssertionError):
+                get_worker('default', worker_class=worker_class).work(burst=True)
+
+        self.assertEqual(self.get_sample_value('rq_worker_jobs_total', finished_labels), finished + 2)
+        self.assertEqual(self.get_sample_value('rq_worker_jobs_total', failed_labels), failed + 2)
+        self.assertEqual(self.get_sample_value('rq_worker_horse_forks_total'), forks + 2)
+        self.assertEqual(
+            self.get_sample_value('rq_worker_job_duration_seconds_count', {'queue': 'default'}), observed + 4
+        )
+
+    def test_worker_metrics_disabled_by_default(self):
+        forks = self.get_sample_value('rq_worker_horse_forks_total')
+        get_queue('default').enqueue(access_self)
+        get_worker('default').work(burst=True)
+        self.assertEqual(self.get_sample_value('rq_worker_horse_forks_total'), forks)
+
+    @patch('django_rq.contrib.prometheus._worker_metrics_enabled', False)
+    @patch('prometheus_client.start_http_server')
+    def test_metrics_port(self, start_http_server):
+        started = self.get_sample_value('rq_worker_pool_workers_started_total')
+        call_command('rqworker', burst=True, metrics_port=9100)
+        start_http_server.assert_called_once_with(9100, addr='0.0.0.0', registry=prometheus_client.REGISTRY)
+
+        call_command('rqworker-pool', burst=True, num_workers=2, metrics_port=9101, stderr=StringIO())
+        self.assertEqual(self.get_sample_value('rq_worker_pool_workers_started_total'), started + 2)
@@ -0,0 +1,134 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rq.exceptions import DequeueTimeout
+from rq.queue import Queue
+
+from django_rq.queues import DjangoRQ, get_queue, get_queues
+from django_rq.rate_limits import RateLimit, acquire_tokens, get_tokens, parse_rate_limit, release_tokens
+from django_rq.utils import get_statistics
+from django_rq.workers import DjangoSimpleWorker, get_worker
+
+from .fixtures import say_hello
+from .settings import RQ_QUEUES
+
+RATE_LIMITED_QUEUES = {'test2': {**RQ_QUEUES['test2'], 'RATE_LIMIT': '2/m'}, 'test3': RQ_QUEUES['test3']}
+
+
+@override_settings(RQ={'COMMIT_MODE': 'auto'})
+class RateLimitTest(TestCase):
+    def setUp(self):
+        self.connection = get_queue('test2').connection
+        self.connection.flushdb()
+
+    def test_parse_rate_limit(self):
+        self.assertEqual(parse_rate_limit('100/s'), RateLimit(100, 1))
+        self.assertEqual(parse_rate_limit('6000 / m'), RateLimit(6000, 60))
+        self.assertEqual(parse_rate_limit('10/h').rate, 10 / 3600)
+        self.assertEqual(str(parse_rate_limit('1000/d')), '1000/d')
+        for value in ['100', '0/s', '10/w', 'fast']:
+            with self.assertRaises(ImproperlyConfigured):
+                parse_rate_limit(value)
+
+    def test_token_bucket(self):
+        rate_limits = [('test2', RateLimit(2, 60)), ('test3', RateLimit(1, 1))]
+        self.assertEqual(get_tokens(self.connection, rate_limits), [2, 1])
+
+        states = acquire_tokens(self.connection, rate_limits)
+        self.assertEqual([state.taken for state in states], [True, True])
+        self.assertEqual([round(state.tokens) for state in states], [1, 0])
+        # A token is added to the second bucket every second
+        self.assertEqual(states[0].wait, 0)
+        self.assertGreater(states[1].wait, 0.9)
+
+        states = acquire_tokens(self.connection, rate_limits)
+        self.assertEqual([state.taken for state in states], [True, False])
+        self.assertGreater(states[0].wait, 25)
+
+        release_tokens(self.connection, rate_limits[:1])
+        self.assertEqual(round(get_tokens(self.connection, rate_limits[:1])[0]), 1)
+        # Buckets never hold more tokens than their capacity
+        release_tokens(self.connection, rate_limits[:1] * 3)
+        self.assertLessEqual(get_tokens(self.connection, rate_limits[:1])[0], 2)
+
+    @override_settings(RQ_QUEUES=RATE_LIMITED_QUEUES)
+    def test_dequeue_skips_rate_limited_queues(self):
+        queues = get_queues('test2', 'test3')
+        self.assertEqual(queues[0].rate_limit, RateLimit(2, 60))
+        self.assertIsNone(queues[1].rate_limit)
+        for queue in queues:
+            queue.empty()
+        limited_jobs = [queues[0].enqueue(say_hello) for _ in range(3)]
+        other_jobs = [queues[1].enqueue(say_hello) for _ in range(2)]
+
+        # Jobs from test3 are performed while test2 waits for tokens
+        worker = get_worker('test2', 'test3', worker_class=DjangoSimpleWorker)
+        worker.work(burst=True, max_jobs=4)
+        self.assertEqual([job.get_status() for job in limited_jobs], ['finished', 'finished', 'queued'])
+        self.assertTrue(all(job.is_finished for job in other_jobs))
+
+        # Blocking dequeues time out instead of waiting for the bucket to refill
+        with self.assertRaises(DequeueTimeout):
+            DjangoRQ.dequeue_any(queues, 1, connection=queues[0].connection)
+        self.assertEqual(queues[0].count, 1)
+        self.assertLess(get_tokens(self.connection, [('test2', RateLimit(2, 60))])[0], 1)
+
+    @override_settings(RQ_QUEUES={'test2': {**RQ_QUEUES['test2'], 'RATE_LIMIT': '2/s'}, 'test3': RQ_QUEUES['test3']})
+    def test_blocking_dequeue_waits_less_than_a_second_for_tokens(self):
+        queues = get_queues('test2', 'test3')
+        rate_limit = RateLimit(2, 1)
+        blocks = []
+
+        def dequeue_any(queues, timeout, **kwargs):
+            blocks.append((timeout, [queue.name for queue in queues]))
+            raise DequeueTimeout(timeout, [queue.key for queue in queues])
+
+        for version, expected in [((7, 0, 0), float), ((5, 0, 9), type(None))]:
+            blocks.clear()
+            self.connection.flushdb()
+            # Drain the bucket, a token is back within half a second
+            while acquire_tokens(self.connection, [('test2', rate_limit)])[0].taken:
+                pass
+            job = queues[0].enqueue(say_hello)
+            with patch('django_rq.queues.get_version', return_value=version):
+                with patch.object(Queue, 'dequeue_any', side_effect=dequeue_any):
+                    with self.assertRaises(DequeueTimeout):
+                        DjangoRQ.dequeue_any(queues, 1, connection=self.connection)
+                # test3 is polled or blocked on until test2 can be served
+                skipped = [block for block, names in blocks if names == ['test3']]
+                self.assertIsInstance(skipped[0], expected)
+                self.assertTrue(all(block is None or block <= 0.5 for block in skipped))
+                self.assertIn(['test2', 'test3'], [names for _, names in blocks])
+                self.assertEqual(DjangoRQ.dequeue_any(queues, 1, connection=self.connection)[0].id, job.id)
+
+    @override_settings(RQ_QUEUES=RATE_LIMITED_QUEUES)
+    @patch('django_rq.queues.time.sleep')
+    def test_burst_worker_waits_for_tokens(self, sleep):
+        queue = get_queue('test2')
+        acquire_tokens(self.connection, [('test2', RateLimit(2, 60))] * 2)
+        job = queue.enqueue(say_hello)
+
+        def refill(seconds):
+            release_tokens(self.connection, [('test2', RateLimit(2, 60))])
+
+        sleep.side_effect = refill
+        get_worker('test2', worker_class=DjangoSimpleWorker).work(burst=True)
+        self.assertTrue(job.is_finished)
+        self.assertGreater(sleep.call_args[0][0], 25)
+
+    @override_settings(RQ_QUEUES=RATE_LIMITED_QUEUES)
+    def test_statistics(self):
+        acquire_tokens(self.connection, [('test2', RateLimit(2, 60))])
+        queues = {queue['name']: queue for queue in get_statistics()['queues']}
+        self.assertEqual(queues['test2']['rate_limit']['limit'], '2/m')
+        self.assertEqual(round(queues['test2']['rate_limit']['tokens']), 1)
+        self.assertIsNone(queues['test3']['rate_limit'])
+
+        User.objects.create_user('foo', password='pass', is_staff=True)
+        self.client.login(username='foo', password='pass')
+        response = self.client.get(reverse('admin:django_rq_home'))
+        self.assertContains(response, 'Rate Limit Tokens')
+        self.assertContains(response, '1 (2/m)')
@@ -0,0 +1,91 @@
+import pickle
+import zlib
+from unittest import skipIf
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from django_rq import serializers
+from django_rq.queues import get_queue
+from django_rq.serializers import (
+    COMPRESSED_MARKER,
+    MsgpackSerializer,
+    OrjsonSerializer,
+    ZlibPickleSerializer,
+    ZstdPickleSerializer,
+)
+from django_rq.workers import DjangoSimpleWorker, get_queues_serializer, get_worker
+
+from .fixtures import say_hello
+from .settings import RQ_QUEUES
+
+SERIALIZED_QUEUES = {
+    'test2': {**RQ_QUEUES['test2'], 'SERIALIZER': 'django_rq.serializers.ZlibPickleSerializer'},
+    'test3': RQ_QUEUES['test3'],
+}
+
+
+class SerializersTest(TestCase):
+    def test_compressed_above_threshold(self):
+        small = {'name': 'World'}
+        self.assertEqual(ZlibPickleSerializer.dumps(small), pickle.dumps(small, protocol=pickle.HIGHEST_PROTOCOL))
+
+        large = {'names': ['World'] * 1000}
+        data = ZlibPickleSerializer.dumps(large)
+        self.assertTrue(data.startswith(COMPRESSED_MARKER + b'z'))
+        self.assertLess(len(data), len(pickle.dumps(large)) / 10)
+        self.assertEqual(ZlibPickleSerializer.loads(data), large)
+        # Payloads of the default serializer can still be loaded
+        self.assertEqual(ZlibPickleSerializer.loads(pickle.dumps(large)), large)
+
+        with override_settings(RQ={'COMPRESSION_THRESHOLD': 0}):
+            self.assertTrue(ZlibPickleSerializer.dumps(small).startswith(COMPRESSED_MARKER))
+
+    @skipIf(serializers.zstandard is None, 'zstandard is not installed')
+    def test_zstd(self):
+        large = {'names': ['World'] * 1000}
+        data = ZstdPickleSerializer.dumps(large)
+        self.assertTrue(data.startswith(COMPRESSED_MARKER + b's'))
+        self.assertEqual(ZstdPickleSerializer.loads(data), large)
+        self.assertEqual(ZlibPickleSerializer.loads(data), large)
+
+    @skipIf(serializers.orjson is None, 'orjson is not installed')
+    def test_orjson(self):
+        data = OrjsonSerializer.dumps(('func', None, (1, 'a'), {'b': 2}))
+        self.assertEqual(OrjsonSerializer.loads(data), ['func', None, [1, 'a'], {'b': 2}])
+
+    @skipIf(serializers.msgpack is None, 'msgpack is not installed')
+    def test_msgpack(self):
+        data = MsgpackSerializer.dumps(('func', None, (1, b'a'), {'b': 2}))
+        self.assertEqual(MsgpackSerializer.loads(data), ['func', None, [1, b'a'], {'b': 2}])
+
+    @override_settings(RQ={'COMMIT_MODE': 'auto'}, RQ_QUEUES=SERIALIZED_QUEUES)
+    def test_worker_uses_queue_serializer(self):
+        queue = get_queue('test2')
+        queue.connection.flushdb()
+        self.assertIs(queue.serializer, ZlibPickleSerializer)
+        job = queue.enqueue(say_hello, 'World' * 1000)
+        # RQ compresses the job's data with zlib on top of the serializer
+        self.assertTrue(zlib.decompress(queue.connection.hget(job.key, 'data')).startswith(COMPRESSED_MARKER))
+
+        worker = get_worker('test2', worker_class=DjangoSimpleWorker)
+        self.assertIs(worker.serializer, ZlibPickleSerializer)
+        worker.work(burst=True)
+        job = queue.fetch_job(job.id)
+        self.assertTrue(job.is_finished)
+        self.assertEqual(job.return_value(), f'Hello, {"World" * 1000}!')
+
+    @override_settings(RQ={'COMMIT_MODE': 'auto'}, RQ_QUEUES=SERIALIZED_QUEUES)
+    def test_queues_with_different_serializers(self):
+        with self.assertRaises(ValueError):
+            get_queues_serializer([get_queue('test2'), get_queue('test3')])
+        with self.assertRaises(ValueError):
+            get_worker('test2', 'test3')
+        with self.assertRaises(CommandError):
+            call_command('rqworker', 'test2', 'test3', burst=True)
+        with self.assertRaises(CommandError):
+            call_command('rqworker-pool', 'test2', 'test3', burst=True)
+
+        # Unless the worker's serializer is given
+        worker = get_worker('test2', 'test3', serializer=ZlibPickleSerializer)
+        self.assertIs(worker.serializer, ZlibPickleSerializer)
@@ -0,0 +1,98 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from django_rq import signals, thread_queue
+from django_rq.middleware import EnqueueTimingMiddleware
+from django_rq.queues import get_queue
+
+from .fixtures import say_hello
+from .settings import RQ_QUEUES
+
+
+@override_settings(RQ={'COMMIT_MODE': 'auto'}, RQ_QUEUES={'test2': RQ_QUEUES['test2'], 'test3': RQ_QUEUES['test3']})
+class EnqueueSignalsTest(TestCase):
+    def setUp(self):
+        get_queue('test2').connection.flushdb()
+        self.calls = []
+
+    def receiver(self, signal, **kwargs):
+        self.calls.append((signal, kwargs))
+
+    def connect(self, signal):
+        signal.connect(self.receiver)
+        self.addCleanup(signal.disconnect, self.receiver)
+
+    def test_enqueue_signals(self):
+        self.connect(signals.pre_enqueue)
+        self.connect(signals.post_enqueue)
+        queue = get_queue('test2')
+        job = queue.enqueue(say_hello, 'Alice')
+
+        (pre_signal, pre), (post_signal, post) = self.calls
+        self.assertIs(pre_signal, signals.pre_enqueue)
+        self.assertIs(pre['queue'], queue)
+        self.assertEqual(pre['kwargs']['args'], ('Alice',))
+        self.assertIs(post_signal, signals.post_enqueue)
+        self.assertEqual(post['job'], job)
+        self.assertGreater(post['duration'], 0)
+
+    def test_receivers_can_change_the_job(self):
+        def add_meta(sender, kwargs, **_):
+            kwargs['meta'] = {**(kwargs.get('meta') or {}), 'request_id': 'abc'}
+
+        signals.pre_enqueue.connect(add_meta)
+        self.addCleanup(signals.pre_enqueue.disconnect, add_meta)
+        job = get_queue('test2').enqueue(say_hello)
+        self.assertEqual(job.meta['request_id'], 'abc')
+
+    def test_jobs_flushed(self):
+        self.connect(signals.jobs_flushed)
+        self.connect(signals.post_enqueue)
+        with override_settings(RQ={'COMMIT_MODE': 'request_finished'}):
+            queue = get_queue('test2')
+            queue.enqueue(say_hello)
+            queue.enqueue(say_hello)
+            self.assertEqual(self.calls, [])
+            thread_queue.commit()
+
+        self.assertEqual([signal for signal, _ in self.calls], [signals.post_enqueue] * 2 + [signals.jobs_flushed])
+        flushed = self.calls[-1][1]
+        self.assertEqual(flushed['count'], 2)
+        self.assertGreater(flushed['duration'], 0)
+        self.assertEqual(queue.count, 2)
+
+        # Nothing is sent when there was nothing to flush
+        thread_queue.commit()
+        self.assertEqual(len(self.calls), 3)
+
+    def test_middleware(self):
+        def view(request):
+            get_queue('test2').enqueue(say_hello)
+            get_queue('test2').enqueue(say_hello)
+            return HttpResponse(headers={'Server-Timing': 'db;dur=1'})
+
+        middleware = EnqueueTimingMiddleware(view)
+        self.addCleanup(signals.post_enqueue.disconnect, dispatch_uid='django_rq.middleware.record_enqueue')
+        with self.assertLogs('django_rq.middleware', 'INFO') as logs:
+            response = middleware(RequestFactory().get('/enqueue/'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=1, rq-enqueue;dur=[\d.]+;desc="2 jobs"$')
+        self.assertIn('GET /enqueue/: 2 jobs enqueued in', logs.output[0])
+
+        # Enqueues outside requests aren't counted
+        get_queue('test2').enqueue(say_hello)
+        response = EnqueueTimingMiddleware(lambda request: HttpResponse())(RequestFactory().get('/'))
+        self.assertIn('desc="0 jobs"', response['Server-Timing'])
+
+    @override_settings(RQ={'COMMIT_MODE': 'request_finished'})
+    def test_middleware_pending_jobs(self):
+        def view(request):
+            get_queue('test2').enqueue(say_hello)
+            return HttpResponse()
+
+        middleware = EnqueueTimingMiddleware(view)
+        self.addCleanup(signals.post_enqueue.disconnect, dispatch_uid='django_rq.middleware.record_enqueue')
+        self.addCleanup(thread_queue.clear)
+        with self.assertLogs('django_rq.middleware', 'INFO') as logs:
+            response = middleware(RequestFactory().get('/'))
+        self.assertIn('rq-enqueue;dur=0.000;desc="0 jobs", rq-pending;desc="1 jobs"', response['Server-Timing'])
+        self.assertIn('0 jobs enqueued in 0.0 ms, 1 pending', logs.output[0])
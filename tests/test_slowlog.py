@@ -0,0 +1,122 @@
+import json
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from redis.exceptions import RedisError
+
+from django_rq.queues import get_queue
+from django_rq.settings import get_queues_map
+from django_rq.slowlog import get_slow_jobs, get_slowest_functions, get_slowlog_key, percentile
+from django_rq.workers import DjangoSimpleWorker, get_worker
+
+from .fixtures import say_hello, sleep
+from .settings import RQ_QUEUES
+
+SLOW_QUEUES = {
+    'test2': {**RQ_QUEUES['test2'], 'SLOW_JOB_THRESHOLD': 0.1},
+    'test3': RQ_QUEUES['test3'],
+}
+
+
+@override_settings(RQ={'COMMIT_MODE': 'auto'}, RQ_QUEUES=SLOW_QUEUES)
+class SlowLogTest(TestCase):
+    def setUp(self):
+        self.queue = get_queue('test2')
+        self.connection = self.queue.connection
+        self.connection.flushdb()
+
+    def work(self, queue_name='test2'):
+        get_worker(queue_name, worker_class=DjangoSimpleWorker).work(burst=True)
+
+    def test_slow_jobs_are_logged(self):
+        slow_job = self.queue.enqueue(sleep, 0.15)
+        self.queue.enqueue(say_hello)
+        self.work()
+
+        slow_jobs = get_slow_jobs(self.connection, 'test2')
+        self.assertEqual(len(slow_jobs), 1)
+        self.assertEqual(slow_jobs[0]['job_id'], slow_job.id)
+        self.assertEqual(slow_jobs[0]['func'], 'tests.fixtures.sleep')
+        self.assertEqual(slow_jobs[0]['queue'], 'test2')
+        self.assertGreaterEqual(slow_jobs[0]['duration'], 0.15)
+        self.assertTrue(slow_jobs[0]['worker'])
+        self.assertEqual(len(slow_jobs[0]['args_digest']), 16)
+
+        # Queues without a threshold don't log slow jobs
+        get_queue('test3').enqueue(sleep, 0.15)
+        self.work('test3')
+        self.assertEqual(get_slow_jobs(self.connection, 'test3'), [])
+
+    @patch('django_rq.workers.log_slow_job', side_effect=RedisError)
+    def test_failing_to_log_slow_job(self, _):
+        jobs = [self.queue.enqueue(sleep, 0.15) for _ in range(2)]
+        with self.assertLogs('rq.worker', 'WARNING') as logs:
+            self.work()
+        # The worker carries on and the jobs' outcome is kept
+        self.assertTrue(all(job.is_finished for job in jobs))
+        self.assertEqual(sum('could not add job' in message for message in logs.output), 2)
+
+    def test_log_is_capped(self):
+        with override_settings(RQ={'COMMIT_MODE': 'auto', 'SLOWLOG_MAX_LENGTH': 2}):
+            for _ in range(3):
+                self.queue.enqueue(sleep, 0.1)
+            self.work()
+        # Streams are trimmed approximately, in whole nodes
+        self.assertLessEqual(self.connection.xlen(get_slowlog_key('test2')), 3)
+        self.assertEqual(len(get_slow_jobs(self.connection, 'test2', count=1)), 1)
+
+    def test_get_slowest_functions(self):
+        self.assertEqual(percentile([1.0], 99), 1.0)
+        self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 50), 2.0)
+
+        slow_jobs = [{'func': 'fast', 'duration': duration} for duration in (1.0, 2.0, 3.0)]
+        slow_jobs += [{'func': 'slow', 'duration': duration} for duration in (10.0, 2.0)]
+        functions = get_slowest_functions(slow_jobs)
+        self.assertEqual([function['func'] for function in functions], ['slow', 'fast'])
+        self.assertEqual(functions[0]['count'], 2)
+        self.assertEqual(functions[0]['p50'], 2.0)
+        self.assertEqual(functions[0]['p99'], 10.0)
+        self.assertEqual(functions[1]['mean'], 2.0)
+        self.assertEqual(functions[1]['max'], 3.0)
+        self.assertEqual(len(get_slowest_functions(slow_jobs, top=1)), 1)
+
+    def test_view(self):
+        job = self.queue.enqueue(sleep, 0.15)
+        self.work()
+
+        User.objects.create_user('foo', password='pass', is_staff=True)
+        self.client.login(username='foo', password='pass')
+        queue_index = get_queues_map()['test2']
+        response = self.client.get(reverse('admin:django_rq_queue_details', args=[queue_index]))
+        self.assertContains(response, reverse('admin:django_rq_slow_jobs', args=[queue_index]))
+
+        response = self.client.get(reverse('admin:django_rq_slow_jobs', args=[queue_index]))
+        self.assertContains(response, 'tests.fixtures.sleep')
+        self.assertContains(response, job.id)
+        self.assertContains(response, 'p95 (s)')
+
+        self.client.post(reverse('admin:django_rq_slow_jobs', args=[queue_index]))
+        self.assertEqual(get_slow_jobs(self.connection, 'test2'), [])
+
+    def test_command(self):
+        job = self.queue.enqueue(sleep, 0.15)
+        self.work()
+
+        output = StringIO()
+        call_command('rqslowlog', 'test2', '--recent', '1', stdout=output)
+        self.assertIn('test2: 1 slow jobs', output.getvalue())
+        self.assertIn('tests.fixtures.sleep', output.getvalue())
+        self.assertIn(job.id, output.getvalue())
+
+        output = StringIO()
+        call_command('rqslowlog', '--json', stdout=output)
+        report = json.loads(output.getvalue())
+        self.assertEqual(report['test2']['functions'][0]['count'], 1)
+        self.assertEqual(report['test3']['slow_jobs'], 0)
+
+        call_command('rqslowlog', 'test2', '--clear', stdout=StringIO())
+        self.assertEqual(get_slow_jobs(self.connection, 'test2'), [])
@@ -0,0 +1,115 @@
+import os
+import tempfile
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from django_rq import thread_queue, tracing
+from django_rq.queues import get_queue
+from django_rq.testing import capture_spans
+from django_rq.workers import DjangoSimpleWorker, DjangoWorker, get_worker
+
+from .fixtures import failing_job, say_hello
+from .settings import RQ_QUEUES
+
+
+@override_settings(RQ={'COMMIT_MODE': 'auto'}, RQ_QUEUES={'test2': RQ_QUEUES['test2'], 'test3': RQ_QUEUES['test3']})
+class TracingTest(TestCase):
+    def setUp(self):
+        self.queue = get_queue('test2')
+        self.queue.connection.flushdb()
+
+    def work(self):
+        get_worker('test2', worker_class=DjangoSimpleWorker).work(burst=True)
+
+    def test_tracing_without_opentelemetry(self):
+        with patch.object(tracing, 'trace', None):
+            self.assertFalse(tracing.is_tracing_enabled())
+            job = self.queue.enqueue(say_hello)
+            self.work()
+        self.assertNotIn(tracing.TRACE_CONTEXT_META_KEY, job.meta)
+        self.assertEqual(job.latest_result().return_value, 'Hello, World!')
+
+    @skipIf(tracing.trace is None, 'opentelemetry is not installed')
+    def test_job_is_traced(self):
+        with capture_spans() as exporter:
+            with tracing.get_tracer().start_as_current_span('request') as request_span:
+                job = self.queue.enqueue(say_hello, meta={'foo': 'bar'})
+            self.assertEqual(job.meta['foo'], 'bar')
+            self.assertIn('traceparent', job.meta[tracing.TRACE_CONTEXT_META_KEY])
+            self.work()
+
+        spans = {span.name: span for span in exporter.get_finished_spans()}
+        publish, process = spans['publish test2'], spans['process test2']
+        trace_id = request_span.get_span_context().trace_id
+        self.assertEqual(publish.parent.span_id, request_span.get_span_context().span_id)
+        self.assertEqual(publish.attributes['messaging.message.id'], job.id)
+        self.assertEqual(process.context.trace_id, trace_id)
+        self.assertEqual(process.parent.span_id, publish.context.span_id)
+        self.assertEqual(process.links[0].context.span_id, publish.context.span_id)
+        self.assertEqual(process.attributes['messaging.message.id'], job.id)
+        self.assertEqual(process.attributes['code.function'], 'tests.fixtures.say_hello')
+        self.assertGreaterEqual(process.attributes['messaging.rq.queue_latency'], 0)
+
+    @skipIf(tracing.trace is None, 'opentelemetry is not installed')
+    def test_failed_job(self):
+        with capture_spans() as exporter:
+            self.queue.enqueue(failing_job)
+            self.work()
+
+        process = next(span for span in exporter.get_finished_spans() if span.name == 'process test2')
+        self.assertFalse(process.status.is_ok)
+        self.assertEqual(process.events[0].name, 'exception')
+
+    @skipIf(tracing.trace is None, 'opentelemetry is not installed')
+    def test_forking_worker_exports_batched_spans(self):
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+        class FileSpanExporter(SpanExporter):
+            # Spans are exported by the work horse, the test reads them from a file
+            def __init__(self, path):
+                self.path = path
+
+            def export(self, spans):
+                if self.path is not None:
+                    with open(self.path, 'a') as file:
+                        file.writelines(f'{span.name}\n' for span in spans)
+                return SpanExportResult.SUCCESS
+
+        with tempfile.TemporaryDirectory() as directory:
+            exporter = FileSpanExporter(os.path.join(directory, 'spans'))
+            self.addCleanup(setattr, exporter, 'path', None)
+            with capture_spans():
+                # Spans are only exported when flushed
+                processor = BatchSpanProcessor(exporter, schedule_delay_millis=60_000)
+                tracing.trace.get_tracer_provider().add_span_processor(processor)
+                self.queue.enqueue(say_hello)
+                get_worker('test2', worker_class=DjangoWorker).work(burst=True)
+
+            with open(exporter.path) as file:
+                self.assertIn('process test2', file.read().splitlines())
+
+    @skipIf(tracing.trace is None, 'opentelemetry is not installed')
+    def test_deferred_enqueue(self):
+        with override_settings(RQ={'COMMIT_MODE': 'request_finished'}):
+            queue = get_queue('test2')
+            with capture_spans() as exporter:
+                with tracing.get_tracer().start_as_current_span('request') as request_span:
+                    queue.enqueue(say_hello)
+                # The context is captured when the job is enqueued, not committed
+                _, _, kwargs = thread_queue.get_queue()[0]
+                self.assertIn(tracing.TRACE_CONTEXT_META_KEY, kwargs['meta'])
+                thread_queue.clear()
+        publish = exporter.get_finished_spans()[0]
+        self.assertEqual(publish.parent.span_id, request_span.get_span_context().span_id)
+
+    @skipIf(tracing.trace is None, 'opentelemetry is not installed')
+    @override_settings(RQ={'COMMIT_MODE': 'auto', 'TRACING': False})
+    def test_disabled(self):
+        with capture_spans() as exporter:
+            with tracing.get_tracer().start_as_current_span('request'):
+                job = self.queue.enqueue(say_hello)
+            self.work()
+        self.assertNotIn(tracing.TRACE_CONTEXT_META_KEY, job.meta)
+        self.assertEqual([span.name for span in exporter.get_finished_spans()], ['request'])
@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from rq.job import JobStatus
+from rq.utils import now
+
+from django_rq import thread_queue
+from django_rq.decorators import job
+from django_rq.queues import get_queue
+from django_rq.uniqueness import get_suppressed_count, get_unique_key
+from django_rq.utils import get_statistics
+from django_rq.workers import DjangoSimpleWorker, get_worker
+
+from .fixtures import reindex, say_hello
+from .settings import RQ_QUEUES
+
+
+@override_settings(RQ={'COMMIT_MODE': 'auto'})
+class UniquenessTest(TestCase):
+    def setUp(self):
+        self.queue = get_queue('test2')
+        self.connection = self.queue.connection
+        self.connection.flushdb()
+
+    def test_duplicates_suppressed(self):
+        first = self.queue.enqueue_call(say_hello, args=('a',), unique_key='hello')
+        self.assertEqual(first.meta['unique_key'], 'hello')
+        duplicate = self.queue.enqueue_call(say_hello, args=('b',), unique_key='hello')
+        self.assertEqual(duplicate.id, first.id)
+        self.assertEqual(self.queue.job_ids, [first.id])
+        self.assertEqual(get_suppressed_count(self.connection, 'test2'), 1)
+
+        # Once the job started, the same key can be enqueued again
+        get_worker('test2', worker_class=DjangoSimpleWorker).work(burst=True)
+        self.assertIsNone(self.connection.get(get_unique_key('hello')))
+        second = self.queue.enqueue_call(say_hello, unique_key='hello')
+        self.assertNotEqual(second.id, first.id)
+        self.assertEqual(self.queue.job_ids, [second.id])
+
+    def test_unique_for(self):
+        first = self.queue.enqueue_call(say_hello, unique_key='hello', unique_for=60)
+        self.assertNotIn('unique_key', first.meta)
+        self.assertLessEqual(self.connection.ttl(get_unique_key('hello')), 60)
+
+        # Duplicates are suppressed even after the job ran
+        get_worker('test2', worker_class=DjangoSimpleWorker).work(burst=True)
+        self.assertEqual(first.get_status(), JobStatus.FINISHED)
+        self.assertEqual(self.queue.enqueue_call(say_hello, unique_key='hello', unique_for=60).id, first.id)
+        self.assertEqual(self.queue.count, 0)
+
+    def test_deleted_job_does_not_suppress_duplicates(self):
+        first = self.queue.enqueue_call(say_hello, unique_key='hello')
+        first.delete()
+        second = self.queue.enqueue_call(say_hello, unique_key='hello')
+        self.assertNotEqual(second.id, first.id)
+        self.assertEqual(get_suppressed_count(self.connection, 'test2'), 0)
+
+    def test_job_decorator(self):
+        first = self.queue.enqueue(reindex, 1)
+        self.assertEqual(first.meta['unique_key'], 'reindex:1')
+        self.assertEqual(self.queue.enqueue(reindex, pk=1).id, first.id)
+        self.assertNotEqual(self.queue.enqueue(reindex, 2).id, first.id)
+        self.assertEqual(self.queue.count, 2)
+
+        with self.assertRaises(TypeError):
+            job('test2', unique_for=10)
+        with self.assertRaises(ValueError):
+            self.queue.enqueue_call(say_hello, unique_key='hello', depends_on=first)
+
+    @override_settings(RQ_QUEUES={'test2': RQ_QUEUES['test2'], 'test3': RQ_QUEUES['test3']})
+    def test_statistics(self):
+        for _ in range(3):
+            self.queue.enqueue_call(say_hello, unique_key='hello')
+        queues = {queue['name']: queue for queue in get_statistics()['queues']}
+        self.assertEqual(queues['test2']['suppressed_jobs'], 2)
+        self.assertEqual(queues['test3']['suppressed_jobs'], 0)
+
+
+@override_settings(RQ={'COMMIT_MODE': 'auto'})
+class DebounceTest(TestCase):
+    def setUp(self):
+        self.queue = get_queue('test2')
+        self.connection = self.queue.connection
+        self.connection.flushdb()
+        self.registry = self.queue.scheduled_job_registry
+
+    def test_enqueue_debounced(self):
+        start = now()
+        job = self.queue.enqueue_debounced(say_hello, 'hello', 5, args=('a',))
+        self.assertEqual(job.get_status(), JobStatus.SCHEDULED)
+        scheduled_at = self.registry.get_scheduled_time(job)
+        self.assertGreaterEqual(scheduled_at, start + timedelta(seconds=4))
+        self.assertEqual(self.queue.count, 0)
+
+        # Calls with the same key postpone the job and replace its arguments
+        postponed = self.queue.enqueue_debounced(say_hello, 'hello', 60, args=('b',))
+        self.assertEqual(postponed.id, job.id)
+        self.assertEqual(self.registry.get_job_ids(), [job.id])
+        self.assertGreater(self.registry.get_scheduled_time(job), scheduled_at + timedelta(seconds=50))
+        job.refresh()
+        self.assertEqual(job.args, ('b',))
+        self.assertEqual(get_suppressed_count(self.connection, 'test2'), 1)
+
+        other = self.queue.enqueue_debounced(say_hello, 'other', 5)
+        self.assertNotEqual(other.id, job.id)
+
+        # Once the scheduler enqueued the job, a new one is scheduled
+        self.registry.remove(job)
+        self.queue.enqueue_job(job)
+        self.assertNotEqual(self.queue.enqueue_debounced(say_hello, 'hello', 5).id, job.id)
+
+    def test_max_delay(self):
+        job = self.queue.enqueue_debounced(say_hello, 'hello', 5, max_delay=timedelta(seconds=10))
+        self.queue.enqueue_debounced(say_hello, 'hello', 60, max_delay=timedelta(seconds=10))
+        self.assertLessEqual(self.registry.get_scheduled_time(job), job.created_at + timedelta(seconds=10))
+
+    def test_commit_modes(self):
+        with override_settings(RQ={'COMMIT_MODE': 'request_finished'}):
+            self.addCleanup(thread_queue.clear)
+            self.assertIsNone(get_queue('test2').enqueue_debounced(say_hello, 'hello', 5))
+            self.assertEqual(self.registry.count, 0)
+            thread_queue.commit()
+            self.assertEqual(self.registry.count, 1)
+
+        with override_settings(RQ={'COMMIT_MODE': 'on_db_commit'}):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertIsNone(get_queue('test2').enqueue_debounced(say_hello, 'other', 5))
+                self.assertEqual(self.registry.count, 1)
+            self.assertEqual(self.registry.count, 2)
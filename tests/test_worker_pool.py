@@ -0,0 +1,188 @@
+from importlib import import_module
+from unittest.mock import MagicMock, patch
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from rq.worker_pool import WorkerData
+
+from django_rq import get_queue
+from django_rq.worker_pool import (
+    BacklogScalingPolicy,
+    DjangoWorkerPool,
+    QueueStats,
+    ScalingPolicy,
+    get_scaling_policy_class,
+)
+
+from .fixtures import say_hello
+
+
+class FixedScalingPolicy(ScalingPolicy):
+    interval = 0
+
+    def get_num_workers(self, num_workers, stats):
+        return 3
+
+
+class BacklogScalingPolicyTest(TestCase):
+    @patch('django_rq.worker_pool.time.monotonic')
+    def test_scale_up_on_backlog(self, monotonic):
+        monotonic.return_value = 100
+        policy = BacklogScalingPolicy(min_workers=1, max_workers=10)
+        self.assertEqual(policy.get_num_workers(2, QueueStats(queued=20, oldest_job_age=0)), 2)
+        self.assertEqual(policy.get_num_workers(2, QueueStats(queued=55, oldest_job_age=0)), 6)
+
+        # No further scaling up during cooldown
+        monotonic.return_value = 105
+        self.assertEqual(policy.get_num_workers(6, QueueStats(queued=100, oldest_job_age=0)), 6)
+        monotonic.return_value = 111
+        self.assertEqual(policy.get_num_workers(6, QueueStats(queued=100, oldest_job_age=0)), 10)
+
+    @patch('django_rq.worker_pool.time.monotonic')
+    def test_scale_up_on_job_age(self, monotonic):
+        monotonic.return_value = 100
+        policy = BacklogScalingPolicy(min_workers=1, max_workers=10)
+        self.assertEqual(policy.get_num_workers(2, QueueStats(queued=1, oldest_job_age=60)), 3)
+
+    @patch('django_rq.worker_pool.time.monotonic')
+    def test_scale_down_after_delay(self, monotonic):
+        policy = BacklogScalingPolicy(min_workers=1, max_workers=10)
+        monotonic.return_value = 100
+        self.assertEqual(policy.get_num_workers(4, QueueStats(queued=0, oldest_job_age=0)), 4)
+        monotonic.return_value = 130
+        self.assertEqual(policy.get_num_workers(4, QueueStats(queued=0, oldest_job_age=0)), 4)
+        monotonic.return_value = 160
+        self.assertEqual(policy.get_num_workers(4, QueueStats(queued=0, oldest_job_age=0)), 3)
+        # Delay restarts after every step
+        monotonic.return_value = 170
+        self.assertEqual(policy.get_num_workers(3, QueueStats(queued=0, oldest_job_age=0)), 3)
+        # A new backlog resets the delay
+        self.assertEqual(policy.get_num_workers(3, QueueStats(queued=1, oldest_job_age=0)), 3)
+        monotonic.return_value = 220
+        self.assertEqual(policy.get_num_workers(3, QueueStats(queued=0, oldest_job_age=0)), 3)
+
+    def test_get_scaling_policy_class(self):
+        self.assertIs(get_scaling_policy_class(), BacklogScalingPolicy)
+        self.assertIs(get_scaling_policy_class('tests.test_worker_pool.FixedScalingPolicy'), FixedScalingPolicy)
+        with override_settings(RQ={'SCALING_POLICY_CLASS': 'tests.test_worker_pool.FixedScalingPolicy'}):
+            self.assertIs(get_scaling_policy_class(), FixedScalingPolicy)
+
+
+@override_settings(RQ={'COMMIT_MODE': 'auto'})
+class DjangoWorkerPoolTest(TestCase):
+    def setUp(self):
+        self.queue = get_queue('default')
+        self.queue.connection.flushdb()
+
+    def get_pool(self, **kwargs):
+        return DjangoWorkerPool(queues=[self.queue], connection=self.queue.connection, **kwargs)
+
+    def test_get_queue_stats(self):
+        pool = self.get_pool()
+        self.assertEqual(pool.get_queue_stats(), QueueStats(queued=0, oldest_job_age=0))
+
+        self.queue.enqueue(say_hello)
+        self.queue.enqueue(say_hello)
+        stats = pool.get_queue_stats()
+        self.assertEqual(stats.queued, 2)
+        self.assertGreaterEqual(stats.oldest_job_age, 0)
+        self.assertLess(stats.oldest_job_age, 60)
+
+    def test_num_workers_clamped_to_policy(self):
+        pool = self.get_pool(num_workers=8, scaling_policy=FixedScalingPolicy(min_workers=1, max_workers=4))
+        self.assertEqual(pool.num_workers, 4)
+
+    def test_scale_up(self):
+        pool = self.get_pool(num_workers=1, scaling_policy=FixedScalingPolicy(min_workers=1, max_workers=2))
+        pool.status = pool.Status.STARTED
+        with patch.object(pool, 'start_worker') as start_worker:
+            pool.check_workers()
+        self.assertEqual(pool.num_workers, 2)
+        self.assertEqual(start_worker.call_count, 2)
+
+    def test_retire_idle_workers(self):
+        pool = self.get_pool(num_workers=4, scaling_policy=FixedScalingPolicy(min_workers=1, max_workers=10))
+        pool.status = pool.Status.STARTED
+        connection = self.queue.connection
+        for index, state in enumerate(['busy', 'idle', 'idle', 'idle', 'idle']):
+            name = f'worker-{index}'
+            process = MagicMock(is_alive=MagicMock(return_value=True))
+            pool.worker_dict[name] = WorkerData(name=name, pid=1000 + index, process=process)
+            connection.hset(f'rq:worker:{name}', 'state', state)
+
+        with patch.object(pool, 'stop_worker') as stop_worker, patch.object(pool, 'start_worker') as start_worker:
+            pool.check_workers()
+
+        self.assertEqual(stop_worker.call_count, 2)
+        self.assertNotIn('worker-0', pool._retiring_workers)
+        self.assertEqual(pool.num_workers, 3)
+        self.assertEqual(pool.number_of_serving_workers, 3)
+        start_worker.assert_not_called()
+
+        # Retired workers are not respawned once they exit
+        retired = pool.worker_dict[sorted(pool._retiring_workers)[0]]
+        pool.handle_dead_worker(retired)
+        self.assertEqual(pool.number_of_serving_workers, 3)
+
+    @patch('django_rq.worker_pool.ForkProcess')
+    def test_scheduler_worker(self, fork_process):
+        fork_process.return_value.pid = 1000
+        pool = self.get_pool(num_workers=2, name='pool', with_scheduler=True, max_jobs=5, worker_ttl=60)
+        pool.start_workers(burst=False)
+
+        self.assertEqual(len(pool.worker_dict), 2)
+        self.assertTrue(all(name.startswith('pool.') for name in pool.worker_dict))
+        kwargs = [call.kwargs['kwargs'] for call in fork_process.call_args_list]
+        self.assertEqual([k['with_scheduler'] for k in kwargs], [True, False])
+        self.assertEqual({k['max_jobs'] for k in kwargs}, {5})
+        self.assertEqual({k['worker_ttl'] for k in kwargs}, {60})
+
+        # Another worker takes over the scheduler when the scheduler worker exits
+        pool.handle_dead_worker(pool.worker_dict[pool._scheduler_worker_name])
+        pool.start_worker(burst=False)
+        self.assertTrue(fork_process.call_args.kwargs['kwargs']['with_scheduler'])
+
+    @patch('django_rq.worker_pool.DjangoWorkerPool.start')
+    def test_command_runs_the_scheduler_by_default(self, start):
+        command = import_module('django_rq.management.commands.rqworker-pool')
+        with patch.object(command, 'DjangoWorkerPool', wraps=DjangoWorkerPool) as pool_class:
+            call_command('rqworker-pool', burst=True)
+            self.assertTrue(pool_class.call_args.kwargs['with_scheduler'])
+            call_command('rqworker-pool', '--without-scheduler', burst=True)
+            self.assertFalse(pool_class.call_args.kwargs['with_scheduler'])
+
+    @patch('django_rq.worker_pool.time.monotonic')
+    def test_max_idle_time(self, monotonic):
+        pool = self.get_pool(num_workers=1, max_idle_time=10)
+        pool.status = pool.Status.STARTED
+        monotonic.return_value = 100
+        self.assertFalse(pool.is_idle_timeout_reached())
+        monotonic.return_value = 105
+        self.assertFalse(pool.is_idle_timeout_reached())
+
+        # Queued jobs reset the idle timer
+        job = self.queue.enqueue(say_hello)
+        self.assertFalse(pool.is_idle_timeout_reached())
+        job.delete()
+        self.queue.empty()
+        monotonic.return_value = 112
+        self.assertFalse(pool.is_idle_timeout_reached())
+        monotonic.return_value = 122
+        self.assertTrue(pool.is_idle_timeout_reached())
+
+        with patch.object(pool, 'stop_workers') as stop_workers, patch.object(pool, 'start_worker') as start_worker:
+            pool.check_workers()
+        stop_workers.assert_called_once_with()
+        start_worker.assert_not_called()
+        self.assertEqual(pool.status, pool.Status.STOPPED)
+
+    def test_command_max_jobs(self):
+        jobs = [self.queue.enqueue(say_hello) for _ in range(3)]
+        call_command('rqworker-pool', burst=True, max_jobs=2, name='test-pool', with_scheduler=True)
+        self.assertEqual([job.get_status() for job in jobs], ['finished', 'finished', 'queued'])
+
+    def test_command_validates_worker_bounds(self):
+        with self.assertRaises(CommandError):
+            call_command('rqworker-pool', burst=True, min_workers=3, max_workers=2)
+        with self.assertRaises(CommandError):
+            call_command('rqworker-pool', burst=True, min_workers=3)
@@ -9,7 +9,7 @@ from uuid import uuid4
 import rq
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils.safestring import SafeString
@@ -18,7 +18,7 @@ from rq.job import Job
 from rq.registry import FinishedJobRegistry
 from rq.serializers import DefaultSerializer, JSONSerializer
 from rq.suspension import is_suspended
-from rq.worker import Worker
+from rq.worker import Worker, WorkerStatus
 
 from django_rq import thread_queue
 from django_rq.connection_utils import get_connection
@@ -28,9 +28,30 @@ from django_rq.management.commands import rqworker
 from django_rq.queues import DjangoRQ, get_queue, get_queues
 from django_rq.templatetags.django_rq import force_escape, job_status, timestamp_tooltip, to_localtime
 from django_rq.utils import get_displayable_connection_kwargs, get_scheduler_pid
-from django_rq.workers import get_worker, get_worker_class
+from django_rq.workers import (
+    DjangoAsyncioWorker,
+    DjangoSimpleWorker,
+    DjangoThreadWorker,
+    get_memory_usage,
+    get_preload_modules,
+    get_worker,
+    get_worker_class,
+)
 from tests.base import DjangoRQTestCase
-from tests.fixtures import DummyJob, DummyQueue, DummyWorker, access_self, say_hello
+from tests.fixtures import (
+    DummyJob,
+    DummyQueue,
+    DummyWorker,
+    access_self,
+    async_sleep,
+    async_wait_for_peers,
+    failing_job,
+    get_worker_state,
+    say_hello,
+    sleep,
+    started_peers,
+    wait_for_peers,
+)
 from tests.redis_config import REDIS_CONFIG_1
 
 try:
@@ -459,6 +480,155 @@ class WorkersTest(TestCase):
         self.assertFalse(job.id in failed_queue.job_ids)
         job.delete()
 
+    def test_max_memory(self):
+        queue = get_queue()
+        queue.empty()
+        jobs = [queue.enqueue(access_self) for _ in range(2)]
+
+        worker = get_worker(max_memory=100_000)
+        worker.work(burst=True)
+        self.assertTrue(all(job.is_finished for job in jobs))
+
+        # Worker quits after the first job once memory usage exceeds the limit
+        jobs = [queue.enqueue(access_self) for _ in range(2)]
+        worker = get_worker(max_memory=1)
+        worker.work(burst=True)
+        self.assertEqual([job.get_status() for job in jobs], ['finished', 'queued'])
+        queue.empty()
+
+    def test_max_memory_requires_django_worker(self):
+        with self.assertRaises(CommandError):
+            call_command('rqworker', burst=True, max_memory=100, worker_class='tests.fixtures.DummyWorker')
+        self.assertGreater(get_memory_usage(), 0)
+
+    def test_thread_worker(self):
+        queue = get_queue()
+        queue.empty()
+        started_peers.clear()
+        # Each job waits for the others to start, and fails unless they overlap
+        jobs = [queue.enqueue(wait_for_peers, 4) for _ in range(4)]
+        failed_job = queue.enqueue(failing_job)
+
+        worker = get_worker(worker_class=DjangoThreadWorker, concurrency=4)
+        worker.work(burst=True)
+        self.assertTrue(all(job.is_finished for job in jobs))
+        self.assertEqual(len({job.return_value() for job in jobs}), 4)
+        self.assertTrue(failed_job.is_failed)
+
+        job = queue.enqueue(sleep, 2, job_timeout=1)
+        worker = get_worker(worker_class=DjangoThreadWorker)
+        worker.work(burst=True)
+        self.assertTrue(job.is_failed)
+
+    def test_thread_worker_state(self):
+        queue = get_queue()
+        queue.empty()
+        job = queue.enqueue(get_worker_state, 0.5)
+        queue.enqueue(say_hello)
+
+        worker = get_worker(worker_class=DjangoThreadWorker, concurrency=2)
+        worker.work(burst=True)
+        # The worker stays busy while it dequeues other jobs
+        self.assertEqual(job.return_value(), WorkerStatus.BUSY)
+        self.assertEqual(worker.get_state(), WorkerStatus.IDLE)
+
+    @patch('django_rq.workers.close_old_db_connections')
+    def test_asyncio_worker(self, close_old_db_connections):
+        queue = get_queue()
+        queue.empty()
+        started_peers.clear()
+        jobs = [queue.enqueue(async_wait_for_peers, 4) for _ in range(4)]
+        sync_job = queue.enqueue(say_hello)
+
+        worker = get_worker(worker_class=DjangoAsyncioWorker)
+        worker.work(burst=True)
+        self.assertTrue(all(job.is_finished for job in jobs))
+        # Coroutines share the worker's event loop
+        self.assertEqual({job.return_value() for job in jobs}, {f'rq-{worker.name}-loop'})
+        self.assertEqual(sync_job.return_value(), 'Hello, World!')
+        # Before and after every job, and after every coroutine
+        self.assertEqual(close_old_db_connections.call_count, 5 * 2 + 4)
+
+        job = queue.enqueue(async_sleep, 2, job_timeout=1)
+        worker = get_worker(worker_class=DjangoAsyncioWorker)
+        worker.work(burst=True)
+        self.assertTrue(job.is_failed)
+
+    @patch('django_rq.workers.close_old_db_connections')
+    def test_db_connections_closed_around_jobs(self, close_old_db_connections):
+        queue = get_queue()
+        queue.empty()
+        queue.enqueue(say_hello)
+        get_worker(worker_class=DjangoSimpleWorker).work(burst=True)
+        self.assertEqual(close_old_db_connections.call_args_list, [mock.call(False)] * 2)
+
+        close_old_db_connections.reset_mock()
+        queue.enqueue(say_hello)
+        with override_settings(RQ={'PERSISTENT_DB_CONNECTIONS': True}):
+            get_worker(worker_class=DjangoSimpleWorker).work(burst=True)
+        self.assertEqual(close_old_db_connections.call_args_list, [mock.call(True)] * 2)
+
+    def test_weighted_dequeue_strategy(self):
+        queues = get_queues('test2', 'test3')
+        for queue in queues:
+            queue.empty()
+        jobs = {queue.name: [queue.enqueue(say_hello) for _ in range(10)] for queue in queues}
+
+        with override_settings(RQ_QUEUES={**QUEUES, 'test2': {**QUEUES['test2'], 'WEIGHT': 3}}):
+            self.assertEqual([queue.weight for queue in queues], [3, 1])
+            worker = get_worker('test2', 'test3', worker_class=DjangoSimpleWorker)
+            worker.work(burst=True, max_jobs=8, dequeue_strategy='weighted')  # type: ignore[arg-type]
+
+        finished = {name: sum(job.is_finished for job in queue_jobs) for name, queue_jobs in jobs.items()}
+        self.assertEqual(finished, {'test2': 6, 'test3': 2})
+
+        # test2 doesn't build up credit while it's empty
+        queues[0].empty()
+        worker = get_worker('test2', 'test3', worker_class=DjangoSimpleWorker)
+        worker.work(burst=True, max_jobs=2, dequeue_strategy='weighted')  # type: ignore[arg-type]
+        self.assertEqual(worker._queue_credits['test2'], 0)
+        for queue in queues:
+            queue.empty()
+
+    def test_dequeue_strategy_option(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                'rqworker', burst=True, dequeue_strategy='weighted', worker_class='tests.fixtures.DummyWorker'
+            )
+        with override_settings(RQ={'DEQUEUE_STRATEGY': 'fastest'}):
+            with self.assertRaises(ImproperlyConfigured):
+                call_command('rqworker', burst=True)
+
+    def test_execution_option(self):
+        queue = get_queue()
+        job = queue.enqueue(async_sleep, 0)
+        call_command('rqworker', burst=True, execution='asyncio', concurrency=2)
+        self.assertTrue(job.is_finished)
+
+        with self.assertRaises(CommandError):
+            call_command('rqworker', burst=True, execution='thread', worker_class='tests.fixtures.DummyWorker')
+        with self.assertRaises(CommandError):
+            call_command('rqworker', burst=True, concurrency=2)
+
+    def test_get_preload_modules(self):
+        self.assertEqual(get_preload_modules(), [])
+        with override_settings(RQ={'PRELOAD_MODULES': ['tests.fixtures', 'json']}):
+            self.assertEqual(get_preload_modules(['json', 'decimal']), ['json', 'decimal', 'tests.fixtures'])
+
+    @patch('django_rq.workers.import_module')
+    def test_preload(self, import_module):
+        queue = get_queue()
+        job = queue.enqueue(say_hello)
+        with override_settings(RQ={'PRELOAD_MODULES': ['tests.fixtures']}):
+            call_command('rqworker', burst=True, preload='json,decimal')
+        self.assertEqual([c.args[0] for c in import_module.call_args_list], ['json', 'decimal', 'tests.fixtures'])
+        job.refresh()
+        self.assertTrue(job.is_finished)
+
+        import_module.side_effect = ImportError('No module named foo')
+        with self.assertRaises(CommandError):
+            call_command('rqworker', burst=True, preload='foo')
+
     @patch('django_rq.management.commands.rqworker.setup_loghandlers')
     def test_commandline_verbosity_affects_logging_level(self, setup_loghandlers_mock):
         expected_level = {
@@ -586,8 +756,14 @@ class WorkerClassTest(TestCase):
 
     @override_settings(RQ={'WORKER_CLASS': 'tests.fixtures.DummyWorker'})
     def test_custom_class(self):
-        worker = get_worker()
+        with self.assertLogs('django_rq.workers', 'WARNING') as logs:
+            worker = get_worker()
         self.assertIsInstance(worker, DummyWorker)
+        # Features implemented by DjangoWorkerMixin are disabled
+        self.assertIn('DummyWorker is not based on django_rq.workers.DjangoWorkerMixin', logs.output[0])
+
+        with self.assertNoLogs('django_rq.workers', 'WARNING'):
+            get_worker(worker_class=DjangoSimpleWorker)
 
     def test_local_override(self):
         self.assertIs(get_worker_class('tests.fixtures.DummyWorker'), DummyWorker)